@@ -24,6 +24,25 @@ resource "aws_s3_bucket_server_side_encryption_configuration" "bedrock_agent" {
   }
 }
 
+# Oversized MCP tool results are offloaded here for paging; reads enforce the short TTL
+resource "aws_s3_bucket_lifecycle_configuration" "bedrock_agent" {
+  count  = var.enable_bedrock_agent ? 1 : 0
+  bucket = aws_s3_bucket.bedrock_agent[0].id
+  rule {
+    id     = "expire-mcp-results"
+    status = "Enabled"
+    filter {
+      prefix = "mcp-results/"
+    }
+    expiration {
+      days = 1
+    }
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+}
+
 resource "aws_kms_key" "bedrock_agent" {
   count                   = var.enable_bedrock_agent ? 1 : 0
   description             = "KMS key for Bedrock agent ${var.cluster_name}"
@@ -47,7 +66,37 @@ resource "aws_s3_object" "kubernetes_api_schema" {
     paths = {
       "/kubectl/get"      = { post = { summary = "Get Kubernetes resources", operationId = "kubectlGet" } }
       "/kubectl/logs"     = { post = { summary = "Get pod logs", operationId = "kubectlLogs" } }
-      "/kubectl/describe" = { post = { summary = "Describe Kubernetes resource", operationId = "kubectlDescribe" } }
+      "/kubectl/describe" = { post = { summary = "Describe a pod, deployment, replicaset, node or service with owners, pods and grouped events", operationId = "kubectlDescribe" } }
+      "/results/page" = { post = {
+        summary     = "Fetch the next slice of a result that was too large to return whole"
+        operationId = "kubernetesResultsPage"
+        requestBody = { required = true, content = { "application/json" = { schema = {
+          type     = "object"
+          required = ["handle"]
+          properties = {
+            handle = { type = "string", description = "Handle from the truncated result's _continuation" }
+            offset = { type = "integer", description = "next_offset from the previous page (default 0)" }
+            limit  = { type = "integer", description = "Maximum items (or characters for text) to return" }
+          }
+        } } } }
+      } }
+      "/tools/batch" = { post = {
+        summary     = "Run several tool calls concurrently under one shared deadline"
+        operationId = "kubernetesToolsBatch"
+        requestBody = { required = true, content = { "application/json" = { schema = {
+          type     = "object"
+          required = ["calls"]
+          properties = {
+            calls = {
+              type        = "array"
+              description = "Calls as {\"api_path\": ..., \"parameters\": {...}} with optional id and action_group"
+              items       = { type = "object" }
+            }
+            deadline_seconds = { type = "number", description = "Shared deadline for all calls (default 45)" }
+            max_workers      = { type = "integer", description = "Maximum calls run at once (default 8)" }
+          }
+        } } } }
+      } }
     }
   })
 }
@@ -61,8 +110,38 @@ resource "aws_s3_object" "aws_api_schema" {
     info    = { title = "AWS Operations API", version = "1.0.0" }
     paths = {
       "/cloudwatch/get-metric-data" = { post = { summary = "Get CloudWatch metrics", operationId = "getMetricData" } }
-      "/guardduty/get-findings"     = { post = { summary = "Get GuardDuty findings", operationId = "getGuardDutyFindings" } }
-      "/xray/get-service-graph"     = { post = { summary = "Get X-Ray service graph", operationId = "getXRayServiceGraph" } }
+      "/guardduty/get-findings"     = { post = { summary = "Summarize GuardDuty findings per resource for the cluster", operationId = "getGuardDutyFindings" } }
+      "/xray/get-service-graph"     = { post = { summary = "Get the X-Ray service graph as nodes and edges, or the hot path from a service", operationId = "getXRayServiceGraph" } }
+      "/results/page" = { post = {
+        summary     = "Fetch the next slice of a result that was too large to return whole"
+        operationId = "awsResultsPage"
+        requestBody = { required = true, content = { "application/json" = { schema = {
+          type     = "object"
+          required = ["handle"]
+          properties = {
+            handle = { type = "string", description = "Handle from the truncated result's _continuation" }
+            offset = { type = "integer", description = "next_offset from the previous page (default 0)" }
+            limit  = { type = "integer", description = "Maximum items (or characters for text) to return" }
+          }
+        } } } }
+      } }
+      "/tools/batch" = { post = {
+        summary     = "Run several tool calls concurrently under one shared deadline"
+        operationId = "awsToolsBatch"
+        requestBody = { required = true, content = { "application/json" = { schema = {
+          type     = "object"
+          required = ["calls"]
+          properties = {
+            calls = {
+              type        = "array"
+              description = "Calls as {\"api_path\": ..., \"parameters\": {...}} with optional id and action_group"
+              items       = { type = "object" }
+            }
+            deadline_seconds = { type = "number", description = "Shared deadline for all calls (default 45)" }
+            max_workers      = { type = "integer", description = "Maximum calls run at once (default 8)" }
+          }
+        } } } }
+      } }
     }
   })
 }
@@ -120,8 +199,9 @@ resource "aws_lambda_function" "mcp_server" {
 
   environment {
     variables = {
-      CLUSTER_NAME = module.eks.cluster_name
-      AWS_REGION   = var.aws_region
+      CLUSTER_NAME        = module.eks.cluster_name
+      AWS_REGION          = var.aws_region
+      RESULT_STORE_BUCKET = aws_s3_bucket.bedrock_agent[0].id
     }
   }
 
@@ -172,9 +252,12 @@ resource "aws_iam_role_policy" "mcp_server_lambda" {
     Version = "2012-10-17"
     Statement = [
       { Effect = "Allow", Action = ["eks:DescribeCluster", "eks:ListClusters"], Resource = module.eks.cluster_arn },
-      { Effect = "Allow", Action = ["cloudwatch:GetMetricData", "cloudwatch:GetMetricStatistics", "logs:GetLogEvents", "logs:FilterLogEvents"], Resource = "*" },
-      { Effect = "Allow", Action = ["guardduty:GetFindings", "guardduty:ListFindings"], Resource = "*" },
+      { Effect = "Allow", Action = ["cloudwatch:GetMetricData", "cloudwatch:GetMetricStatistics", "cloudwatch:ListMetrics", "logs:GetLogEvents", "logs:FilterLogEvents", "logs:StartQuery", "logs:GetQueryResults"], Resource = "*" },
+      { Effect = "Allow", Action = ["guardduty:ListDetectors", "guardduty:GetFindings", "guardduty:ListFindings"], Resource = "*" },
+      { Effect = "Allow", Action = ["sns:Publish"], Resource = "arn:${data.aws_partition.current.partition}:sns:${var.aws_region}:${data.aws_caller_identity.current.account_id}:${var.cluster_name}-*" },
       { Effect = "Allow", Action = ["xray:GetServiceGraph", "xray:GetTraceSummaries", "xray:GetTraceGraph"], Resource = "*" },
+      { Effect = "Allow", Action = ["s3:PutObject", "s3:GetObject"], Resource = "${aws_s3_bucket.bedrock_agent[0].arn}/mcp-results/*" },
+      { Effect = "Allow", Action = ["kms:GenerateDataKey", "kms:Decrypt"], Resource = aws_kms_key.bedrock_agent[0].arn },
       { Effect = "Allow", Action = ["bedrock:InvokeModel"], Resource = "arn:${data.aws_partition.current.partition}:bedrock:${var.aws_region}::foundation-model/anthropic.claude-3-sonnet-20240229-v1:0" }
     ]
   })
@@ -207,10 +290,55 @@ resource "aws_cloudwatch_event_rule" "guardduty_critical" {
   })
 }
 
-resource "aws_cloudwatch_event_target" "guardduty_critical_lambda" {
+# Findings are buffered in SQS so the trigger can coalesce bursts of the same
+# finding type into one agent investigation per batch window
+resource "aws_sqs_queue" "guardduty_findings_dlq" {
+  count                     = var.enable_bedrock_agent ? 1 : 0
+  name                      = "${var.cluster_name}-guardduty-findings-dlq"
+  message_retention_seconds = 1209600
+  sqs_managed_sse_enabled   = true
+}
+
+resource "aws_sqs_queue" "guardduty_findings" {
+  count                      = var.enable_bedrock_agent ? 1 : 0
+  name                       = "${var.cluster_name}-guardduty-findings"
+  visibility_timeout_seconds = 1800
+  message_retention_seconds  = 86400
+  sqs_managed_sse_enabled    = true
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.guardduty_findings_dlq[0].arn
+    maxReceiveCount     = 3
+  })
+}
+
+resource "aws_sqs_queue_policy" "guardduty_findings" {
+  count     = var.enable_bedrock_agent ? 1 : 0
+  queue_url = aws_sqs_queue.guardduty_findings[0].id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect    = "Allow"
+      Principal = { Service = "events.amazonaws.com" }
+      Action    = "sqs:SendMessage"
+      Resource  = aws_sqs_queue.guardduty_findings[0].arn
+      Condition = { ArnEquals = { "aws:SourceArn" = aws_cloudwatch_event_rule.guardduty_critical[0].arn } }
+    }]
+  })
+}
+
+resource "aws_cloudwatch_event_target" "guardduty_critical_sqs" {
   count = var.enable_bedrock_agent ? 1 : 0
   rule  = aws_cloudwatch_event_rule.guardduty_critical[0].name
-  arn   = aws_lambda_function.bedrock_agent_trigger[0].arn
+  arn   = aws_sqs_queue.guardduty_findings[0].arn
+}
+
+resource "aws_lambda_event_source_mapping" "guardduty_findings" {
+  count                              = var.enable_bedrock_agent ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.guardduty_findings[0].arn
+  function_name                      = aws_lambda_function.bedrock_agent_trigger[0].arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 60
+  function_response_types            = ["ReportBatchItemFailures"]
 }
 
 resource "aws_lambda_function" "bedrock_agent_trigger" {
@@ -220,13 +348,16 @@ resource "aws_lambda_function" "bedrock_agent_trigger" {
   role             = aws_iam_role.bedrock_agent_trigger[0].arn
   handler          = "index.handler"
   runtime          = "python3.12"
-  timeout          = 30
+  timeout          = 300
   source_code_hash = fileexists("lambda/bedrock-agent-trigger.zip") ? filebase64sha256("lambda/bedrock-agent-trigger.zip") : null
 
   environment {
     variables = {
-      AGENT_ID       = ""
-      AGENT_ALIAS_ID = "production"
+      AGENT_ID                    = ""
+      AGENT_ALIAS_ID              = "production"
+      FINGERPRINT_TTL_SECONDS     = "900"
+      MAX_PARALLEL_INVESTIGATIONS = "4"
+      AGENT_TRACE_ENABLED         = "false"
     }
   }
 }
@@ -255,16 +386,10 @@ resource "aws_iam_role_policy" "bedrock_agent_trigger" {
   name  = "bedrock-agent-trigger-policy"
   role  = aws_iam_role.bedrock_agent_trigger[0].id
   policy = jsonencode({
-    Version   = "2012-10-17"
-    Statement = [{ Effect = "Allow", Action = ["bedrock:InvokeAgent"], Resource = "*" }]
+    Version = "2012-10-17"
+    Statement = [
+      { Effect = "Allow", Action = ["bedrock:InvokeAgent"], Resource = "*" },
+      { Effect = "Allow", Action = ["sqs:ReceiveMessage", "sqs:DeleteMessage", "sqs:GetQueueAttributes"], Resource = aws_sqs_queue.guardduty_findings[0].arn }
+    ]
   })
 }
-
-resource "aws_lambda_permission" "bedrock_agent_trigger_eventbridge" {
-  count         = var.enable_bedrock_agent ? 1 : 0
-  statement_id  = "AllowExecutionFromEventBridge"
-  action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.bedrock_agent_trigger[0].function_name
-  principal     = "events.amazonaws.com"
-  source_arn    = aws_cloudwatch_event_rule.guardduty_critical[0].arn
-}
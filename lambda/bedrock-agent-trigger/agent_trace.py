@@ -0,0 +1,148 @@
+"""Per-step latency timeline built from Bedrock invoke_agent trace events.
+
+A copy of this module ships with the web UI (web-ui/app/agent_trace.py);
+keep the two in sync.
+"""
+import json
+import os
+import time
+
+METRICS_NAMESPACE = os.environ.get('AGENT_TRACE_NAMESPACE', 'EKS/BedrockAgent')
+
+# trace part key -> step type for the model calls it wraps
+PHASES = {
+    'preProcessingTrace': 'preprocessing',
+    'orchestrationTrace': 'model',
+    'postProcessingTrace': 'postprocessing'
+}
+
+
+def _seconds(event_time):
+    return event_time.timestamp() if hasattr(event_time, 'timestamp') else None
+
+
+class TraceTimeline:
+    def __init__(self, session_id, source, clock=time.time):
+        self.session_id = session_id
+        self.source = source
+        self.clock = clock
+        self.started = clock()
+        self.steps = []
+        self._open = {}
+        self.failures = []
+
+    def _begin(self, key, step_type, name, at):
+        self._open[key] = {'type': step_type, 'name': name, 'start': at}
+
+    def _end(self, key, at, **extra):
+        step = self._open.pop(key, None)
+        if step is None:
+            return
+        self.steps.append(dict(
+            type=step['type'],
+            name=step['name'],
+            start_offset_ms=round((step['start'] - self.started) * 1000, 1),
+            duration_ms=round((at - step['start']) * 1000, 1),
+            **extra
+        ))
+
+    def add(self, trace_event):
+        """Feed the value of an invoke_agent stream event's 'trace' key"""
+        at = _seconds(trace_event.get('eventTime')) or self.clock()
+        trace = trace_event.get('trace', {})
+
+        for part, model_step in PHASES.items():
+            phase = trace.get(part)
+            if not phase:
+                continue
+            if 'modelInvocationInput' in phase:
+                model_input = phase['modelInvocationInput']
+                self._begin(('model', model_input.get('traceId')), model_step, model_input.get('type', model_step), at)
+            if 'modelInvocationOutput' in phase:
+                model_output = phase['modelInvocationOutput']
+                usage = model_output.get('metadata', {}).get('usage', {})
+                self._end(('model', model_output.get('traceId')), at,
+                          input_tokens=usage.get('inputTokens', 0), output_tokens=usage.get('outputTokens', 0))
+            invocation = phase.get('invocationInput')
+            if invocation:
+                key = ('tool', invocation.get('traceId'))
+                if 'actionGroupInvocationInput' in invocation:
+                    action = invocation['actionGroupInvocationInput']
+                    self._begin(key, 'action_group',
+                                f"{action.get('actionGroupName')} {action.get('apiPath') or action.get('function')}", at)
+                elif 'knowledgeBaseLookupInput' in invocation:
+                    self._begin(key, 'knowledge_base', invocation['knowledgeBaseLookupInput'].get('knowledgeBaseId'), at)
+                else:
+                    self._begin(key, 'tool', invocation.get('invocationType', 'unknown'), at)
+            if 'observation' in phase:
+                self._end(('tool', phase['observation'].get('traceId')), at)
+
+        if 'failureTrace' in trace:
+            self.failures.append(trace['failureTrace'].get('failureReason'))
+
+    def summary(self):
+        by_type = {}
+        by_name = {}
+        for step in self.steps:
+            by_type[step['type']] = round(by_type.get(step['type'], 0) + step['duration_ms'], 1)
+            if step['type'] != 'model':
+                by_name[step['name']] = round(by_name.get(step['name'], 0) + step['duration_ms'], 1)
+        return {
+            'total_ms': round((self.clock() - self.started) * 1000, 1),
+            'by_type_ms': by_type,
+            'by_tool_ms': dict(sorted(by_name.items(), key=lambda kv: kv[1], reverse=True)),
+            'model_invocations': sum(1 for s in self.steps if 'input_tokens' in s),
+            'input_tokens': sum(s.get('input_tokens', 0) for s in self.steps),
+            'output_tokens': sum(s.get('output_tokens', 0) for s in self.steps),
+            'failures': self.failures
+        }
+
+    def emit(self):
+        """Log the timeline and emit EMF metrics for the session and every step"""
+        summary = self.summary()
+        print(json.dumps({
+            'type': 'agent_trace_timeline',
+            'source': self.source,
+            'session_id': self.session_id,
+            'summary': summary,
+            'steps': self.steps
+        }, default=str))
+
+        now = int(time.time() * 1000)
+        print(json.dumps({
+            '_aws': {'Timestamp': now, 'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Source']],
+                'Metrics': [
+                    {'Name': 'InvestigationLatency', 'Unit': 'Milliseconds'},
+                    {'Name': 'ModelLatency', 'Unit': 'Milliseconds'},
+                    {'Name': 'ActionGroupLatency', 'Unit': 'Milliseconds'},
+                    {'Name': 'KnowledgeBaseLatency', 'Unit': 'Milliseconds'},
+                    {'Name': 'ModelInvocations', 'Unit': 'Count'},
+                    {'Name': 'InputTokens', 'Unit': 'Count'},
+                    {'Name': 'OutputTokens', 'Unit': 'Count'}
+                ]
+            }]},
+            'Source': self.source,
+            'SessionId': self.session_id,
+            'InvestigationLatency': summary['total_ms'],
+            'ModelLatency': summary['by_type_ms'].get('model', 0),
+            'ActionGroupLatency': summary['by_type_ms'].get('action_group', 0),
+            'KnowledgeBaseLatency': summary['by_type_ms'].get('knowledge_base', 0),
+            'ModelInvocations': summary['model_invocations'],
+            'InputTokens': summary['input_tokens'],
+            'OutputTokens': summary['output_tokens']
+        }))
+        for step in self.steps:
+            print(json.dumps({
+                '_aws': {'Timestamp': now, 'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Source', 'StepType'], ['Source', 'StepType', 'StepName']],
+                    'Metrics': [{'Name': 'StepLatency', 'Unit': 'Milliseconds'}]
+                }]},
+                'Source': self.source,
+                'SessionId': self.session_id,
+                'StepType': step['type'],
+                'StepName': step['name'],
+                'StepLatency': step['duration_ms']
+            }))
@@ -1,56 +1,193 @@
 import json
 import os
+import threading
+import time
 import boto3
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from agent_trace import TraceTimeline
 
 bedrock_agent = boto3.client('bedrock-agent-runtime', region_name=os.environ.get('AWS_REGION', 'us-gov-west-1'))
 
-def handler(event, context):
-    print(f"Received event: {json.dumps(event)}")
-    
-    agent_id = os.environ['AGENT_ID']
-    agent_alias_id = os.environ['AGENT_ALIAS_ID']
-    
-    detail = event.get('detail', {})
-    
-    if detail.get('type') == 'GuardDuty Finding':
-        severity = detail.get('severity', 0)
-        finding_type = detail.get('type', 'Unknown')
-        resource = detail.get('resource', {})
-        
-        input_text = f"GuardDuty critical finding detected: Severity={severity}, Type={finding_type}, Resource={json.dumps(resource)}. Investigate and remediate."
+# Findings for a resource already investigated within this window are suppressed
+FINGERPRINT_TTL_SECONDS = int(os.environ.get('FINGERPRINT_TTL_SECONDS', '900'))
+MAX_PARALLEL_INVESTIGATIONS = int(os.environ.get('MAX_PARALLEL_INVESTIGATIONS', '4'))
+MAX_RESOURCES_PER_PROMPT = 50
+# Opt-in: trace events add payload and latency to every agent stream
+AGENT_TRACE_ENABLED = os.environ.get('AGENT_TRACE_ENABLED', 'false').lower() == 'true'
+
+# fingerprint -> expiry, kept across warm invocations
+_recent_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+def describe_resource(resource):
+    """Return a short, stable identifier for the resource a finding is about"""
+    eks = resource.get('eksClusterDetails', {})
+    workload = resource.get('kubernetesDetails', {}).get('kubernetesWorkloadDetails', {})
+    instance = resource.get('instanceDetails', {})
+    if workload:
+        return f"{eks.get('name', 'unknown')}/{workload.get('namespace')}/{workload.get('type')}/{workload.get('name')}"
+    if eks:
+        return f"{eks.get('name')}/cluster"
+    if instance:
+        return f"instance/{instance.get('instanceId')}"
+    return json.dumps(resource, sort_keys=True)[:200]
+
+def group_key(detail):
+    """Findings of the same type against the same cluster are investigated together"""
+    resource = detail.get('resource', {})
+    scope = resource.get('eksClusterDetails', {}).get('name') or resource.get('resourceType', 'Unknown')
+    return (detail.get('type', 'Unknown'), scope)
+
+def claim_fingerprint(fingerprint):
+    """Record the fingerprint, returning False if it was seen within the TTL"""
+    now = time.time()
+    with _fingerprint_lock:
+        for expired in [f for f, expiry in _recent_fingerprints.items() if expiry < now]:
+            del _recent_fingerprints[expired]
+        if fingerprint in _recent_fingerprints:
+            return False
+        _recent_fingerprints[fingerprint] = now + FINGERPRINT_TTL_SECONDS
+        return True
+
+def release_fingerprints(fingerprints):
+    with _fingerprint_lock:
+        for fingerprint in fingerprints:
+            _recent_fingerprints.pop(fingerprint, None)
+
+def parse_records(event):
+    """Yield (message_id, eventbridge_event) from an SQS batch or a direct EventBridge event"""
+    if 'Records' in event:
+        for record in event['Records']:
+            yield record['messageId'], json.loads(record['body'])
     else:
-        input_text = f"Alert received: {json.dumps(detail)}"
-    
+        yield None, event
+
+def build_prompt(finding_type, scope, findings):
+    resources = sorted({describe_resource(f.get('resource', {})) for f in findings})
+    max_severity = max(f.get('severity', 0) for f in findings)
+    listed = '\n'.join(f'- {r}' for r in resources[:MAX_RESOURCES_PER_PROMPT])
+    more = f'\n- ... and {len(resources) - MAX_RESOURCES_PER_PROMPT} more' if len(resources) > MAX_RESOURCES_PER_PROMPT else ''
+    return (
+        f"GuardDuty critical finding detected: Type={finding_type}, Scope={scope}, "
+        f"MaxSeverity={max_severity}, Findings={len(findings)}, AffectedResources={len(resources)}.\n"
+        f"Affected resources:\n{listed}{more}\n"
+        f"Investigate these together as one incident and remediate."
+    )
+
+def invoke_agent(input_text):
     session_id = str(uuid.uuid4())
-    
+    timeline = TraceTimeline(session_id, 'trigger') if AGENT_TRACE_ENABLED else None
+    response = bedrock_agent.invoke_agent(
+        agentId=os.environ['AGENT_ID'],
+        agentAliasId=os.environ['AGENT_ALIAS_ID'],
+        sessionId=session_id,
+        inputText=input_text,
+        enableTrace=AGENT_TRACE_ENABLED
+    )
+
+    completion = ""
+    for event in response.get('completion', []):
+        if 'chunk' in event:
+            chunk = event['chunk']
+            if 'bytes' in chunk:
+                completion += chunk['bytes'].decode('utf-8')
+        elif 'trace' in event and timeline:
+            timeline.add(event['trace'])
+
+    print(f"Agent response ({session_id}): {completion}")
+    if timeline:
+        timeline.emit()
+    return session_id, completion
+
+def investigate(group):
+    """Run one agent investigation for a coalesced group; returns (group, session_id, error)"""
     try:
-        response = bedrock_agent.invoke_agent(
-            agentId=agent_id,
-            agentAliasId=agent_alias_id,
-            sessionId=session_id,
-            inputText=input_text
-        )
-        
-        completion = ""
-        for event in response.get('completion', []):
-            if 'chunk' in event:
-                chunk = event['chunk']
-                if 'bytes' in chunk:
-                    completion += chunk['bytes'].decode('utf-8')
-        
-        print(f"Agent response: {completion}")
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'session_id': session_id,
-                'response': completion
-            })
-        }
+        if group['finding_type'] is None:
+            input_text = f"Alert received: {json.dumps(group['findings'][0])}"
+        else:
+            input_text = build_prompt(group['finding_type'], group['scope'], group['findings'])
+        session_id, _ = invoke_agent(input_text)
+        return group, session_id, None
     except Exception as e:
         print(f"Error invoking Bedrock agent: {str(e)}")
+        # Let the retried messages be investigated again
+        release_fingerprints(group['fingerprints'])
+        return group, None, str(e)
+
+def handler(event, context):
+    print(f"Received event: {json.dumps(event)}")
+
+    groups = {}
+    suppressed = 0
+    for message_id, record in parse_records(event):
+        detail = record.get('detail', {})
+        if record.get('detail-type') == 'GuardDuty Finding' or record.get('source') == 'aws.guardduty':
+            finding_type, scope = group_key(detail)
+            fingerprint = f"{finding_type}|{describe_resource(detail.get('resource', {}))}"
+            if not claim_fingerprint(fingerprint):
+                suppressed += 1
+                continue
+            key = (finding_type, scope)
+        else:
+            fingerprint = None
+            finding_type = scope = None
+            key = ('alert', message_id or str(uuid.uuid4()))
+
+        group = groups.setdefault(key, {
+            'finding_type': finding_type,
+            'scope': scope,
+            'findings': [],
+            'fingerprints': [],
+            'message_ids': []
+        })
+        group['findings'].append(detail)
+        if fingerprint:
+            group['fingerprints'].append(fingerprint)
+        if message_id:
+            group['message_ids'].append(message_id)
+
+    failures = []
+    failed_groups = 0
+    sessions = []
+    if groups:
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_INVESTIGATIONS, len(groups))) as pool:
+            for group, session_id, error in pool.map(investigate, groups.values()):
+                if error:
+                    # A direct EventBridge invocation has no message ids, so count the group itself
+                    failed_groups += 1
+                    failures.extend(group['message_ids'])
+                else:
+                    sessions.append({
+                        'session_id': session_id,
+                        'finding_type': group['finding_type'],
+                        'scope': group['scope'],
+                        'findings': len(group['findings'])
+                    })
+
+    print(json.dumps({
+        'type': 'trigger_summary',
+        'groups': len(groups),
+        'investigations': len(sessions),
+        'suppressed_duplicates': suppressed,
+        'failed_groups': failed_groups,
+        'failed_messages': len(failures)
+    }))
+
+    if 'Records' in event:
+        # Partial batch response: only failed groups' messages go back to the queue
+        return {'batchItemFailures': [{'itemIdentifier': m} for m in failures]}
+
+    if failed_groups:
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': json.dumps({'error': 'Agent invocation failed'})
         }
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'session_id': sessions[0]['session_id'] if sessions else None,
+            'sessions': sessions,
+            'suppressed_duplicates': suppressed
+        })
+    }
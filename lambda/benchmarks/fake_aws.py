@@ -0,0 +1,165 @@
+"""In-process AWS stand-ins for offline benchmarks, answering boto3 calls from botocore events.
+
+Handlers hook before-call the same way botocore's Stubber does, so client-side
+pagination, threading and instrumentation run unchanged while no request
+leaves the process. Operations without a stand-in fall through to the network
+and fail against the unroutable endpoint the harness configures.
+"""
+import base64
+from datetime import datetime, timedelta, timezone
+
+from botocore.awsrequest import AWSResponse
+
+PARAMS_KEY = 'benchmark_params'
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+FAKE_CA = base64.b64encode(b'-----BEGIN CERTIFICATE-----\nZmFrZQ==\n-----END CERTIFICATE-----\n').decode()
+
+
+class SyntheticBucket:
+    """A bucket of `objects` keys spread evenly over `partitions` dt=YYYY-MM-DD/ prefixes"""
+
+    def __init__(self, name, objects, partitions):
+        self.name = name
+        self.objects = objects
+        self.partitions = [(f'dt={(START + timedelta(days=p)).date().isoformat()}/',
+                            objects // partitions + (1 if p < objects % partitions else 0))
+                           for p in range(partitions)]
+
+    @staticmethod
+    def size(index):
+        return 1000000 + index * 7919 % 4000000
+
+    def total_size(self):
+        # size() averages 3 MB; the daily storage metric is an estimate anyway
+        return self.objects * 3000000
+
+    def _object(self, partition, day, index):
+        return {
+            'Key': f'{partition}part-{index:07d}.parquet',
+            'LastModified': START + timedelta(days=day, seconds=index),
+            'ETag': f'"{index:032x}"',
+            'Size': self.size(index),
+            'StorageClass': 'STANDARD'
+        }
+
+    def list_objects_v2(self, params):
+        prefix = params.get('Prefix', '')
+        max_keys = params.get('MaxKeys', 1000)
+        offset = int(params.get('ContinuationToken') or 0)
+        response = {'Name': self.name, 'Prefix': prefix, 'MaxKeys': max_keys}
+
+        if params.get('Delimiter') == '/' and not prefix:
+            prefixes = [p for p, _ in self.partitions]
+            page = prefixes[offset:offset + max_keys]
+            response['CommonPrefixes'] = [{'Prefix': p} for p in page]
+            response['KeyCount'] = len(page)
+            total = len(prefixes)
+        else:
+            # Objects of every partition the prefix selects, addressed by one running offset
+            matching = [(day, p, count) for day, (p, count) in enumerate(self.partitions)
+                        if p.startswith(prefix) or prefix.startswith(p)]
+            contents = []
+            skipped = 0
+            for day, partition, count in matching:
+                if len(contents) == max_keys:
+                    break
+                if skipped + count <= offset:
+                    skipped += count
+                    continue
+                first = max(0, offset - skipped)
+                for index in range(first, min(count, first + max_keys - len(contents))):
+                    obj = self._object(partition, day, index)
+                    if obj['Key'].startswith(prefix):
+                        contents.append(obj)
+                skipped += count
+            response['Contents'] = contents
+            response['KeyCount'] = len(contents)
+            total = sum(count for _, _, count in matching)
+
+        response['IsTruncated'] = offset + max_keys < total
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(offset + max_keys)
+        return response
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+class FakeAws:
+    def __init__(self, k8s_url, bucket):
+        self.k8s_url = k8s_url
+        self.bucket = bucket
+        self.operations = {
+            ('eks', 'DescribeCluster'): self.describe_cluster,
+            ('s3', 'ListObjectsV2'): self.list_objects_v2,
+            ('cloudwatch', 'GetMetricData'): self.get_metric_data,
+            ('cloudwatch', 'ListMetrics'): self.list_metrics
+        }
+
+    def describe_cluster(self, params):
+        return {'cluster': {
+            'name': params['name'],
+            'endpoint': self.k8s_url,
+            'status': 'ACTIVE',
+            'certificateAuthority': {'data': FAKE_CA}
+        }}
+
+    def list_objects_v2(self, params):
+        return self.bucket.list_objects_v2(params)
+
+    def _metric_value(self, metric, index):
+        stat = metric['MetricStat']['Metric']
+        name = stat['MetricName']
+        dimensions = {d['Name']: d['Value'] for d in stat.get('Dimensions', [])}
+        if stat['Namespace'] == 'AWS/S3' and dimensions.get('BucketName') == self.bucket.name:
+            return float(self.bucket.objects if name == 'NumberOfObjects' else self.bucket.total_size())
+        return float((index * 37 + len(name) * 101) % 1000)
+
+    def list_metrics(self, params):
+        dimensions = {d['Name']: d.get('Value') for d in params.get('Dimensions', [])}
+        if params.get('Namespace') != 'AWS/S3' or dimensions.get('BucketName') != self.bucket.name:
+            return {'Metrics': []}
+        # The fake bucket holds only Standard objects
+        return {'Metrics': [{'Namespace': 'AWS/S3', 'MetricName': params.get('MetricName', 'BucketSizeBytes'),
+                             'Dimensions': [{'Name': 'BucketName', 'Value': self.bucket.name},
+                                            {'Name': 'StorageType', 'Value': 'StandardStorage'}]}]}
+
+    def get_metric_data(self, params):
+        start, end = _as_datetime(params['StartTime']), _as_datetime(params['EndTime'])
+        results = []
+        for query in params['MetricDataQueries']:
+            period = query['MetricStat']['Period']
+            steps = max(1, int((end - start).total_seconds() // period))
+            timestamps = [start + timedelta(seconds=period * i) for i in range(steps)]
+            results.append({
+                'Id': query['Id'],
+                'Label': query.get('Label', query['Id']),
+                'Timestamps': timestamps,
+                'Values': [self._metric_value(query, i) for i in range(steps)],
+                'StatusCode': 'Complete'
+            })
+        return {'MetricDataResults': results, 'Messages': []}
+
+    def capture(self, params, context, **kwargs):
+        """before-parameter-build: keep the caller's parameters for the response handler"""
+        context[PARAMS_KEY] = dict(params)
+
+    def respond(self, model, context, event_name, **kwargs):
+        """before-call: short-circuit the request with a parsed response"""
+        service = event_name.split('.')[1]
+        operation = self.operations.get((service, model.name))
+        if operation is None:
+            return None
+        return AWSResponse(None, 200, {}, None), operation(context[PARAMS_KEY])
+
+
+def install(session, k8s_url, bucket):
+    """Register the stand-ins on a boto3 session; only clients created afterwards see them"""
+    fake = FakeAws(k8s_url, bucket)
+    session.events.register('before-parameter-build', fake.capture)
+    # Last, so the server's own before-call handlers (API call counting) still run
+    session.events.register_last('before-call', fake.respond)
+    return fake
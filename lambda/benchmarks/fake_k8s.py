@@ -0,0 +1,449 @@
+"""Fake Kubernetes API server serving a seeded synthetic cluster for offline benchmarks.
+
+Run as a script it prints one JSON line with the listening URL and serves until
+killed. Objects are serialized once at startup so request handling stays cheap
+next to the client-side work being measured.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPLICAS_PER_DEPLOYMENT = 5
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Share of pods put into each unhealthy state
+UNHEALTHY_MIX = {'CrashLoopBackOff': 0.03, 'Pending': 0.02, 'Failed': 0.01}
+
+LOG_TEMPLATES = [
+    'INFO request completed path=/api/v1/orders/{n} status=200 duration_ms={n}',
+    'INFO cache refresh finished entries={n}',
+    'DEBUG polling queue depth={n}',
+    'WARN slow query took {n}ms table=events'
+]
+ERROR_TEMPLATES = [
+    'ERROR failed to connect to 10.0.{n}.12:5432 request_id={uuid}',
+    'ERROR upstream timeout after {n}ms calling payments trace={hex}',
+    'Exception in thread "worker-{n}" java.lang.NullPointerException at OrderService.java:{n}',
+    'FATAL out of memory allocating {n} bytes'
+]
+
+
+def _ts(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _uid(rng):
+    return '%08x-%04x-%04x-%04x-%012x' % (rng.getrandbits(32), rng.getrandbits(16), rng.getrandbits(16),
+                                          rng.getrandbits(16), rng.getrandbits(48))
+
+
+def _container(name, image, rng):
+    return {
+        'name': name,
+        'image': image,
+        'ports': [{'containerPort': 8080, 'protocol': 'TCP'}],
+        'env': [{'name': f'SETTING_{i}', 'value': f'value-{rng.getrandbits(24):x}'} for i in range(6)],
+        'resources': {
+            'requests': {'cpu': '250m', 'memory': '512Mi'},
+            'limits': {'cpu': '1', 'memory': '1Gi'}
+        },
+        'volumeMounts': [{'name': 'config', 'mountPath': '/etc/app'},
+                         {'name': 'kube-api-access', 'mountPath': '/var/run/secrets/kubernetes.io/serviceaccount',
+                          'readOnly': True}],
+        'imagePullPolicy': 'IfNotPresent'
+    }
+
+
+def _pod(ns, deployment, template_hash, owner_uid, index, node, rng, state, rv):
+    name = f'{deployment}-{template_hash}-{rng.getrandbits(24):06x}'[:63]
+    started = CREATED + timedelta(minutes=index)
+    containers = [
+        _container('app', f'123456789012.dkr.ecr.us-gov-west-1.amazonaws.com/{deployment}:1.4.{index % 10}', rng),
+        _container('log-router', 'public.ecr.aws/aws-observability/aws-for-fluent-bit:2.32.0', rng)
+    ]
+    phase = {'Pending': 'Pending', 'Failed': 'Failed'}.get(state, 'Running')
+    statuses = []
+    for c in containers:
+        crashing = state == 'CrashLoopBackOff' and c['name'] == 'app'
+        statuses.append({
+            'name': c['name'],
+            'image': c['image'],
+            'imageID': f"docker-pullable://{c['image']}@sha256:{rng.getrandbits(256):064x}",
+            'containerID': f'containerd://{rng.getrandbits(256):064x}',
+            'ready': phase == 'Running' and not crashing,
+            'started': not crashing,
+            'restartCount': rng.randint(10, 50) if crashing else rng.choice([0, 0, 0, 1]),
+            'state': {'waiting': {'reason': 'CrashLoopBackOff', 'message': 'back-off 5m0s restarting failed container'}}
+            if crashing else {'running': {'startedAt': _ts(started)}}
+        })
+    return {
+        'apiVersion': 'v1',
+        'kind': 'Pod',
+        'metadata': {
+            'name': name,
+            'namespace': ns,
+            'uid': _uid(rng),
+            'resourceVersion': str(rv),
+            'creationTimestamp': _ts(started),
+            'generateName': f'{deployment}-{template_hash}-',
+            'labels': {'app': deployment, 'pod-template-hash': template_hash, 'team': f'team-{index % 7}'},
+            'annotations': {
+                'kubectl.kubernetes.io/restartedAt': _ts(started),
+                'prometheus.io/scrape': 'true',
+                'prometheus.io/port': '9090'
+            },
+            'ownerReferences': [{
+                'apiVersion': 'apps/v1',
+                'kind': 'ReplicaSet',
+                'name': f'{deployment}-{template_hash}',
+                'uid': owner_uid,
+                'controller': True,
+                'blockOwnerDeletion': True
+            }]
+        },
+        'spec': {
+            'nodeName': None if phase == 'Pending' else node,
+            'serviceAccountName': 'default',
+            'restartPolicy': 'Always',
+            'containers': containers,
+            'volumes': [{'name': 'config', 'configMap': {'name': f'{deployment}-config'}},
+                        {'name': 'kube-api-access', 'projected': {'sources': [{'serviceAccountToken': {'path': 'token'}}]}}]
+        },
+        'status': {
+            'phase': phase,
+            'hostIP': f'10.0.{index % 250}.{index % 200 + 10}',
+            'podIP': f'10.1.{index // 250 % 250}.{index % 250 + 1}',
+            'startTime': _ts(started),
+            'conditions': [{'type': t, 'status': 'True' if phase == 'Running' else 'False',
+                            'lastTransitionTime': _ts(started)}
+                           for t in ('Initialized', 'Ready', 'ContainersReady', 'PodScheduled')],
+            'containerStatuses': [] if phase == 'Pending' else statuses
+        }
+    }
+
+
+def _deployment(ns, name, uid, replicas, unavailable, rv):
+    return {
+        'apiVersion': 'apps/v1',
+        'kind': 'Deployment',
+        'metadata': {'name': name, 'namespace': ns, 'uid': uid, 'resourceVersion': str(rv),
+                     'creationTimestamp': _ts(CREATED), 'generation': 3, 'labels': {'app': name}},
+        'spec': {
+            'replicas': replicas,
+            'selector': {'matchLabels': {'app': name}},
+            'template': {'metadata': {'labels': {'app': name}}, 'spec': {'containers': [{'name': 'app', 'image': name}]}}
+        },
+        'status': {
+            'replicas': replicas,
+            'readyReplicas': replicas - unavailable,
+            'availableReplicas': replicas - unavailable,
+            'unavailableReplicas': unavailable or None,
+            'conditions': [
+                {'type': 'Available', 'status': 'False' if unavailable else 'True', 'reason': 'MinimumReplicasAvailable'},
+                {'type': 'Progressing', 'status': 'True', 'reason': 'NewReplicaSetAvailable'}
+            ]
+        }
+    }
+
+
+def _replicaset(ns, deployment, template_hash, uid, deployment_uid, replicas, unavailable, rv):
+    return {
+        'apiVersion': 'apps/v1',
+        'kind': 'ReplicaSet',
+        'metadata': {
+            'name': f'{deployment}-{template_hash}',
+            'namespace': ns,
+            'uid': uid,
+            'resourceVersion': str(rv),
+            'creationTimestamp': _ts(CREATED),
+            'labels': {'app': deployment, 'pod-template-hash': template_hash},
+            'annotations': {'deployment.kubernetes.io/revision': '3'},
+            'ownerReferences': [{'apiVersion': 'apps/v1', 'kind': 'Deployment', 'name': deployment,
+                                 'uid': deployment_uid, 'controller': True, 'blockOwnerDeletion': True}]
+        },
+        'spec': {
+            'replicas': replicas,
+            'selector': {'matchLabels': {'app': deployment, 'pod-template-hash': template_hash}},
+            'template': {'metadata': {'labels': {'app': deployment}}, 'spec': {'containers': [{'name': 'app', 'image': deployment}]}}
+        },
+        'status': {'replicas': replicas, 'readyReplicas': replicas - unavailable, 'availableReplicas': replicas - unavailable}
+    }
+
+
+def _node(index, rng, rv):
+    name = f'ip-10-0-{index // 250}-{index % 250}.us-gov-west-1.compute.internal'
+    capacity = {'cpu': '16', 'memory': '64900000Ki', 'pods': '110', 'ephemeral-storage': '104845292Ki'}
+    return {
+        'apiVersion': 'v1',
+        'kind': 'Node',
+        'metadata': {
+            'name': name,
+            'uid': _uid(rng),
+            'resourceVersion': str(rv),
+            'creationTimestamp': _ts(CREATED),
+            'labels': {'eks.amazonaws.com/nodegroup': f'ng-{index % 4}', 'node.kubernetes.io/instance-type': 'm5.4xlarge',
+                       'topology.kubernetes.io/zone': f'us-gov-west-1{"abc"[index % 3]}'}
+        },
+        'spec': {'providerID': f'aws:///us-gov-west-1a/i-{rng.getrandbits(64):017x}'},
+        'status': {
+            'capacity': capacity,
+            'allocatable': dict(capacity, cpu='15890m', memory='63900000Ki'),
+            'conditions': [{'type': t, 'status': 'True' if t == 'Ready' else 'False'}
+                           for t in ('MemoryPressure', 'DiskPressure', 'PIDPressure', 'Ready')]
+        }
+    }
+
+
+def build_cluster(pods, namespaces, nodes, seed=42):
+    """Return {kind: [object dicts]} for a cluster of the given size"""
+    rng = random.Random(seed)
+    rv = 1000
+    node_objs = []
+    for i in range(nodes):
+        rv += 1
+        node_objs.append(_node(i, rng, rv))
+
+    pod_objs, deployment_objs, replicaset_objs, event_objs = [], [], [], []
+    index = 0
+    for n in range(namespaces):
+        ns = f'ns-{n:03d}'
+        ns_pods = pods // namespaces + (1 if n < pods % namespaces else 0)
+        for d in range(-(-ns_pods // REPLICAS_PER_DEPLOYMENT)):
+            name = f'{ns}-app-{d:03d}'
+            template_hash = f'{rng.getrandbits(32):08x}'[:10]
+            deployment_uid, replicaset_uid = _uid(rng), _uid(rng)
+            replicas = min(REPLICAS_PER_DEPLOYMENT, ns_pods - d * REPLICAS_PER_DEPLOYMENT)
+            unavailable = 0
+            for _ in range(replicas):
+                roll = rng.random()
+                state = 'Running'
+                for candidate, share in UNHEALTHY_MIX.items():
+                    if roll < share:
+                        state = candidate
+                        break
+                    roll -= share
+                unavailable += state != 'Running'
+                rv += 1
+                pod = _pod(ns, name, template_hash, replicaset_uid, index, node_objs[index % nodes]['metadata']['name'] if nodes else None,
+                           rng, state, rv)
+                pod_objs.append(pod)
+                if state != 'Running':
+                    rv += 1
+                    event_objs.append({
+                        'apiVersion': 'v1',
+                        'kind': 'Event',
+                        'metadata': {'name': f"{pod['metadata']['name']}.{rng.getrandbits(40):x}", 'namespace': ns,
+                                     'resourceVersion': str(rv)},
+                        'involvedObject': {'kind': 'Pod', 'name': pod['metadata']['name'], 'namespace': ns,
+                                           'uid': pod['metadata']['uid']},
+                        'reason': 'BackOff' if state == 'CrashLoopBackOff' else 'FailedScheduling',
+                        'message': 'Back-off restarting failed container' if state == 'CrashLoopBackOff'
+                        else '0/3 nodes are available: insufficient memory.',
+                        'type': 'Warning',
+                        'count': rng.randint(1, 200),
+                        'firstTimestamp': _ts(CREATED),
+                        'lastTimestamp': _ts(CREATED + timedelta(hours=1))
+                    })
+                index += 1
+            rv += 1
+            deployment_objs.append(_deployment(ns, name, deployment_uid, replicas, unavailable, rv))
+            rv += 1
+            replicaset_objs.append(_replicaset(ns, name, template_hash, replicaset_uid, deployment_uid,
+                                               replicas, unavailable, rv))
+    return {'pods': pod_objs, 'deployments': deployment_objs, 'replicasets': replicaset_objs, 'nodes': node_objs,
+            'events': event_objs}
+
+
+def build_usage(objects, seed=42):
+    """metrics.k8s.io NodeMetrics and PodMetrics for running pods, with nodes summing their pods' usage"""
+    rng = random.Random(seed + 1)
+    node_usage = {n['metadata']['name']: [0.3, 1.5 * 1024 ** 3] for n in objects['nodes']}
+    pod_metrics = []
+    for pod in objects['pods']:
+        if pod['status']['phase'] != 'Running':
+            continue
+        containers = []
+        for c in pod['spec']['containers']:
+            cpu_m, mem_mi = rng.randint(5, 600), rng.randint(32, 900)
+            containers.append({'name': c['name'], 'usage': {'cpu': f'{cpu_m * 1000000}n', 'memory': f'{mem_mi * 1024}Ki'}})
+            usage = node_usage.get(pod['spec']['nodeName'])
+            if usage:
+                usage[0] += cpu_m / 1000
+                usage[1] += mem_mi * 1024 ** 2
+        pod_metrics.append({'metadata': {'name': pod['metadata']['name'], 'namespace': pod['metadata']['namespace']},
+                            'timestamp': _ts(CREATED), 'window': '30s', 'containers': containers})
+    node_metrics = [{'metadata': {'name': name}, 'timestamp': _ts(CREATED), 'window': '20s',
+                     'usage': {'cpu': f'{int(cpu * 1e9)}n', 'memory': f'{int(mem // 1024)}Ki'}}
+                    for name, (cpu, mem) in node_usage.items()]
+    return {'node_metrics': node_metrics, 'pod_metrics': pod_metrics}
+
+
+def pod_log(pod, container, lines, tail=None, timestamps=False):
+    """Deterministic log text for one container, about 5% of it error lines"""
+    rng = random.Random(hashlib.md5(f'{pod}/{container}'.encode()).hexdigest())
+    count = min(lines, tail) if tail else lines
+    start = CREATED + timedelta(seconds=lines - count)
+    out = []
+    for i in range(count):
+        template = rng.choice(ERROR_TEMPLATES) if rng.random() < 0.05 else rng.choice(LOG_TEMPLATES)
+        message = template.format(n=rng.randint(1, 99999), uuid=_uid(rng), hex=f'{rng.getrandbits(64):016x}')
+        if timestamps:
+            message = (start + timedelta(seconds=i)).strftime('%Y-%m-%dT%H:%M:%S.%f000Z ') + message
+        out.append(message)
+    return ('\n'.join(out) + '\n').encode()
+
+
+# path -> (kind, item name or None, subresource); namespace is captured separately
+_ROUTES = [
+    (re.compile(r'^/api/v1/(pods|nodes|events)$'), None),
+    (re.compile(r'^/api/v1/(nodes)/([^/]+)$'), 'cluster'),
+    (re.compile(r'^/apis/apps/v1/(deployments|replicasets)$'), None),
+    (re.compile(r'^/apis/metrics\.k8s\.io/v1beta1/(nodes|pods)$'), 'metrics'),
+    (re.compile(r'^/api/v1/namespaces/([^/]+)/(pods|events)(?:/([^/]+))?(?:/(log))?$'), 'namespaced'),
+    (re.compile(r'^/apis/apps/v1/namespaces/([^/]+)/(deployments|replicasets)(?:/([^/]+))?$'), 'namespaced')
+]
+
+_LIST_KINDS = {'pods': 'PodList', 'deployments': 'DeploymentList', 'replicasets': 'ReplicaSetList', 'nodes': 'NodeList', 'events': 'EventList',
+               'node_metrics': 'NodeMetricsList', 'pod_metrics': 'PodMetricsList'}
+
+
+def _match_labels(obj, selector):
+    labels = obj['metadata'].get('labels') or {}
+    for term in filter(None, selector.split(',')):
+        key, _, value = term.partition('=')
+        if labels.get(key.strip()) != value.strip():
+            return False
+    return True
+
+
+def _match_fields(obj, selector):
+    fields = {
+        'metadata.name': obj['metadata']['name'],
+        'metadata.namespace': obj['metadata'].get('namespace'),
+        'status.phase': obj.get('status', {}).get('phase'),
+        'spec.nodeName': obj.get('spec', {}).get('nodeName'),
+        'involvedObject.name': obj.get('involvedObject', {}).get('name'),
+        'involvedObject.kind': obj.get('involvedObject', {}).get('kind')
+    }
+    for term in filter(None, selector.split(',')):
+        negate = '!=' in term
+        key, value = term.split('!=' if negate else '=', 1)
+        if (fields.get(key.strip()) == value.strip()) == negate:
+            return False
+    return True
+
+
+class FakeCluster:
+    def __init__(self, objects, log_lines):
+        self.log_lines = log_lines
+        self.resource_version = str(max(int(o['metadata'].get('resourceVersion', 0)) for kind in objects.values() for o in kind)
+                                    if any(objects.values()) else 1)
+        # kind -> [(object, serialized bytes)], and (kind, namespace, name) -> index for reads
+        self.items = {kind: [(o, json.dumps(o, separators=(',', ':')).encode()) for o in objs]
+                      for kind, objs in objects.items()}
+        self.index = {(kind, o['metadata'].get('namespace'), o['metadata']['name']): (o, raw)
+                      for kind, objs in self.items.items() for o, raw in objs}
+        self.by_namespace = {}
+        for kind, objs in self.items.items():
+            for o, raw in objs:
+                self.by_namespace.setdefault((kind, o['metadata'].get('namespace')), []).append((o, raw))
+
+    def list(self, kind, namespace, query):
+        items = self.by_namespace.get((kind, namespace), []) if namespace else self.items[kind]
+        if query.get('labelSelector'):
+            items = [i for i in items if _match_labels(i[0], query['labelSelector'])]
+        if query.get('fieldSelector'):
+            items = [i for i in items if _match_fields(i[0], query['fieldSelector'])]
+        offset = int(query.get('continue') or 0)
+        limit = int(query.get('limit') or 0)
+        page = items[offset:offset + limit] if limit else items[offset:]
+        metadata = {'resourceVersion': self.resource_version}
+        if limit and offset + limit < len(items):
+            metadata['continue'] = str(offset + limit)
+            metadata['remainingItemCount'] = len(items) - offset - limit
+        api_version = {'deployments': 'apps/v1', 'replicasets': 'apps/v1', 'node_metrics': 'metrics.k8s.io/v1beta1',
+                       'pod_metrics': 'metrics.k8s.io/v1beta1'}.get(kind, 'v1')
+        head = json.dumps({'kind': _LIST_KINDS[kind], 'apiVersion': api_version,
+                           'metadata': metadata}, separators=(',', ':'))
+        return head[:-1].encode() + b',"items":[' + b','.join(raw for _, raw in page) + b']}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    cluster = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self, path):
+        self._send(404, json.dumps({'kind': 'Status', 'apiVersion': 'v1', 'status': 'Failure', 'reason': 'NotFound',
+                                    'message': f'{path} not found', 'code': 404}).encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        for regex, scope in _ROUTES:
+            match = regex.match(url.path)
+            if not match:
+                continue
+            if scope == 'metrics':
+                return self._send(200, self.cluster.list(match.group(1)[:-1] + '_metrics', None, query))
+            if scope is None:
+                namespace, kind, name, sub = None, match.group(1), None, None
+            elif scope == 'cluster':
+                namespace, kind, name, sub = None, match.group(1), match.group(2), None
+            else:
+                groups = match.groups() + (None,) * (4 - len(match.groups()))
+                namespace, kind, name, sub = groups
+            if query.get('watch') in ('true', '1'):
+                # Nothing changes in the synthetic cluster, so every watch ends empty
+                return self._send(200, b'')
+            if name is None:
+                return self._send(200, self.cluster.list(kind, namespace, query))
+            found = self.cluster.index.get((kind, namespace, name))
+            if found is None:
+                return self._not_found(url.path)
+            if sub == 'log':
+                container = query.get('container') or found[0]['spec']['containers'][0]['name']
+                tail = int(query['tailLines']) if query.get('tailLines') else None
+                return self._send(200, pod_log(name, container, self.cluster.log_lines, tail,
+                                               query.get('timestamps') == 'true'), 'text/plain')
+            return self._send(200, found[1])
+        self._not_found(url.path)
+
+
+def serve(pods, namespaces, nodes, log_lines, seed=42, host='127.0.0.1', port=0):
+    objects = build_cluster(pods, namespaces, nodes, seed)
+    objects.update(build_usage(objects, seed))
+    Handler.cluster = FakeCluster(objects, log_lines)
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--pods', type=int, default=500)
+    parser.add_argument('--namespaces', type=int, default=10)
+    parser.add_argument('--nodes', type=int, default=20)
+    parser.add_argument('--log-lines', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--port', type=int, default=0)
+    args = parser.parse_args()
+
+    server = serve(args.pods, args.namespaces, args.nodes, args.log_lines, args.seed, port=args.port)
+    print(json.dumps({'url': f'http://127.0.0.1:{server.server_address[1]}',
+                      'pods': len(Handler.cluster.items['pods'])}), flush=True)
+    server.serve_forever()
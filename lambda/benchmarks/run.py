@@ -0,0 +1,312 @@
+"""Offline benchmark harness for the MCP server tools.
+
+Starts the fake Kubernetes API server (fake_k8s.py) with a synthetic cluster,
+answers AWS calls in process (fake_aws.py), then drives index.handler with
+Bedrock action-group events and records cold start, per-tool latency, peak
+Python memory and response size. Results are compared against baseline.json;
+a regression past the tolerance exits non-zero.
+
+    python run.py --profile small
+    python run.py --profile large --iterations 3
+    python run.py --profile small --update-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MCP_SERVER = os.path.join(os.path.dirname(HERE), 'mcp-server')
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+
+PROFILES = {
+    'small': {'pods': 500, 'namespaces': 10, 'nodes': 20, 'log_lines': 1000, 's3_objects': 100000, 's3_partitions': 100},
+    'large': {'pods': 10000, 'namespaces': 50, 'nodes': 400, 'log_lines': 5000, 's3_objects': 10000000,
+              's3_partitions': 1000}
+}
+
+CLUSTER_NAME = 'benchmark'
+BUCKET = 'benchmark-bronze'
+NAMESPACE = 'ns-000'
+DEPLOYMENT = 'ns-000-app-000'
+NODE = 'ip-10-0-0-0.us-gov-west-1.compute.internal'
+
+# name -> (action group, api path, parameters)
+SCENARIOS = {
+    'kubectl_get_namespace': ('kubernetes-operations', '/kubectl/get', {'resource': 'pods', 'namespace': NAMESPACE}),
+    'kubectl_get_paged': ('kubernetes-operations', '/kubectl/get',
+                          {'resource': 'pods', 'namespace': NAMESPACE, 'limit': '100'}),
+    'pod_health_cluster': ('kubernetes-operations', '/kubectl/pod-health', {}),
+    'pod_health_cluster_uncached': ('kubernetes-operations', '/kubectl/pod-health', {'use_cache': 'false'}),
+    'probe_logs_deployment': ('kubernetes-operations', '/kubectl/probe-logs',
+                              {'namespace': NAMESPACE, 'deployment_name': DEPLOYMENT}),
+    'node_resources': ('kubernetes-operations', '/kubectl/node-resources', {}),
+    'describe_deployment': ('kubernetes-operations', '/kubectl/describe',
+                            {'resource': 'deployment', 'name': DEPLOYMENT, 'namespace': NAMESPACE}),
+    'describe_node': ('kubernetes-operations', '/kubectl/describe', {'resource': 'node', 'name': NODE}),
+    's3_count_metrics': ('aws-operations', '/s3/get-object-count', {'bucket': BUCKET}),
+    's3_count_exact': ('aws-operations', '/s3/get-object-count', {'bucket': BUCKET, 'exact': 'true', 'use_cache': 'false'})
+}
+
+# metric -> (allowed relative increase, absolute noise floor); None uses --tolerance
+THRESHOLDS = {
+    'first_ms': (None, 5.0),
+    'p50_ms': (None, 5.0),
+    'peak_mb': (0.2, 1.0),
+    'payload_bytes': (0.05, 64),
+    'aws_calls': (0, 0),
+    'k8s_calls': (0, 0)
+}
+
+
+def configure_environment(k8s_url):
+    os.environ.update({
+        'AWS_REGION': 'us-gov-west-1',
+        'CLUSTER_NAME': CLUSTER_NAME,
+        'AWS_ACCESS_KEY_ID': 'AKIABENCHMARK000000',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        # Anything without a stand-in fails fast instead of reaching AWS
+        'AWS_ENDPOINT_URL': 'http://127.0.0.1:9',
+        'AWS_EC2_METADATA_DISABLED': 'true',
+        'BENCHMARK_K8S_URL': k8s_url
+    })
+    os.environ.pop('AWS_PROFILE', None)
+    os.environ.pop('AWS_SESSION_TOKEN', None)
+    if MCP_SERVER not in sys.path:
+        sys.path.insert(0, MCP_SERVER)
+
+
+def install_fakes(size):
+    import bootstrap
+    import fake_aws
+    bucket = fake_aws.SyntheticBucket(BUCKET, size['s3_objects'], size['s3_partitions'])
+    fake_aws.install(bootstrap.aws_session(), os.environ['BENCHMARK_K8S_URL'], bucket)
+
+
+def bedrock_event(action_group, api_path, params):
+    return {
+        'messageVersion': '1.0',
+        'actionGroup': action_group,
+        'apiPath': api_path,
+        'httpMethod': 'POST',
+        'parameters': [{'name': k, 'type': 'string', 'value': v} for k, v in params.items()]
+    }
+
+
+def invoke(handler, event):
+    """Call the handler with its log output captured; returns (seconds, body, EMF record)"""
+    captured = io.StringIO()
+    with contextlib.redirect_stdout(captured):
+        start = time.perf_counter()
+        response = handler(event, None)
+        elapsed = time.perf_counter() - start
+    body = response['response']['responseBody']['application/json']['body']
+    emf = None
+    for line in captured.getvalue().splitlines():
+        if line.startswith('{') and '"_aws"' in line:
+            emf = json.loads(line)
+    status = response['response']['httpStatusCode']
+    if status != 200 or '"error"' in body[:200]:
+        raise RuntimeError(f"{event['apiPath']} failed with {status}: {body[:500]}")
+    return elapsed, body, emf
+
+
+def start_fake_k8s(size, seed):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'fake_k8s.py'), '--pods', str(size['pods']),
+         '--namespaces', str(size['namespaces']), '--nodes', str(size['nodes']),
+         '--log-lines', str(size['log_lines']), '--seed', str(seed)],
+        stdout=subprocess.PIPE, text=True)
+    ready = json.loads(process.stdout.readline())
+    return process, ready['url']
+
+
+def cold_start_child(size):
+    """Runs in a fresh interpreter: time the first import and the first invocation"""
+    start = time.perf_counter()
+    import index
+    imported = time.perf_counter()
+    install_fakes(size)
+    action_group, api_path, params = SCENARIOS['kubectl_get_namespace']
+    captured = io.StringIO()
+    with contextlib.redirect_stdout(captured):
+        first = time.perf_counter()
+        index.handler(bedrock_event(action_group, api_path, params), None)
+        done = time.perf_counter()
+    timing = next(json.loads(line) for line in captured.getvalue().splitlines()
+                  if '"mcp_invocation_timing"' in line)
+    print(json.dumps({
+        'import_ms': round((imported - start) * 1000, 2),
+        'first_invocation_ms': round((done - first) * 1000, 2),
+        'total_ms': round((imported - start + done - first) * 1000, 2),
+        'bootstrap_ms': timing['bootstrap_ms']
+    }))
+
+
+def measure_cold_starts(size, repeats):
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--cold-start-child', '--size', json.dumps(size)],
+            capture_output=True, text=True, check=True, env=os.environ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'total_ms': round(statistics.median(r['total_ms'] for r in runs), 2),
+        'import_ms': round(statistics.median(r['import_ms'] for r in runs), 2),
+        'first_invocation_ms': round(statistics.median(r['first_invocation_ms'] for r in runs), 2),
+        'bootstrap_ms': runs[-1]['bootstrap_ms']
+    }
+
+
+def measure_scenario(index, bootstrap, name, iterations):
+    action_group, api_path, params = SCENARIOS[name]
+    event = bedrock_event(action_group, api_path, params)
+
+    # Peak memory of a cold-cache call; tracemalloc slows the call, so it is not timed
+    bootstrap.clear_caches()
+    tracemalloc.start()
+    try:
+        _, body, emf = invoke(index.handler, event)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    bootstrap.clear_caches()
+    first, _, _ = invoke(index.handler, event)
+    warm = [invoke(index.handler, event)[0] for _ in range(iterations)]
+    return {
+        'first_ms': round(first * 1000, 2),
+        'p50_ms': round(statistics.median(warm) * 1000, 2),
+        'p95_ms': round(sorted(warm)[max(0, -(-len(warm) * 95 // 100) - 1)] * 1000, 2),
+        'min_ms': round(min(warm) * 1000, 2),
+        'peak_mb': round(peak / 1048576, 2),
+        'payload_bytes': len(body),
+        'aws_calls': emf['AwsApiCalls'] if emf else None,
+        'k8s_calls': emf['KubernetesApiCalls'] if emf else None
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Return human-readable regressions of current results against the stored baseline"""
+    regressions = []
+    checks = [('cold_start', 'total_ms', current['cold_start'], baseline.get('cold_start', {}), (None, 20.0))]
+    for name, result in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base:
+            checks.extend((name, metric, result, base, THRESHOLDS[metric]) for metric in THRESHOLDS)
+    for name, metric, result, base, (allowed, floor) in checks:
+        now, before = result.get(metric), base.get(metric)
+        if now is None or before is None:
+            continue
+        if now > before * (1 + (tolerance if allowed is None else allowed)) and now - before > floor:
+            regressions.append(f'{name}.{metric}: {before} -> {now} (+{(now - before) / before * 100 if before else 100:.0f}%)')
+    return regressions
+
+
+def print_table(results, baseline):
+    scenarios = baseline.get('scenarios', {})
+    print(f"\ncold start: {results['cold_start']['total_ms']} ms "
+          f"(import {results['cold_start']['import_ms']} ms, first invocation {results['cold_start']['first_invocation_ms']} ms)")
+    print(f"{'scenario':32} {'first_ms':>10} {'p50_ms':>10} {'p95_ms':>10} {'peak_mb':>9} {'bytes':>10} "
+          f"{'aws':>6} {'k8s':>6} {'p50 vs base':>12}")
+    for name, r in results['scenarios'].items():
+        base = scenarios.get(name, {}).get('p50_ms')
+        delta = f"{(r['p50_ms'] - base) / base * 100:+.0f}%" if base else '-'
+        print(f"{name:32} {r['first_ms']:>10} {r['p50_ms']:>10} {r['p95_ms']:>10} {r['peak_mb']:>9} "
+              f"{r['payload_bytes']:>10} {str(r['aws_calls']):>6} {str(r['k8s_calls']):>6} {delta:>12}")
+    print(f"max rss: {results['process']['max_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline MCP tool benchmarks against local stand-ins')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    for key in PROFILES['small']:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, help=f'override the profile {key}')
+    parser.add_argument('--scenarios', help='comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=5, help='warm calls per scenario')
+    parser.add_argument('--cold-starts', type=int, default=3, help='fresh interpreters for the cold start median')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative latency increase')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', help='also write the results JSON here')
+    parser.add_argument('--cold-start-child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--size', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_child:
+        sys.path.insert(0, MCP_SERVER)
+        return cold_start_child(json.loads(args.size))
+
+    size = dict(PROFILES[args.profile])
+    size.update({k: getattr(args, k) for k in size if getattr(args, k) is not None})
+    names = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    process, k8s_url = start_fake_k8s(size, args.seed)
+    try:
+        configure_environment(k8s_url)
+        cold_start = measure_cold_starts(size, args.cold_starts)
+
+        import bootstrap
+        import index
+        install_fakes(size)
+        # Cluster bootstrap belongs to the cold start; keep it out of the first scenario
+        bootstrap.k8s_api_client()
+        results = {
+            'profile': args.profile,
+            'size': size,
+            'environment': {'python': platform.python_version(), 'machine': platform.machine()},
+            'cold_start': cold_start,
+            'scenarios': {}
+        }
+        for name in names:
+            results['scenarios'][name] = measure_scenario(index, bootstrap, name, args.iterations)
+        results['process'] = {'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    finally:
+        process.terminate()
+        process.wait()
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    # A baseline only applies to runs of the same cluster size
+    baseline = baselines.get(args.profile, {})
+    if baseline.get('size') != size:
+        baseline = {}
+
+    print_table(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baselines[args.profile] = results
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'baseline for {args.profile} written to {args.baseline}')
+        return 0
+
+    if not baseline:
+        print(f'no baseline for {args.profile} at this size; run with --update-baseline to record one')
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Buffered SNS alerting: fingerprint dedup, per-topic token buckets and publish_batch delivery"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import bootstrap
+from ttl_cache import TTLCache
+
+BATCH_ENTRIES = 10
+# publish_batch caps the whole request at 256 KB; keep headroom for attributes and the envelope
+BATCH_BYTES = 240 * 1024
+MAX_MESSAGE_BYTES = 16 * 1024
+SUBJECT_LIMIT = 100
+# Lower sorts first: the most severe alerts get the tokens when a topic is rate limited
+SEVERITY_ORDER = {'CRITICAL': 0, 'HIGH': 1, 'ERROR': 2, 'WARNING': 3, 'MEDIUM': 4, 'INFO': 5, 'LOW': 6}
+
+RATE_PER_MINUTE = float(os.environ.get('ALERT_RATE_PER_MINUTE', 10))
+BURST = float(os.environ.get('ALERT_BURST', 20))
+DEDUP_WINDOW_SECONDS = float(os.environ.get('ALERT_DEDUP_WINDOW_SECONDS', 300))
+SUMMARY_INTERVAL_SECONDS = float(os.environ.get('ALERT_SUMMARY_INTERVAL_SECONDS', 60))
+
+
+def fingerprint(cluster, subject, severity):
+    return hashlib.sha1(f'{cluster}|{subject}|{severity}'.encode('utf-8')).hexdigest()[:16]
+
+
+def _encode(value):
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def _subject(severity, subject):
+    # SNS subjects are ASCII, single-line and at most 100 characters
+    text = f'[{severity}] {subject}'.encode('ascii', 'replace').decode('ascii')
+    return ' '.join(text.split())[:SUBJECT_LIMIT]
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, burst, clock=time.time):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+
+    def take(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AlertBatcher:
+    """Collects alerts across tool calls and sends them per topic with publish_batch on flush()"""
+
+    def __init__(self, sns_provider, cluster_name, rate_per_minute=RATE_PER_MINUTE, burst=BURST,
+                 dedup_window=DEDUP_WINDOW_SECONDS, summary_interval=SUMMARY_INTERVAL_SECONDS):
+        self.sns_provider = sns_provider
+        self.cluster_name = cluster_name
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.summary_interval = summary_interval
+        self._lock = threading.Lock()
+        self._recent = TTLCache(dedup_window, max_entries=2048)
+        self._pending = {}
+        self._buckets = {}
+        # topic -> suppressed alerts not yet reported in a summary
+        self._suppressed = {}
+        self._last_summary = {}
+        # Alerts the last flushes failed to deliver, reported on the next send_sns_alert reply
+        self._failures = []
+        self.stats = {'submitted': 0, 'duplicates': 0, 'suppressed': 0, 'sent': 0, 'failed': 0, 'summaries': 0,
+                      'publish_calls': 0}
+
+    def submit(self, topic_arn, subject, message, severity='INFO'):
+        """Queue an alert; returns its fingerprint and 'queued', 'duplicate' or 'suppressed'"""
+        severity = severity.upper()
+        key = fingerprint(self.cluster_name, subject, severity)
+        with self._lock:
+            self.stats['submitted'] += 1
+            pending = self._pending.setdefault(topic_arn, {})
+            if key in pending or self._recent.get((topic_arn, key)):
+                self.stats['duplicates'] += 1
+                if key in pending:
+                    pending[key]['repeats'] += 1
+                return key, 'duplicate'
+            self._recent.put((topic_arn, key), True)
+            bucket = self._buckets.setdefault(topic_arn, TokenBucket(self.rate_per_minute, self.burst))
+            if not bucket.take():
+                self.stats['suppressed'] += 1
+                rollup = self._suppressed.setdefault(topic_arn, {'count': 0, 'since': time.time(), 'severities': {},
+                                                                 'subjects': {}})
+                rollup['count'] += 1
+                rollup['severities'][severity] = rollup['severities'].get(severity, 0) + 1
+                rollup['subjects'][subject] = rollup['subjects'].get(subject, 0) + 1
+                return key, 'suppressed'
+            pending[key] = {
+                'fingerprint': key,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'severity': severity,
+                'cluster': self.cluster_name,
+                'subject': subject,
+                'message': message,
+                'repeats': 0
+            }
+            return key, 'queued'
+
+    def _summary(self, topic_arn, now):
+        """Take the topic's suppressed rollup as one alert when its summary is due"""
+        rollup = self._suppressed.get(topic_arn)
+        if not rollup or now - self._last_summary.get(topic_arn, 0) < self.summary_interval:
+            return None
+        del self._suppressed[topic_arn]
+        self._last_summary[topic_arn] = now
+        self.stats['summaries'] += 1
+        worst = min(rollup['severities'], key=lambda s: SEVERITY_ORDER.get(s, len(SEVERITY_ORDER)))
+        top = sorted(rollup['subjects'].items(), key=lambda s: s[1], reverse=True)[:10]
+        return {
+            'fingerprint': fingerprint(self.cluster_name, 'rate-limit-summary', worst),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'severity': worst,
+            'cluster': self.cluster_name,
+            'subject': f"{rollup['count']} alerts suppressed by rate limit",
+            'message': {
+                'suppressed': rollup['count'],
+                'since': datetime.fromtimestamp(rollup['since'], timezone.utc).isoformat(),
+                'by_severity': rollup['severities'],
+                'top_subjects': dict(top)
+            },
+            'repeats': 0
+        }
+
+    def _entries(self, topic_arn, alerts):
+        fifo = topic_arn.endswith('.fifo')
+        for alert in alerts:
+            body = {k: v for k, v in alert.items() if v or k == 'message'}
+            encoded = _encode(body)
+            if len(encoded.encode('utf-8')) > MAX_MESSAGE_BYTES:
+                body['message'] = str(body['message'])[:MAX_MESSAGE_BYTES // 2]
+                body['truncated'] = True
+                encoded = _encode(body)
+            entry = {
+                'Id': alert['fingerprint'],
+                'Subject': _subject(alert['severity'], alert['subject']),
+                'Message': encoded,
+                'MessageAttributes': {'severity': {'DataType': 'String', 'StringValue': alert['severity']}}
+            }
+            if fifo:
+                entry.update(MessageGroupId=self.cluster_name,
+                             MessageDeduplicationId=f"{alert['fingerprint']}-{uuid.uuid4().hex[:8]}")
+            yield entry
+
+    def _publish(self, topic_arn, entries):
+        """publish_batch in groups of up to 10 entries and 240 KB; returns (sent, failed)"""
+        sent, failed = 0, []
+        batch, size = [], 0
+        for entry in list(entries) + [None]:
+            entry_size = len(_encode(entry)) if entry else 0
+            if batch and (entry is None or len(batch) == BATCH_ENTRIES or size + entry_size > BATCH_BYTES):
+                try:
+                    response = self.sns_provider().publish_batch(TopicArn=topic_arn, PublishBatchRequestEntries=batch)
+                except Exception as e:
+                    # Only this chunk is lost; the ones already published stay counted as sent
+                    response = {'Failed': [{'Id': b['Id'], 'Code': type(e).__name__, 'Message': str(e)} for b in batch]}
+                with self._lock:
+                    self.stats['publish_calls'] += 1
+                sent += len(response.get('Successful', []))
+                failed.extend({'id': f['Id'], 'code': f.get('Code'), 'message': f.get('Message')}
+                              for f in response.get('Failed', []))
+                batch, size = [], 0
+            if entry:
+                batch.append(entry)
+                size += entry_size
+        return sent, failed
+
+    def flush(self):
+        """Send everything queued, most severe first, plus any due rate-limit summaries"""
+        now = time.time()
+        with self._lock:
+            work = {}
+            for topic_arn in set(self._pending) | set(self._suppressed):
+                alerts = sorted(self._pending.pop(topic_arn, {}).values(),
+                                key=lambda a: SEVERITY_ORDER.get(a['severity'], len(SEVERITY_ORDER)))
+                summary = self._summary(topic_arn, now)
+                if summary:
+                    alerts.append(summary)
+                if alerts:
+                    work[topic_arn] = alerts
+
+        results = {}
+        for topic_arn, alerts in work.items():
+            try:
+                sent, failed = self._publish(topic_arn, self._entries(topic_arn, alerts))
+            except Exception as e:
+                # Raised before anything was published (building the entries)
+                sent, failed = 0, [{'id': a['fingerprint'], 'code': type(e).__name__, 'message': str(e)} for a in alerts]
+            subjects = {a['fingerprint']: a['subject'] for a in alerts}
+            with self._lock:
+                self.stats['sent'] += sent
+                self.stats['failed'] += len(failed)
+                for f in failed:
+                    # A lost alert must not be dropped as a duplicate when it is raised again
+                    self._recent.pop((topic_arn, f['id']))
+                    self._failures.append(dict(f, topic=topic_arn, subject=subjects.get(f['id'])))
+            results[topic_arn] = {'alerts': len(alerts), 'sent': sent, 'failed': failed}
+        return results
+
+    def take_failures(self):
+        """Return and forget the alerts earlier flushes failed to deliver"""
+        with self._lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, pending=sum(len(p) for p in self._pending.values()),
+                        suppressed_unreported=sum(r['count'] for r in self._suppressed.values()))
+
+
+def default_batcher(cluster_name):
+    return bootstrap.shared('alert_batcher', lambda: AlertBatcher(lambda: bootstrap.aws_client('sns'), cluster_name))
+
+
+def flush_pending():
+    """Deliver alerts queued during this invocation; a no-op when nothing has used the batcher"""
+    batcher = bootstrap.existing('alert_batcher')
+    if batcher is None:
+        return None
+    results = batcher.flush()
+    if results:
+        print(json.dumps({'type': 'sns_alert_flush', 'topics': results, 'stats': batcher.get_stats()}))
+    return results
@@ -0,0 +1,183 @@
+"""Lazy, warm-container cached clients shared by the handler and MCP tools"""
+import base64
+import json
+import os
+import threading
+import time
+
+import boto3
+from kubernetes import client
+
+import instrumentation
+from eks_token import EKSTokenProvider
+from resource_cache import ResourceCache
+
+CA_CERT_PATH = '/tmp/ca.crt'
+
+# Module import happens once per execution environment, so this marks the cold start
+_container_started = time.time()
+_cold_start = True
+_lock = threading.RLock()
+_session = None
+_aws_clients = {}
+_k8s = {}
+_shared = {}
+_timings = {}
+
+
+def region():
+    return os.environ['AWS_REGION']
+
+
+def cluster_name():
+    return os.environ['CLUSTER_NAME']
+
+
+def _timed(component, build):
+    start = time.time()
+    value = build()
+    _timings[component] = round((time.time() - start) * 1000, 2)
+    return value
+
+
+def aws_session():
+    """Return the boto3 session every client and the EKS token signer share"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session(region_name=region())
+    return _session
+
+
+def aws_client(service):
+    """Return the boto3 client for a service, creating it on first use"""
+    c = _aws_clients.get(service)
+    if c is None:
+        with _lock:
+            c = _aws_clients.get(service)
+            if c is None:
+                c = _timed(f'client:{service}', lambda: aws_session().client(service))
+                c.meta.events.register('before-call', instrumentation.count_aws_call)
+                _aws_clients[service] = c
+    return c
+
+
+class _CountingApiClient(client.ApiClient):
+    """ApiClient that attributes every Kubernetes API request to the running tool"""
+
+    def call_api(self, *args, **kwargs):
+        instrumentation.count_call('k8s')
+        return super().call_api(*args, **kwargs)
+
+
+def _build_k8s_configuration():
+    cluster_info = aws_client('eks').describe_cluster(name=cluster_name())
+    cluster_cert = cluster_info['cluster']['certificateAuthority']['data']
+
+    configuration = client.Configuration()
+    configuration.host = cluster_info['cluster']['endpoint']
+    configuration.verify_ssl = True
+    configuration.ssl_ca_cert = CA_CERT_PATH
+
+    with open(CA_CERT_PATH, 'w') as f:
+        f.write(base64.b64decode(cluster_cert).decode('utf-8'))
+
+    token_provider = EKSTokenProvider(aws_session(), region(), cluster_name())
+    token_provider.attach(configuration)
+    _k8s['token_provider'] = token_provider
+
+    client.Configuration.set_default(configuration)
+    return configuration
+
+
+def k8s_api_client():
+    """Return the Kubernetes ApiClient, bootstrapping the cluster config on first use"""
+    api = _k8s.get('api_client')
+    if api is None:
+        with _lock:
+            api = _k8s.get('api_client')
+            if api is None:
+                configuration = _timed('k8s:configuration', _build_k8s_configuration)
+                api = _CountingApiClient(configuration)
+                _k8s['configuration'] = configuration
+                _k8s['api_client'] = api
+    return api
+
+
+def core_v1():
+    if 'core_v1' not in _k8s:
+        _k8s['core_v1'] = client.CoreV1Api(k8s_api_client())
+    return _k8s['core_v1']
+
+
+def apps_v1():
+    if 'apps_v1' not in _k8s:
+        _k8s['apps_v1'] = client.AppsV1Api(k8s_api_client())
+    return _k8s['apps_v1']
+
+
+def custom_objects():
+    if 'custom_objects' not in _k8s:
+        _k8s['custom_objects'] = client.CustomObjectsApi(k8s_api_client())
+    return _k8s['custom_objects']
+
+
+def shared(name, factory):
+    """Return a named object that lives for the life of the container, built on first use"""
+    if name not in _shared:
+        with _lock:
+            if name not in _shared:
+                _shared[name] = factory()
+    return _shared[name]
+
+
+def existing(name):
+    """Return a shared object if something already built it, else None"""
+    return _shared.get(name)
+
+
+def resource_cache():
+    """Return the warm-container Kubernetes LIST cache"""
+    return shared('resource_cache', lambda: ResourceCache(
+        lambda accessor: {'core_v1': core_v1, 'apps_v1': apps_v1}[accessor]()))
+
+
+def clear_caches():
+    """Drop cached results held by shared objects so the next calls take the cold path"""
+    with _lock:
+        for obj in _shared.values():
+            if hasattr(obj, 'invalidate'):
+                obj.invalidate()
+            elif hasattr(obj, 'clear'):
+                obj.clear()
+
+
+def start_invocation():
+    """Mark the start of a handler invocation and whether it is the cold one"""
+    global _cold_start
+    with _lock:
+        cold = _cold_start
+        _cold_start = False
+        _timings.clear()
+    now = time.time()
+    return {
+        'cold_start': cold,
+        'started': now,
+        'init_ms': round((now - _container_started) * 1000, 2) if cold else 0
+    }
+
+
+def report_invocation(invocation, action, api_path):
+    """Log cold-start vs. warm timing for the invocation as a single JSON line"""
+    print(json.dumps({
+        'type': 'mcp_invocation_timing',
+        'function_version': os.environ.get('AWS_LAMBDA_FUNCTION_VERSION', '$LATEST'),
+        'action_group': action,
+        'api_path': api_path,
+        'cold_start': invocation['cold_start'],
+        'init_ms': invocation['init_ms'],
+        'bootstrap_ms': dict(_timings),
+        'k8s_cache': _shared['resource_cache'].get_stats() if 'resource_cache' in _shared else None,
+        'duration_ms': round((time.time() - invocation['started']) * 1000, 2)
+    }))
@@ -0,0 +1,197 @@
+"""Columnar node capacity, request and usage figures with fleet-level aggregation"""
+from array import array
+from functools import lru_cache
+
+from kubernetes.utils import parse_quantity
+
+GIB = 1024 ** 3
+PERCENTILES = (50, 90, 99)
+# Requested share above which a node's remaining capacity in the other resource is stranded
+STRANDED_THRESHOLD = 90.0
+COLUMNS = ('alloc_cpu', 'alloc_mem', 'alloc_pods', 'req_cpu', 'req_mem', 'pods',
+           'usage_cpu', 'usage_mem', 'pod_usage_cpu', 'pod_usage_mem')
+
+
+@lru_cache(maxsize=4096)
+def quantity(value):
+    """Parse a Kubernetes quantity ('250m', '512Mi', '16') to a float; the same few strings repeat across a fleet"""
+    return float(parse_quantity(value)) if value else 0.0
+
+
+def _resources(mapping):
+    mapping = mapping or {}
+    return quantity(mapping.get('cpu')), quantity(mapping.get('memory'))
+
+
+def pod_requests(pod):
+    """Effective (cpu, memory) request: summed containers, or the largest init container if bigger"""
+    cpu = mem = 0.0
+    for c in pod.spec.containers:
+        c_cpu, c_mem = _resources(c.resources and c.resources.requests)
+        cpu += c_cpu
+        mem += c_mem
+    for c in pod.spec.init_containers or []:
+        c_cpu, c_mem = _resources(c.resources and c.resources.requests)
+        cpu, mem = max(cpu, c_cpu), max(mem, c_mem)
+    return cpu, mem
+
+
+class NodeFleet:
+    """One row per node, one array('d') per figure, so aggregates run over plain number columns"""
+
+    def __init__(self, nodes, nodegroup_label):
+        self.names = [n.metadata.name for n in nodes]
+        self.nodegroups = [(n.metadata.labels or {}).get(nodegroup_label, 'unmanaged') for n in nodes]
+        self.ready = [any(c.type == 'Ready' and c.status == 'True' for c in n.status.conditions or []) for n in nodes]
+        self.row = {name: i for i, name in enumerate(self.names)}
+        for column in COLUMNS:
+            setattr(self, column, array('d', bytes(8 * len(nodes))))
+        for i, n in enumerate(nodes):
+            allocatable = n.status.allocatable or {}
+            self.alloc_cpu[i], self.alloc_mem[i] = _resources(allocatable)
+            self.alloc_pods[i] = quantity(allocatable.get('pods'))
+        self.has_usage = False
+
+    def add_pods(self, pods):
+        """Sum requests of pods bound to a node that still hold their resources; returns pod -> node"""
+        placement = {}
+        for p in pods:
+            i = self.row.get(p.spec.node_name)
+            if i is None or p.status.phase in ('Succeeded', 'Failed'):
+                continue
+            cpu, mem = pod_requests(p)
+            self.req_cpu[i] += cpu
+            self.req_mem[i] += mem
+            self.pods[i] += 1
+            placement[(p.metadata.namespace, p.metadata.name)] = i
+        return placement
+
+    def add_node_usage(self, items):
+        """Apply metrics.k8s.io NodeMetrics items"""
+        for item in items:
+            i = self.row.get(item['metadata']['name'])
+            if i is not None:
+                self.usage_cpu[i], self.usage_mem[i] = _resources(item.get('usage'))
+                self.has_usage = True
+
+    def add_pod_usage(self, items, placement):
+        """Apply metrics.k8s.io PodMetrics items to the nodes their pods run on"""
+        for item in items:
+            i = placement.get((item['metadata'].get('namespace'), item['metadata']['name']))
+            if i is None:
+                continue
+            for c in item.get('containers', []):
+                cpu, mem = _resources(c.get('usage'))
+                self.pod_usage_cpu[i] += cpu
+                self.pod_usage_mem[i] += mem
+
+
+def _pct(part, whole):
+    return round(part / whole * 100, 1) if whole else 0.0
+
+
+def _percentiles(values):
+    """Nearest-rank percentiles and max from a single sort"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    result = {f'p{p}': round(ordered[max(0, -(-len(ordered) * p // 100) - 1)], 1) for p in PERCENTILES}
+    result['max'] = round(ordered[-1], 1)
+    return result
+
+
+def summarize(fleet, top_n=5):
+    """Fleet totals, utilization percentiles, bin-packing figures and hot/idle nodes per nodegroup"""
+    n = len(fleet.names)
+    rows = range(n)
+    cpu_req_pct = [_pct(fleet.req_cpu[i], fleet.alloc_cpu[i]) for i in rows]
+    mem_req_pct = [_pct(fleet.req_mem[i], fleet.alloc_mem[i]) for i in rows]
+    cpu_use_pct = [_pct(fleet.usage_cpu[i], fleet.alloc_cpu[i]) for i in rows]
+    mem_use_pct = [_pct(fleet.usage_mem[i], fleet.alloc_mem[i]) for i in rows]
+    # Hot/idle ranking uses real usage when metrics-server answered, requests otherwise
+    pressure = [max(a, b) for a, b in (zip(cpu_use_pct, mem_use_pct) if fleet.has_usage else zip(cpu_req_pct, mem_req_pct))]
+
+    total = {c: sum(getattr(fleet, c)) for c in COLUMNS}
+    free_cpu = [max(0.0, fleet.alloc_cpu[i] - fleet.req_cpu[i]) for i in rows]
+    free_mem = [max(0.0, fleet.alloc_mem[i] - fleet.req_mem[i]) for i in rows]
+
+    def node_view(i):
+        view = {
+            'name': fleet.names[i],
+            'cpu_requested_pct': cpu_req_pct[i],
+            'memory_requested_pct': mem_req_pct[i],
+            'pods': int(fleet.pods[i])
+        }
+        if fleet.has_usage:
+            view.update(cpu_pct=cpu_use_pct[i], memory_pct=mem_use_pct[i])
+        return view
+
+    groups = {}
+    for i in rows:
+        groups.setdefault(fleet.nodegroups[i], []).append(i)
+    nodegroups = {}
+    for name, members in sorted(groups.items()):
+        ranked = sorted(members, key=lambda i: pressure[i])
+        hot = ranked[::-1][:top_n]
+        # Small groups: a node listed as hot is not repeated as idle
+        idle = ranked[:min(top_n, len(ranked) - len(hot))]
+        group = {
+            'nodes': len(members),
+            'cpu_requested_pct': _pct(sum(fleet.req_cpu[i] for i in members), sum(fleet.alloc_cpu[i] for i in members)),
+            'memory_requested_pct': _pct(sum(fleet.req_mem[i] for i in members), sum(fleet.alloc_mem[i] for i in members)),
+            'hot': [node_view(i) for i in hot],
+            'idle': [node_view(i) for i in idle]
+        }
+        if fleet.has_usage:
+            group['cpu_pct'] = _pct(sum(fleet.usage_cpu[i] for i in members), sum(fleet.alloc_cpu[i] for i in members))
+            group['memory_pct'] = _pct(sum(fleet.usage_mem[i] for i in members), sum(fleet.alloc_mem[i] for i in members))
+        nodegroups[name] = group
+
+    summary = {
+        'nodes': n,
+        'ready_nodes': sum(fleet.ready),
+        'not_ready': [fleet.names[i] for i in rows if not fleet.ready[i]][:top_n * 4],
+        'allocatable': {
+            'cpu_cores': round(total['alloc_cpu'], 1),
+            'memory_gib': round(total['alloc_mem'] / GIB, 1),
+            'pods': int(total['alloc_pods'])
+        },
+        'requested': {
+            'cpu_cores': round(total['req_cpu'], 1),
+            'memory_gib': round(total['req_mem'] / GIB, 1),
+            'pods': int(total['pods']),
+            'cpu_pct': _pct(total['req_cpu'], total['alloc_cpu']),
+            'memory_pct': _pct(total['req_mem'], total['alloc_mem']),
+            'pods_pct': _pct(total['pods'], total['alloc_pods'])
+        },
+        'usage': None,
+        'percentiles': {
+            'cpu_requested_pct': _percentiles(cpu_req_pct),
+            'memory_requested_pct': _percentiles(mem_req_pct)
+        },
+        'bin_packing': {
+            # Unrequested capacity, and the most left on any single node (bounds the largest pod that can still schedule)
+            'free_cpu_cores': round(sum(free_cpu), 1),
+            'free_memory_gib': round(sum(free_mem) / GIB, 1),
+            'largest_free_cpu_cores': round(max(free_cpu, default=0), 2),
+            'largest_free_memory_gib': round(max(free_mem, default=0) / GIB, 2),
+            # Capacity no pod can use because the node's other resource is (nearly) fully requested
+            'stranded_cpu_cores': round(sum(free_cpu[i] for i in rows if mem_req_pct[i] >= STRANDED_THRESHOLD), 1),
+            'stranded_memory_gib': round(sum(free_mem[i] for i in rows if cpu_req_pct[i] >= STRANDED_THRESHOLD) / GIB, 1)
+        },
+        'nodegroups': nodegroups
+    }
+    if fleet.has_usage:
+        summary['usage'] = {
+            'cpu_cores': round(total['usage_cpu'], 1),
+            'memory_gib': round(total['usage_mem'] / GIB, 1),
+            'cpu_pct': _pct(total['usage_cpu'], total['alloc_cpu']),
+            'memory_pct': _pct(total['usage_mem'], total['alloc_mem'])
+        }
+        summary['percentiles'].update(cpu_pct=_percentiles(cpu_use_pct), memory_pct=_percentiles(mem_use_pct))
+        # Share of requested resources pods actually use; low values mean over-sized requests waste capacity
+        summary['bin_packing'].update(
+            cpu_request_efficiency_pct=_pct(total['pod_usage_cpu'], total['req_cpu']),
+            memory_request_efficiency_pct=_pct(total['pod_usage_mem'], total['req_mem'])
+        )
+    return summary
@@ -0,0 +1,220 @@
+"""GuardDuty findings reader with a cached detector id, server-side filters and an incremental detail cache"""
+import os
+import threading
+import time
+from datetime import datetime
+
+from instrumentation import ContextThreadPoolExecutor
+from ttl_cache import TTLCache
+
+GET_FINDINGS_BATCH = 50
+SEVERITY_LABELS = ((7.0, 'high'), (4.0, 'medium'), (0.0, 'low'))
+
+
+def severity_label(severity):
+    return next(label for floor, label in SEVERITY_LABELS if severity >= floor)
+
+
+def _epoch_ms(timestamp):
+    return int(datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+def finding_criteria(min_severity=None, types=None, cluster_name=None, since_ms=None, include_archived=False):
+    """Build a FindingCriteria so GuardDuty filters before anything is listed"""
+    criterion = {} if include_archived else {'service.archived': {'Equals': ['false']}}
+    if min_severity:
+        criterion['severity'] = {'GreaterThanOrEqual': int(min_severity)}
+    if types:
+        criterion['type'] = {'Equals': list(types)}
+    if cluster_name:
+        criterion['resource.eksClusterDetails.name'] = {'Equals': [cluster_name]}
+    if since_ms:
+        criterion['updatedAt'] = {'GreaterThanOrEqual': since_ms}
+    return {'Criterion': criterion}
+
+
+def resource_key(finding):
+    """(resource type, identifier) a finding is about; EKS findings resolve to the workload when known"""
+    resource = finding.get('Resource', {})
+    kind = resource.get('ResourceType', 'Unknown')
+    workload = resource.get('KubernetesDetails', {}).get('KubernetesWorkloadDetails')
+    if workload:
+        return 'KubernetesWorkload', f"{workload.get('Type')}/{workload.get('Namespace')}/{workload.get('Name')}"
+    if kind == 'EKSCluster':
+        return kind, resource.get('EksClusterDetails', {}).get('Name')
+    if kind == 'Instance':
+        return kind, resource.get('InstanceDetails', {}).get('InstanceId')
+    if kind == 'AccessKey':
+        details = resource.get('AccessKeyDetails', {})
+        return kind, details.get('UserName') or details.get('AccessKeyId')
+    if kind == 'S3Bucket':
+        return kind, next((b.get('Name') for b in resource.get('S3BucketDetails', [])), None)
+    if kind == 'Container':
+        return kind, resource.get('ContainerDetails', {}).get('Name')
+    return kind, None
+
+
+def compact(finding):
+    service = finding.get('Service', {})
+    kind, name = resource_key(finding)
+    return {
+        'id': finding['Id'],
+        'type': finding['Type'],
+        'severity': finding['Severity'],
+        'title': finding.get('Title'),
+        'resource_type': kind,
+        'resource': name,
+        'count': service.get('Count', 1),
+        'first_seen': service.get('EventFirstSeen'),
+        'last_seen': service.get('EventLastSeen'),
+        'updated_at': finding.get('UpdatedAt')
+    }
+
+
+def rollup(findings, max_resources=25):
+    """Group findings per resource: counts, worst severity, finding types and the worst titles"""
+    resources = {}
+    for f in findings:
+        c = compact(f)
+        entry = resources.setdefault((c['resource_type'], c['resource']), {
+            'resource_type': c['resource_type'],
+            'resource': c['resource'],
+            'findings': 0,
+            'events': 0,
+            'max_severity': 0.0,
+            'types': {},
+            'last_updated': None,
+            '_top': []
+        })
+        entry['findings'] += 1
+        entry['events'] += c['count']
+        entry['max_severity'] = max(entry['max_severity'], c['severity'])
+        entry['types'][c['type']] = entry['types'].get(c['type'], 0) + 1
+        if c['updated_at'] and (entry['last_updated'] is None or c['updated_at'] > entry['last_updated']):
+            entry['last_updated'] = c['updated_at']
+        entry['_top'].append(c)
+
+    ordered = sorted(resources.values(), key=lambda r: (r['max_severity'], r['findings']), reverse=True)
+    for entry in ordered[:max_resources]:
+        top = sorted(entry.pop('_top'), key=lambda c: (c['severity'], c['updated_at'] or ''), reverse=True)[:3]
+        entry['severity_label'] = severity_label(entry['max_severity'])
+        entry['top_findings'] = [{k: c[k] for k in ('id', 'type', 'severity', 'title', 'count', 'last_seen')}
+                                 for c in top]
+    return ordered[:max_resources], len(ordered)
+
+
+class FindingsReader:
+    def __init__(self, guardduty_client, detector_ttl=None, detail_ttl=None, max_workers=4):
+        self.guardduty_client = guardduty_client
+        self.max_workers = max_workers
+        self.detectors = TTLCache(detector_ttl if detector_ttl is not None else
+                                  float(os.environ.get('GUARDDUTY_DETECTOR_TTL_SECONDS', 3600)), max_entries=4)
+        # finding id -> (updatedAt epoch ms, finding)
+        self.details = TTLCache(detail_ttl if detail_ttl is not None else
+                                float(os.environ.get('GUARDDUTY_FINDING_CACHE_TTL_SECONDS', 3600)), max_entries=5000)
+        self._lock = threading.Lock()
+        # detector id -> newest updatedAt held in the detail cache; anything updated since is refetched
+        self._watermarks = {}
+        self.stats = {'fetched': 0, 'reused': 0, 'get_calls': 0, 'list_calls': 0}
+
+    def detector_id(self):
+        detector_id = self.detectors.get('detector')
+        if detector_id is None:
+            detectors = self.guardduty_client().list_detectors()['DetectorIds']
+            if not detectors:
+                return None
+            detector_id = detectors[0]
+            self.detectors.put('detector', detector_id)
+        return detector_id
+
+    def forget_detector(self):
+        self.detectors.clear()
+
+    def list_ids(self, detector_id, criteria, max_findings=None):
+        """Page through list_findings, newest updates first, up to max_findings ids"""
+        ids = []
+        paginator = self.guardduty_client().get_paginator('list_findings')
+        pages = paginator.paginate(DetectorId=detector_id, FindingCriteria=criteria,
+                                   SortCriteria={'AttributeName': 'updatedAt', 'OrderBy': 'DESC'},
+                                   PaginationConfig={'PageSize': 50})
+        for page in pages:
+            with self._lock:
+                self.stats['list_calls'] += 1
+            ids.extend(page['FindingIds'])
+            if max_findings and len(ids) >= max_findings:
+                return ids[:max_findings], True
+        return ids, False
+
+    def _get_batch(self, detector_id, ids):
+        with self._lock:
+            self.stats['get_calls'] += 1
+        return self.guardduty_client().get_findings(DetectorId=detector_id, FindingIds=ids)['Findings']
+
+    def get(self, detector_id, ids, changed=None):
+        """Finding details for ids; cached ones are reused unless listed in changed (None refetches nothing cached)"""
+        findings, missing = {}, []
+        for finding_id in ids:
+            cached = self.details.get(finding_id)
+            if cached is None or (changed is not None and finding_id in changed):
+                missing.append(finding_id)
+            else:
+                findings[finding_id] = cached[1]
+
+        batches = [missing[i:i + GET_FINDINGS_BATCH] for i in range(0, len(missing), GET_FINDINGS_BATCH)]
+        if batches:
+            with ContextThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                for batch in pool.map(lambda b: self._get_batch(detector_id, b), batches):
+                    for f in batch:
+                        updated = _epoch_ms(f['UpdatedAt'])
+                        self.details.put(f['Id'], (updated, f))
+                        findings[f['Id']] = f
+                        with self._lock:
+                            self._watermarks[detector_id] = max(self._watermarks.get(detector_id, 0), updated)
+
+        with self._lock:
+            self.stats['fetched'] += len(missing)
+            self.stats['reused'] += len(ids) - len(missing)
+        return [findings[i] for i in ids if i in findings]
+
+    def query(self, min_severity=None, types=None, cluster_name=None, hours=None, max_findings=500,
+              include_archived=False):
+        """List every matching finding id and return (detector id, findings, truncated).
+
+        Alongside the main listing, a second listing of ids updated since the detail cache's
+        watermark tells which cached details are stale, so unchanged findings are not fetched again.
+        """
+        detector_id = self.detector_id()
+        if detector_id is None:
+            return None, [], False
+        try:
+            return (detector_id,) + self._query(detector_id, min_severity, types, cluster_name, hours, max_findings,
+                                                include_archived)
+        except self.guardduty_client().exceptions.BadRequestException:
+            # The cached detector was deleted or replaced; look it up again once
+            self.forget_detector()
+            detector_id = self.detector_id()
+            if detector_id is None:
+                return None, [], False
+            return (detector_id,) + self._query(detector_id, min_severity, types, cluster_name, hours, max_findings,
+                                                include_archived)
+
+    def _query(self, detector_id, min_severity, types, cluster_name, hours, max_findings, include_archived):
+        since_ms = int((time.time() - hours * 3600) * 1000) if hours else None
+        criteria = finding_criteria(min_severity, types, cluster_name, since_ms, include_archived)
+        watermark = self._watermarks.get(detector_id)
+
+        with ContextThreadPoolExecutor(max_workers=2) as pool:
+            listed = pool.submit(self.list_ids, detector_id, criteria, max_findings)
+            changed = None
+            if watermark:
+                stale = finding_criteria(min_severity, types, cluster_name, max(since_ms or 0, watermark),
+                                         include_archived)
+                changed = pool.submit(self.list_ids, detector_id, stale)
+            ids, truncated = listed.result()
+            changed = set(changed.result()[0]) if changed else None
+
+        return self.get(detector_id, ids, changed), truncated
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, cached_details=self.details.get_stats()['entries'])
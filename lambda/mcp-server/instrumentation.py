@@ -0,0 +1,95 @@
+"""Per-tool latency and downstream call accounting emitted as CloudWatch Embedded Metric Format"""
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+METRICS_NAMESPACE = os.environ.get('MCP_METRICS_NAMESPACE', 'EKS/MCPServer')
+
+_current = contextvars.ContextVar('mcp_tool_invocation', default=None)
+
+
+class ToolInvocation:
+    def __init__(self, tool):
+        self.tool = tool
+        self.started = time.time()
+        self.aws_calls = 0
+        self.k8s_calls = 0
+        self.response_bytes = 0
+        # Full size of a result cut down to the response budget, 0 when it was returned whole
+        self.offloaded_bytes = 0
+        self.error_class = None
+        self._lock = threading.Lock()
+
+    def count(self, kind):
+        with self._lock:
+            if kind == 'aws':
+                self.aws_calls += 1
+            else:
+                self.k8s_calls += 1
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose workers see the submitting thread's tool invocation"""
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def count_call(kind):
+    invocation = _current.get()
+    if invocation is not None:
+        invocation.count(kind)
+
+
+def count_aws_call(**kwargs):
+    """botocore before-call handler"""
+    count_call('aws')
+
+
+def emit(invocation):
+    latency = round((time.time() - invocation.started) * 1000, 2)
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Tool']],
+                'Metrics': [
+                    {'Name': 'Latency', 'Unit': 'Milliseconds'},
+                    {'Name': 'AwsApiCalls', 'Unit': 'Count'},
+                    {'Name': 'KubernetesApiCalls', 'Unit': 'Count'},
+                    {'Name': 'ResponseBytes', 'Unit': 'Bytes'},
+                    {'Name': 'OffloadedBytes', 'Unit': 'Bytes'},
+                    {'Name': 'Errors', 'Unit': 'Count'}
+                ]
+            }]
+        },
+        'Tool': invocation.tool,
+        'Latency': latency,
+        'AwsApiCalls': invocation.aws_calls,
+        'KubernetesApiCalls': invocation.k8s_calls,
+        'ResponseBytes': invocation.response_bytes,
+        'OffloadedBytes': invocation.offloaded_bytes,
+        'Errors': 1 if invocation.error_class else 0,
+        'ErrorClass': invocation.error_class,
+        'FunctionVersion': os.environ.get('AWS_LAMBDA_FUNCTION_VERSION', '$LATEST')
+    }))
+
+
+@contextmanager
+def track(tool):
+    """Attribute downstream calls made in this context to the tool and emit one EMF record"""
+    invocation = ToolInvocation(tool)
+    token = _current.set(invocation)
+    try:
+        yield invocation
+    except Exception as e:
+        invocation.error_class = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        emit(invocation)
@@ -0,0 +1,82 @@
+"""Streaming log scanning helpers: one compiled matcher and error signature aggregation"""
+import re
+import threading
+
+# Volatile tokens replaced before grouping lines into signatures
+_NORMALIZERS = [
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I), '<uuid>'),
+    (re.compile(r'\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'), '<ts>'),
+    (re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b'), '<ip>'),
+    (re.compile(r'\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b', re.I), '<hex>'),
+    (re.compile(r'\d+'), '<n>')
+]
+
+
+def compile_matcher(patterns, use_regex=False):
+    """Combine every pattern into a single alternation so each line is scanned once"""
+    parts = [p if use_regex else re.escape(p) for p in patterns]
+    return re.compile('|'.join(f'(?:{p})' for p in parts))
+
+
+def signature(message, max_length=200):
+    for regex, replacement in _NORMALIZERS:
+        message = regex.sub(replacement, message)
+    return message[:max_length]
+
+
+def iter_lines(response, chunk_size=65536):
+    """Yield decoded lines from a streaming urllib3 response without loading it whole"""
+    pending = b''
+    try:
+        for chunk in response.stream(chunk_size, decode_content=True):
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode('utf-8', errors='replace')
+        if pending:
+            yield pending.decode('utf-8', errors='replace')
+    finally:
+        response.release_conn()
+
+
+def split_timestamp(line):
+    """Split the RFC3339 prefix added by timestamps=True from the log message"""
+    ts, sep, message = line.partition(' ')
+    return (ts, message) if sep and ts[:4].isdigit() else (None, line)
+
+
+class SignatureAggregator:
+    def __init__(self, max_pods_per_signature=10):
+        self.max_pods_per_signature = max_pods_per_signature
+        self._lock = threading.Lock()
+        self.signatures = {}
+        self.error_count = 0
+
+    def add(self, pod, container, timestamp, message):
+        sig = signature(message)
+        with self._lock:
+            self.error_count += 1
+            entry = self.signatures.get(sig)
+            if entry is None:
+                entry = self.signatures[sig] = {
+                    'signature': sig,
+                    'sample': message[:500],
+                    'count': 0,
+                    'first_seen': timestamp,
+                    'last_seen': timestamp,
+                    'pods': []
+                }
+            entry['count'] += 1
+            if timestamp:
+                # RFC3339 UTC timestamps order correctly as strings to the second
+                if not entry['first_seen'] or timestamp < entry['first_seen']:
+                    entry['first_seen'] = timestamp
+                if not entry['last_seen'] or timestamp > entry['last_seen']:
+                    entry['last_seen'] = timestamp
+            source = f'{pod}/{container}'
+            if source not in entry['pods'] and len(entry['pods']) < self.max_pods_per_signature:
+                entry['pods'].append(source)
+
+    def top(self, limit):
+        return sorted(self.signatures.values(), key=lambda e: e['count'], reverse=True)[:limit]
@@ -0,0 +1,90 @@
+"""CloudWatch Logs Insights runner with polling, resumable queries and a result cache"""
+import os
+import re
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+TERMINAL_STATUSES = ('Complete', 'Failed', 'Cancelled', 'Timeout')
+
+
+def _rows(results):
+    return [{f['field']: f['value'] for f in row if f['field'] != '@ptr'} for row in results]
+
+
+class InsightsQueryRunner:
+    def __init__(self, logs_client, cache_ttl=None, window_granularity=60):
+        self.logs_client = logs_client
+        self.window_granularity = window_granularity
+        self.cache = TTLCache(cache_ttl if cache_ttl is not None else
+                              float(os.environ.get('LOGS_INSIGHTS_CACHE_TTL_SECONDS', 60)))
+        self._lock = threading.Lock()
+        # query id -> cache key, so resumed queries land in the cache once complete
+        self._pending = {}
+
+    def _cache_key(self, query, log_groups, start_time, end_time):
+        # Windows are aligned to the granularity so repeated agent turns share results
+        g = self.window_granularity
+        return (re.sub(r'\s+', ' ', query.strip()), tuple(sorted(log_groups)), start_time // g, end_time // g)
+
+    def align_window(self, start_time, end_time):
+        """Floor epoch-second bounds to the cache granularity"""
+        g = self.window_granularity
+        return start_time - start_time % g, end_time - end_time % g
+
+    def _poll(self, query_id, deadline):
+        delay = 0.1
+        while True:
+            response = self.logs_client().get_query_results(queryId=query_id)
+            if response['status'] in TERMINAL_STATUSES or time.time() + delay > deadline:
+                return response
+            time.sleep(delay)
+            delay = min(delay * 1.5, 1.0)
+
+    def _result(self, query_id, response, cached=False):
+        return {
+            'query_id': query_id,
+            'status': response['status'],
+            'complete': response['status'] == 'Complete',
+            'cached': cached,
+            'statistics': response.get('statistics', {}),
+            'results': _rows(response.get('results', []))
+        }
+
+    def run(self, query, log_groups, start_time, end_time, deadline_seconds=20, limit=None):
+        """Run a query to completion or until the deadline, serving repeats from the cache.
+
+        start_time and end_time are epoch seconds. When the deadline is hit the
+        result is marked incomplete and its query_id can be passed to resume().
+        """
+        key = self._cache_key(query, log_groups, start_time, end_time)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        kwargs = {
+            'logGroupNames': list(log_groups),
+            'startTime': int(start_time),
+            'endTime': int(end_time),
+            'queryString': query
+        }
+        if limit:
+            kwargs['limit'] = limit
+        query_id = self.logs_client().start_query(**kwargs)['queryId']
+        with self._lock:
+            self._pending[query_id] = key
+            while len(self._pending) > 256:
+                self._pending.pop(next(iter(self._pending)))
+        return self.resume(query_id, deadline_seconds)
+
+    def resume(self, query_id, deadline_seconds=20):
+        """Keep polling a previously started query"""
+        response = self._poll(query_id, time.time() + deadline_seconds)
+        result = self._result(query_id, response)
+        if response['status'] in TERMINAL_STATUSES:
+            with self._lock:
+                key = self._pending.pop(query_id, None)
+            if key is not None and result['complete']:
+                self.cache.put(key, result)
+        return result
@@ -0,0 +1,78 @@
+"""Batched CloudWatch GetMetricData engine shared by every metric tool"""
+
+MAX_QUERIES_PER_CALL = 500
+
+
+def metric_query(namespace, metric, dimensions, stat, period=300, label=None):
+    """Describe one metric series; dimensions is a {name: value} dict"""
+    return {
+        'namespace': namespace,
+        'metric': metric,
+        'dimensions': dimensions or {},
+        'stat': stat,
+        'period': int(period),
+        'label': label or metric
+    }
+
+
+def _to_api(query_id, q):
+    return {
+        'Id': query_id,
+        'Label': q['label'],
+        'MetricStat': {
+            'Metric': {
+                'Namespace': q['namespace'],
+                'MetricName': q['metric'],
+                'Dimensions': [{'Name': k, 'Value': v} for k, v in q['dimensions'].items()]
+            },
+            'Period': q['period'],
+            'Stat': q['stat']
+        },
+        'ReturnData': True
+    }
+
+
+def get_metric_data(cloudwatch, queries, start_time, end_time):
+    """Fetch every query with as few GetMetricData calls as possible.
+
+    Returns one result per query, in order, with an ascending [timestamp, value]
+    series plus the sum, average, max and latest value of that series.
+    """
+    series = [{'timestamps': [], 'values': [], 'status': None} for _ in queries]
+    calls = 0
+    for offset in range(0, len(queries), MAX_QUERIES_PER_CALL):
+        batch = queries[offset:offset + MAX_QUERIES_PER_CALL]
+        kwargs = {
+            'MetricDataQueries': [_to_api(f'q{offset + i}', q) for i, q in enumerate(batch)],
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'ScanBy': 'TimestampAscending'
+        }
+        while True:
+            response = cloudwatch.get_metric_data(**kwargs)
+            calls += 1
+            for result in response['MetricDataResults']:
+                s = series[int(result['Id'][1:])]
+                s['timestamps'].extend(result['Timestamps'])
+                s['values'].extend(result['Values'])
+                s['status'] = result['StatusCode']
+            if not response.get('NextToken'):
+                break
+            kwargs['NextToken'] = response['NextToken']
+
+    results = []
+    for q, s in zip(queries, series):
+        values = s['values']
+        results.append({
+            'label': q['label'],
+            'metric': q['metric'],
+            'stat': q['stat'],
+            'dimensions': q['dimensions'],
+            'status': s['status'],
+            'series': [[t.isoformat(), v] for t, v in zip(s['timestamps'], values)],
+            'sum': sum(values),
+            'average': sum(values) / len(values) if values else None,
+            'max': max(values) if values else None,
+            'latest': values[-1] if values else None
+        })
+    return {'results': results, 'api_calls': calls}
@@ -0,0 +1,256 @@
+"""Slim, JSON-safe views of Kubernetes objects built straight from the API models"""
+import log_probe
+
+
+def _iso(ts):
+    return ts.isoformat() if ts else None
+
+
+def _container_statuses(pod):
+    return (pod.status and pod.status.container_statuses) or []
+
+
+def _owner(obj):
+    refs = obj.metadata.owner_references or []
+    return f'{refs[0].kind}/{refs[0].name}' if refs else None
+
+
+def _conditions(obj):
+    return [{'type': c.type, 'status': c.status, 'reason': getattr(c, 'reason', None)}
+            for c in (obj.status and obj.status.conditions) or []]
+
+
+POD_FIELDS = {
+    'name': lambda p: p.metadata.name,
+    'namespace': lambda p: p.metadata.namespace,
+    'phase': lambda p: p.status.phase,
+    'node': lambda p: p.spec.node_name,
+    'ip': lambda p: p.status.pod_ip,
+    'ready': lambda p: f'{sum(1 for c in _container_statuses(p) if c.ready)}/{len(p.spec.containers)}',
+    'restarts': lambda p: sum(c.restart_count for c in _container_statuses(p)),
+    'images': lambda p: [c.image for c in p.spec.containers],
+    'started': lambda p: _iso(p.status.start_time),
+    'created': lambda p: _iso(p.metadata.creation_timestamp),
+    'owner': _owner,
+    'labels': lambda p: p.metadata.labels or {},
+    'conditions': _conditions,
+    'waiting_reasons': lambda p: sorted({c.state.waiting.reason for c in _container_statuses(p)
+                                         if c.state and c.state.waiting and c.state.waiting.reason}),
+    'last_termination': lambda p: [{'container': c.name, 'reason': c.last_state.terminated.reason,
+                                    'exit_code': c.last_state.terminated.exit_code}
+                                   for c in _container_statuses(p)
+                                   if c.last_state and c.last_state.terminated]
+}
+
+DEPLOYMENT_FIELDS = {
+    'name': lambda d: d.metadata.name,
+    'namespace': lambda d: d.metadata.namespace,
+    'replicas': lambda d: d.spec.replicas,
+    'ready': lambda d: d.status.ready_replicas or 0,
+    'available': lambda d: d.status.available_replicas or 0,
+    'updated': lambda d: d.status.updated_replicas or 0,
+    'unavailable': lambda d: d.status.unavailable_replicas or 0,
+    'images': lambda d: [c.image for c in d.spec.template.spec.containers],
+    'strategy': lambda d: d.spec.strategy.type if d.spec.strategy else None,
+    'selector': lambda d: d.spec.selector.match_labels or {},
+    'created': lambda d: _iso(d.metadata.creation_timestamp),
+    'labels': lambda d: d.metadata.labels or {},
+    'conditions': _conditions
+}
+
+REPLICASET_FIELDS = {
+    'name': lambda r: r.metadata.name,
+    'namespace': lambda r: r.metadata.namespace,
+    'replicas': lambda r: r.spec.replicas,
+    'ready': lambda r: r.status.ready_replicas or 0,
+    'available': lambda r: r.status.available_replicas or 0,
+    'revision': lambda r: (r.metadata.annotations or {}).get('deployment.kubernetes.io/revision'),
+    'owner': _owner,
+    'images': lambda r: [c.image for c in r.spec.template.spec.containers],
+    'created': lambda r: _iso(r.metadata.creation_timestamp),
+    'labels': lambda r: r.metadata.labels or {},
+    'conditions': _conditions
+}
+
+
+def _node_label(key):
+    return lambda n: (n.metadata.labels or {}).get(key)
+
+
+def _resource_list(values):
+    values = values or {}
+    return {k: values.get(k) for k in ('cpu', 'memory', 'pods')}
+
+
+NODE_FIELDS = {
+    'name': lambda n: n.metadata.name,
+    'ready': lambda n: next((c.status for c in n.status.conditions or [] if c.type == 'Ready'), 'Unknown'),
+    'unschedulable': lambda n: bool(n.spec.unschedulable),
+    'nodegroup': _node_label('eks.amazonaws.com/nodegroup'),
+    'instance_type': _node_label('node.kubernetes.io/instance-type'),
+    'zone': _node_label('topology.kubernetes.io/zone'),
+    'kubelet_version': lambda n: n.status.node_info.kubelet_version if n.status.node_info else None,
+    'taints': lambda n: [f'{t.key}={t.value or ""}:{t.effect}' for t in n.spec.taints or []],
+    'capacity': lambda n: _resource_list(n.status.capacity),
+    'allocatable': lambda n: _resource_list(n.status.allocatable),
+    'created': lambda n: _iso(n.metadata.creation_timestamp),
+    'labels': lambda n: n.metadata.labels or {},
+    'conditions': _conditions
+}
+
+SERVICE_FIELDS = {
+    'name': lambda s: s.metadata.name,
+    'namespace': lambda s: s.metadata.namespace,
+    'type': lambda s: s.spec.type,
+    'cluster_ip': lambda s: s.spec.cluster_ip,
+    'ports': lambda s: [f'{p.port}/{p.protocol}->{p.target_port}' for p in s.spec.ports or []],
+    'selector': lambda s: s.spec.selector or {},
+    'load_balancer': lambda s: [i.hostname or i.ip for i in (s.status.load_balancer and s.status.load_balancer.ingress) or []],
+    'created': lambda s: _iso(s.metadata.creation_timestamp),
+    'labels': lambda s: s.metadata.labels or {}
+}
+
+EVENT_FIELDS = {
+    'type': lambda e: e.type,
+    'reason': lambda e: e.reason,
+    'message': lambda e: e.message,
+    'count': lambda e: e.count or 1,
+    'object': lambda e: f'{e.involved_object.kind}/{e.involved_object.name}',
+    'first_seen': lambda e: _iso(e.first_timestamp or e.event_time or e.metadata.creation_timestamp),
+    'last_seen': lambda e: _iso(e.last_timestamp or e.event_time or e.metadata.creation_timestamp)
+}
+
+FIELDS = {
+    'pods': POD_FIELDS,
+    'deployments': DEPLOYMENT_FIELDS,
+    'replicasets': REPLICASET_FIELDS,
+    'nodes': NODE_FIELDS,
+    'services': SERVICE_FIELDS,
+    'events': EVENT_FIELDS
+}
+
+DEFAULT_FIELDS = {
+    'pods': ['name', 'phase', 'node', 'ready', 'restarts', 'images'],
+    'deployments': ['name', 'replicas', 'ready', 'available', 'updated', 'images'],
+    'replicasets': ['name', 'replicas', 'ready', 'available', 'revision', 'images'],
+    'nodes': ['name', 'ready', 'unschedulable', 'nodegroup', 'instance_type', 'zone', 'taints', 'allocatable'],
+    'services': ['name', 'type', 'cluster_ip', 'ports', 'selector', 'load_balancer'],
+    'events': list(EVENT_FIELDS)
+}
+
+
+def parse_fields(kind, fields=None):
+    """Resolve a comma-separated or list projection, rejecting unknown field names"""
+    if not fields:
+        return DEFAULT_FIELDS[kind]
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    if fields == ['all']:
+        return list(FIELDS[kind])
+    unknown = [f for f in fields if f not in FIELDS[kind]]
+    if unknown:
+        raise ValueError(f'Unknown {kind} fields {unknown}, expected any of {sorted(FIELDS[kind])}')
+    return fields
+
+
+def project(kind, obj, fields):
+    extractors = FIELDS[kind]
+    return {f: extractors[f](obj) for f in fields}
+
+
+_META = {'name': None, 'namespace': None, 'uid': None, 'labels': None, 'creation_timestamp': None,
+         'resource_version': None, 'owner_references': {'kind': None, 'name': None, 'uid': None}}
+_CONDITION = {'type': None, 'status': None, 'reason': None}
+_CONTAINER = {'name': None, 'image': None, 'resources': {'requests': None}}
+
+# Attribute paths the projections and tools read from cached LIST items; None keeps the value as is
+CACHED_ATTRIBUTES = {
+    'pods': {
+        'metadata': _META,
+        'spec': {'node_name': None, 'containers': _CONTAINER, 'init_containers': _CONTAINER},
+        'status': {'phase': None, 'pod_ip': None, 'start_time': None, 'conditions': _CONDITION,
+                   'container_statuses': {'name': None, 'ready': None, 'restart_count': None,
+                                          'state': {'waiting': {'reason': None}},
+                                          'last_state': {'terminated': {'reason': None, 'exit_code': None}}}}
+    },
+    'deployments': {
+        'metadata': _META,
+        'spec': {'replicas': None, 'selector': {'match_labels': None}, 'strategy': {'type': None},
+                 'template': {'spec': {'containers': _CONTAINER}}},
+        'status': {'ready_replicas': None, 'available_replicas': None, 'updated_replicas': None,
+                   'unavailable_replicas': None, 'conditions': _CONDITION}
+    },
+    'nodes': {
+        'metadata': _META,
+        'spec': {'unschedulable': None, 'taints': {'key': None, 'value': None, 'effect': None}},
+        'status': {'conditions': _CONDITION, 'allocatable': None, 'capacity': None,
+                   'node_info': {'kubelet_version': None}}
+    }
+}
+
+
+_SLIM_TYPES = {}
+
+
+def _slim_type(attributes):
+    """One __slots__ class per attribute set: no per-object dict"""
+    names = tuple(attributes)
+    cls = _SLIM_TYPES.get(names)
+    if cls is None:
+        def __init__(self, *values):
+            for name, value in zip(names, values):
+                setattr(self, name, value)
+        cls = _SLIM_TYPES[names] = type('Slim', (), {'__slots__': names, '__init__': __init__})
+    return cls
+
+
+def _slim(value, attributes):
+    if value is None or attributes is None:
+        return value
+    if isinstance(value, list):
+        return [_slim(v, attributes) for v in value]
+    return _slim_type(attributes)(*(_slim(getattr(value, k, None), sub) for k, sub in attributes.items()))
+
+
+def slim(kind, obj):
+    """Copy only the attributes listed in CACHED_ATTRIBUTES into small slotted objects.
+
+    A deserialized V1Pod holds every API field as a model object (~60 KB each); the copy keeps
+    what the tools read in a few KB, so a cluster-wide cache fits the Lambda's memory.
+    """
+    attributes = CACHED_ATTRIBUTES.get(kind)
+    return _slim(obj, attributes) if attributes else obj
+
+
+def group_events(events, limit=20):
+    """Collapse events into (type, reason, message shape) groups with counts, objects and time range.
+
+    Returns (groups, total_groups); Warning groups and the most recent come first.
+    """
+    groups = {}
+    for e in events:
+        obj = e.involved_object
+        message = e.message or ''
+        # The same failure on many pods differs only by the object name and volatile numbers
+        shape = log_probe.signature(message.replace(obj.name, '<object>') if obj.name else message)
+        first_seen, last_seen = EVENT_FIELDS['first_seen'](e), EVENT_FIELDS['last_seen'](e)
+        group = groups.setdefault((e.type, e.reason, shape), {
+            'type': e.type,
+            'reason': e.reason,
+            'message': message,
+            'count': 0,
+            'objects': set(),
+            'first_seen': first_seen,
+            'last_seen': last_seen
+        })
+        group['count'] += e.count or 1
+        group['objects'].add(f'{obj.kind}/{obj.name}')
+        if first_seen and (group['first_seen'] is None or first_seen < group['first_seen']):
+            group['first_seen'] = first_seen
+        if last_seen and (group['last_seen'] is None or last_seen > group['last_seen']):
+            group['last_seen'] = last_seen
+            group['message'] = message
+
+    ordered = sorted(groups.values(), key=lambda g: (g['type'] == 'Warning', g['last_seen'] or ''), reverse=True)
+    return [dict(g, objects=len(g['objects']), sample_objects=sorted(g['objects'])[:5])
+            for g in ordered[:limit]], len(ordered)
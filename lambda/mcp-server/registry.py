@@ -0,0 +1,131 @@
+"""Decorator-based registry mapping Bedrock action-group routes to MCP tool methods"""
+import inspect
+import json
+
+TOOLS = {}
+
+
+def _as_bool(value):
+    # Bedrock passes every parameter value as a string
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def _loose_value(text, pos):
+    """Parse one value of Bedrock's unquoted notation ("[{a=1, b=[x, y]}]") from pos; returns (value, end)"""
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    if pos < len(text) and text[pos] in '[{':
+        closing = ']' if text[pos] == '[' else '}'
+        items = [] if closing == ']' else {}
+        pos += 1
+        while pos < len(text) and text[pos] != closing:
+            if text[pos] in ', ':
+                pos += 1
+                continue
+            if closing == '}':
+                end = text.find('=', pos)
+                if end < 0:
+                    raise ValueError(f'Expected key=value at {pos} in {text[:200]!r}')
+                key = text[pos:end].strip().strip('"\'')
+                items[key], pos = _loose_value(text, end + 1)
+            else:
+                item, end = _loose_value(text, pos)
+                if end == pos:
+                    raise ValueError(f'Unexpected {text[pos]!r} at {pos} in {text[:200]!r}')
+                items.append(item)
+                pos = end
+        return items, pos + 1
+    end = pos
+    while end < len(text) and text[end] not in ',]}':
+        end += 1
+    return text[pos:end].strip().strip('"\''), end
+
+
+def _as_list(value):
+    # Lists arrive as JSON arrays, Bedrock's unquoted "[a, b]" / "[{k=v}]" forms or comma-separated strings
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('['):
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                if '{' in text:
+                    return _loose_value(text, 0)[0]
+                text = text[1:-1] if text.endswith(']') else text[1:]
+        value = [v.strip().strip('"\'') for v in text.split(',') if v.strip().strip('"\'')]
+    return value
+
+
+def _as_dict(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return _loose_value(value.strip(), 0)[0]
+    return value
+
+
+COERCERS = {bool: _as_bool, list: _as_list, dict: _as_dict, int: int, float: float, str: str}
+
+
+class ToolSpec:
+    def __init__(self, func, api_path, action_group, category, types, aliases):
+        self.func = func
+        self.name = func.__name__
+        self.api_path = api_path
+        self.action_group = action_group
+        self.category = category
+        self.types = types
+        self.aliases = aliases
+        self.signature = inspect.signature(func)
+        self.description = (func.__doc__ or '').strip().split('\n')[0]
+
+    def coerce(self, params):
+        """Map raw Bedrock parameters onto the method's keyword arguments"""
+        kwargs = {}
+        for name, value in params.items():
+            name = self.aliases.get(name, name)
+            if name not in self.signature.parameters or name == 'self':
+                continue
+            if name in self.types and value is not None:
+                value = COERCERS[self.types[name]](value)
+            # Empty values fall back to the method's default
+            if value is None or value == '' or value == []:
+                continue
+            kwargs[name] = value
+        return kwargs
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'action_group': self.action_group,
+            'api_path': self.api_path,
+            'description': self.description,
+            'parameters': [{
+                'name': p.name,
+                'type': self.types.get(p.name, str).__name__,
+                'required': p.default is inspect.Parameter.empty
+            } for p in self.signature.parameters.values() if p.name != 'self']
+        }
+
+
+def tool(api_path, action_group, category, types=None, aliases=None):
+    """Register an MCPTools method as the handler of an action-group route.
+
+    types maps parameter names to bool/int/float/list/dict for coercion from
+    Bedrock's string values; aliases maps accepted parameter names onto
+    argument names.
+    """
+    def decorator(func):
+        TOOLS[(action_group, api_path)] = ToolSpec(func, api_path, action_group, category, types or {}, aliases or {})
+        return func
+    return decorator
+
+
+def lookup(action_group, api_path):
+    """Find a tool by route; without an action group the first tool on the path wins"""
+    if action_group:
+        return TOOLS.get((action_group, api_path))
+    return next((spec for (_, path), spec in TOOLS.items() if path == api_path), None)
@@ -0,0 +1,160 @@
+"""Warm-container cache of Kubernetes LIST results kept fresh with short watches"""
+import os
+import threading
+import time
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+import projection
+
+# kind -> (api accessor name, namespaced list method, cluster-wide list method)
+KINDS = {
+    'pods': ('core_v1', 'list_namespaced_pod', 'list_pod_for_all_namespaces'),
+    'deployments': ('apps_v1', 'list_namespaced_deployment', 'list_deployment_for_all_namespaces'),
+    'nodes': ('core_v1', None, 'list_node')
+}
+
+
+def _env_list(name):
+    return {v.strip() for v in os.environ.get(name, '').split(',') if v.strip()}
+
+
+class ResourceCache:
+    def __init__(self, api_provider, max_staleness=None, watch_seconds=None, enabled=None, disabled_tools=None,
+                 page_size=None):
+        """api_provider maps an accessor name ('core_v1', 'apps_v1') to a Kubernetes API object"""
+        self.api_provider = api_provider
+        self.max_staleness = max_staleness if max_staleness is not None else float(
+            os.environ.get('K8S_CACHE_MAX_STALENESS_SECONDS', 15))
+        self.watch_seconds = watch_seconds if watch_seconds is not None else int(
+            os.environ.get('K8S_CACHE_WATCH_SECONDS', 1))
+        self.enabled = enabled if enabled is not None else os.environ.get('K8S_CACHE_ENABLED', 'true').lower() == 'true'
+        self.disabled_tools = disabled_tools if disabled_tools is not None else _env_list('K8S_CACHE_DISABLED_TOOLS')
+        self.page_size = page_size if page_size is not None else int(os.environ.get('K8S_LIST_PAGE_SIZE', 500))
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._key_locks = {}
+        self.stats = {'hits': 0, 'misses': 0, 'incremental_refreshes': 0, 'relists': 0, 'bypassed': 0}
+
+    def _list_call(self, kind, namespace):
+        """Return the bound list method and positional args; Watch needs the real method to find its return type"""
+        accessor, namespaced, cluster_wide = KINDS[kind]
+        api = self.api_provider(accessor)
+        if namespace and namespaced:
+            return getattr(api, namespaced), (namespace,)
+        return getattr(api, cluster_wide), ()
+
+    def _pages(self, kind, namespace):
+        """LIST in pages of page_size; yields (items, resourceVersion of the list)"""
+        method, args = self._list_call(kind, namespace)
+        kwargs = {'limit': self.page_size}
+        while True:
+            result = method(*args, **kwargs)
+            yield result.items, result.metadata.resource_version
+            if not result.metadata._continue:
+                return
+            kwargs['_continue'] = result.metadata._continue
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _relist_pages(self, kind, namespace, entry):
+        """Fill entry page by page with slim copies of the items, yielding each page as it is added"""
+        for page, version in self._pages(kind, namespace):
+            # Continuation pages are served from the first page's snapshot
+            entry['resource_version'] = entry['resource_version'] or version
+            page = [projection.slim(kind, i) for i in page]
+            entry['items'].update(((i.metadata.namespace, i.metadata.name), i) for i in page)
+            yield page
+        entry['refreshed_at'] = time.time()
+
+    def _relist(self, kind, namespace):
+        entry = {'items': {}, 'resource_version': None}
+        for _ in self._relist_pages(kind, namespace, entry):
+            pass
+        return entry
+
+    def _watch_from(self, kind, namespace, entry):
+        """Apply changes since the entry's resourceVersion, returning False when it expired"""
+        method, args = self._list_call(kind, namespace)
+        w = watch.Watch()
+        try:
+            for event in w.stream(
+                method,
+                *args,
+                resource_version=entry['resource_version'],
+                timeout_seconds=self.watch_seconds,
+                allow_watch_bookmarks=True,
+                _request_timeout=self.watch_seconds + 5
+            ):
+                obj = event['object']
+                key = (obj.metadata.namespace, obj.metadata.name)
+                if event['type'] == 'DELETED':
+                    entry['items'].pop(key, None)
+                elif event['type'] in ('ADDED', 'MODIFIED'):
+                    entry['items'][key] = projection.slim(kind, obj)
+                entry['resource_version'] = obj.metadata.resource_version
+        except ApiException as e:
+            if e.status == 410:
+                return False
+            raise
+        finally:
+            w.stop()
+        entry['refreshed_at'] = time.time()
+        return True
+
+    def bypassed(self, tool=None, use_cache=True):
+        return not self.enabled or not use_cache or tool in self.disabled_tools
+
+    def pages(self, kind, namespace=None, tool=None, use_cache=True):
+        """Yield the items of a LIST in pages, served from cache within the staleness bound.
+
+        Cached entries hold slim copies (projection.slim) and a cold one is filled and handed out
+        page by page; a bypassed read streams the API pages without keeping them. Neither holds a
+        whole LIST response at once.
+        """
+        if self.bypassed(tool, use_cache):
+            self._count('bypassed')
+            for page, _ in self._pages(kind, namespace):
+                yield page
+            return
+
+        key = (kind, namespace or None)
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count('misses')
+                # Pages go to the caller as they are listed; the entry is stored only once complete
+                entry = {'items': {}, 'resource_version': None}
+                yield from self._relist_pages(kind, namespace, entry)
+                self._entries[key] = entry
+                return
+            if time.time() - entry['refreshed_at'] > self.max_staleness:
+                self._count('incremental_refreshes')
+                if not self._watch_from(kind, namespace, entry):
+                    self._count('relists')
+                    entry = self._relist(kind, namespace)
+            else:
+                self._count('hits')
+            self._entries[key] = entry
+            items = list(entry['items'].values())
+        yield items
+
+    def list(self, kind, namespace=None, tool=None, use_cache=True):
+        """Return every item of a LIST, see pages()"""
+        return [i for page in self.pages(kind, namespace, tool, use_cache) for i in page]
+
+    def invalidate(self, kind=None):
+        with self._lock:
+            for key in [k for k in self._entries if kind is None or k[0] == kind]:
+                del self._entries[key]
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries))
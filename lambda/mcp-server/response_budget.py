@@ -0,0 +1,188 @@
+"""Compact JSON encoding and size budgeting for action-group replies, with oversized results offloaded for paging"""
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import bootstrap
+from ttl_cache import TTLCache
+
+# Bedrock rejects action-group response bodies over 25 KB; leave room for the envelope
+BUDGET_BYTES = int(os.environ.get('RESPONSE_BUDGET_BYTES', 20000))
+RESULT_TTL_SECONDS = int(os.environ.get('RESULT_STORE_TTL_SECONDS', 900))
+PAGE_TOOL = '/results/page'
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if hasattr(obj, 'openapi_types'):
+        # Kubernetes models: camelCase keys, None fields dropped, nested dates as ISO strings
+        return bootstrap.k8s_api_client().sanitize_for_serialization(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def encode(value):
+    return json.dumps(value, separators=(',', ':'), default=_default)
+
+
+class MemoryResultStore:
+    """Keeps offloaded results in the warm container; a follow-up routed to another container misses"""
+
+    def __init__(self, ttl=RESULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._cache = TTLCache(ttl, max_entries=32)
+
+    def put(self, handle, payload):
+        self._cache.put(handle, payload)
+
+    def get(self, handle):
+        return self._cache.get(handle)
+
+
+class S3ResultStore:
+    """Keeps offloaded results in S3 so any container can serve the follow-up pages"""
+
+    def __init__(self, s3_provider, bucket, prefix='mcp-results/', ttl=RESULT_TTL_SECONDS):
+        self.s3_provider = s3_provider
+        self.bucket = bucket
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def put(self, handle, payload):
+        self.s3_provider().put_object(
+            Bucket=self.bucket, Key=f'{self.prefix}{handle}.json', Body=payload.encode('utf-8'),
+            ContentType='application/json', Metadata={'expires-at': str(int(time.time() + self.ttl))})
+
+    def get(self, handle):
+        try:
+            obj = self.s3_provider().get_object(Bucket=self.bucket, Key=f'{self.prefix}{handle}.json')
+        except self.s3_provider().exceptions.NoSuchKey:
+            return None
+        # The bucket lifecycle rule deletes objects only daily, so expiry is enforced on read
+        if int(obj['Metadata'].get('expires-at', 0)) < time.time():
+            return None
+        return obj['Body'].read().decode('utf-8')
+
+
+def _largest_field(result):
+    """Return the key of the biggest list or dict in a top-level dict, '' for a top-level list, or None"""
+    if isinstance(result, list):
+        return ''
+    if not isinstance(result, dict):
+        return None
+    sizes = {k: len(encode(v)) for k, v in result.items() if isinstance(v, (list, dict)) and v}
+    return max(sizes, key=sizes.get) if sizes else None
+
+
+def _items(collection):
+    return list(collection.items()) if isinstance(collection, dict) else collection
+
+
+def _rebuild(original, items):
+    return dict(items) if isinstance(original, dict) else items
+
+
+def _fit(items, base_size, budget):
+    """Number of leading items whose encodings fit next to base_size; items arrive ranked by the tools"""
+    used = base_size
+    for count, item in enumerate(items):
+        used += len(encode(item)) + 1
+        if used > budget:
+            return count
+    return len(items)
+
+
+class ResponseBudget:
+    def __init__(self, store, budget=BUDGET_BYTES):
+        self.store = store
+        self.budget = budget
+
+    def render(self, result):
+        """Serialize a tool result; over budget, return the leading items plus a continuation handle.
+
+        Returns (body, offloaded_bytes) where offloaded_bytes is the full size when the result was cut.
+        """
+        body = encode(result)
+        if len(body) <= self.budget:
+            return body, 0
+
+        handle = uuid.uuid4().hex
+        field = _largest_field(result)
+        if field is not None:
+            collection = result if field == '' else result[field]
+            items = _items(collection)
+            key = 'items' if field == '' else field
+            summary = dict({} if field == '' else result, **{key: _rebuild(collection, [])})
+            summary['_continuation'] = self._continuation(handle, field, len(items))
+            count = _fit(items, len(encode(summary)) + 16, self.budget)
+            if count:
+                self.store.put(handle, json.dumps({'field': field, 'body': body}))
+                summary[key] = _rebuild(collection, items[:count])
+                summary['_continuation'].update(returned=count, next_offset=count if count < len(items) else None)
+                return encode(summary), len(body)
+
+        # Nothing list-shaped to cut, or the rest of the result alone is too big: page the raw JSON text
+        self.store.put(handle, json.dumps({'field': None, 'body': body}))
+        chunk = self._text_chunk()
+        summary = {'text': body[:chunk], '_continuation': dict(self._continuation(handle, None, len(body)),
+                                                               returned=chunk, next_offset=chunk)}
+        return encode(summary), len(body)
+
+    def _text_chunk(self):
+        # JSON-escaping the slice can grow it; keep well under the budget
+        return self.budget // 2
+
+    def _continuation(self, handle, field, total):
+        return {
+            'handle': handle,
+            'field': field,
+            'total': total,
+            'returned': 0,
+            'next_offset': 0,
+            'expires_in_seconds': self.store.ttl,
+            'page_with': PAGE_TOOL,
+            'note': 'Result exceeded the response size limit; call page_with with handle and next_offset for more'
+        }
+
+    def page(self, handle, offset=0, limit=None):
+        """Return the next slice of an offloaded result that fits the budget"""
+        stored = self.store.get(handle)
+        if stored is None:
+            return {'error': f'Result {handle} not found or expired; run the original tool again'}
+        stored = json.loads(stored)
+        body = stored['body']
+
+        if stored['field'] is None:
+            end = min(len(body), offset + min(limit or self._text_chunk(), self._text_chunk()))
+            return {'handle': handle, 'text': body[offset:end], 'offset': offset, 'total': len(body),
+                    'next_offset': end if end < len(body) else None}
+
+        result = json.loads(body)
+        collection = result if stored['field'] == '' else result[stored['field']]
+        items = _items(collection)
+        window = items[offset:offset + limit] if limit else items[offset:]
+        page = {'handle': handle, 'field': stored['field'], 'offset': offset, 'total': len(items),
+                'items': _rebuild(collection, []), 'next_offset': None}
+        # Always advance by at least one item; a single item over budget is returned as truncated text
+        count = max(1, _fit(window, len(encode(page)) + 16, self.budget)) if window else 0
+        following = offset + count
+        page.update(items=_rebuild(collection, window[:count]), next_offset=following if following < len(items) else None)
+        if count == 1 and len(encode(page)) > self.budget:
+            page.update(items=None, item_text=encode(window[0])[:self._text_chunk()], item_truncated=True)
+        return page
+
+
+def default_budget():
+    """Warm-container ResponseBudget; offloads to S3 when RESULT_STORE_BUCKET is set, else in memory"""
+    def build():
+        bucket = os.environ.get('RESULT_STORE_BUCKET')
+        store = S3ResultStore(lambda: bootstrap.aws_client('s3'), bucket) if bucket else MemoryResultStore()
+        return ResponseBudget(store)
+    return bootstrap.shared('response_budget', build)
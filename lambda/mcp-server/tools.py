@@ -1,65 +1,435 @@
 """Extensible MCP tools for Bedrock agent"""
-import boto3
-import json
-from datetime import datetime, timedelta
-from kubernetes import client
+import os
+import time
+from concurrent.futures import wait
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from kubernetes.client.rest import ApiException
+import alerting
+import bootstrap
+import capacity
+import guardduty_findings
+import instrumentation
+import log_probe
+import metrics
+import projection
+import response_budget
+import xray_graph
+from instrumentation import ContextThreadPoolExecutor
+from logs_insights import InsightsQueryRunner
+from registry import COERCERS, TOOLS, lookup, tool
+from ttl_cache import TTLCache
+
+# CloudWatch metric name -> response key
+KINESIS_METRICS = {
+    'IncomingRecords': 'records_sent',
+    'IncomingBytes': 'bytes_sent',
+    'PutRecord.Success': 'put_success',
+    'GetRecords.Success': 'get_success'
+}
+
+GLUE_FINISHED_STATES = ('SUCCEEDED', 'FAILED', 'TIMEOUT', 'ERROR', 'STOPPED', 'EXPIRED')
+
+# Higher sorts first in unhealthy pod listings
+POD_PHASE_SEVERITY = {'Failed': 4, 'Unknown': 3, 'Pending': 2}
+
+
+# resource -> (api accessor, read method, namespaced list method)
+K8S_RESOURCES = {
+    'pods': ('core_v1', 'read_namespaced_pod', 'list_namespaced_pod'),
+    'deployments': ('apps_v1', 'read_namespaced_deployment', 'list_namespaced_deployment')
+}
+
+
+# describe kind -> (api accessor, read method, projection resource)
+DESCRIBE_KINDS = {
+    'pod': ('core_v1', 'read_namespaced_pod', 'pods'),
+    'deployment': ('apps_v1', 'read_namespaced_deployment', 'deployments'),
+    'replicaset': ('apps_v1', 'read_namespaced_replica_set', 'replicasets'),
+    'node': ('core_v1', 'read_node', 'nodes'),
+    'service': ('core_v1', 'read_namespaced_service', 'services')
+}
+DESCRIBE_ALIASES = {
+    'pods': 'pod', 'po': 'pod', 'deployments': 'deployment', 'deploy': 'deployment',
+    'replicasets': 'replicaset', 'rs': 'replicaset', 'nodes': 'node', 'no': 'node',
+    'services': 'service', 'svc': 'service'
+}
+# ownerReference kind -> (api accessor, read method, projection resource or None to report only the name)
+DESCRIBE_OWNERS = {
+    'ReplicaSet': ('apps_v1', 'read_namespaced_replica_set', 'replicasets'),
+    'Deployment': ('apps_v1', 'read_namespaced_deployment', 'deployments'),
+    'StatefulSet': ('apps_v1', 'read_namespaced_stateful_set', None),
+    'DaemonSet': ('apps_v1', 'read_namespaced_daemon_set', None)
+}
+
+
+def _page_kwargs(limit=None, continue_token=None):
+    kwargs = {}
+    if limit:
+        kwargs['limit'] = limit
+    if continue_token:
+        kwargs['_continue'] = continue_token
+    return kwargs
+
+
+def _page_info(result):
+    return {'continue': result.metadata._continue, 'remaining_item_count': result.metadata.remaining_item_count}
+
+
+def _needs_attention(pod):
+    statuses = pod.status.container_statuses or []
+    return not statuses or not all(c.ready for c in statuses) or any(c.restart_count for c in statuses)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile, None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
 
 class MCPTools:
     def __init__(self, region, cluster_name):
         self.region = region
         self.cluster_name = cluster_name
-        self.cloudwatch = boto3.client('cloudwatch', region_name=region)
-        self.logs = boto3.client('logs', region_name=region)
-        self.kinesis = boto3.client('kinesis', region_name=region)
-        self.s3 = boto3.client('s3', region_name=region)
-        self.glue = boto3.client('glue', region_name=region)
-        self.sns = boto3.client('sns', region_name=region)
-        self.v1 = client.CoreV1Api()
-        self.apps_v1 = client.AppsV1Api()
+
+    # Clients come from the shared warm-container bootstrap so the handler and
+    # the tools never build duplicates
+    cloudwatch = property(lambda self: bootstrap.aws_client('cloudwatch'))
+    logs = property(lambda self: bootstrap.aws_client('logs'))
+    kinesis = property(lambda self: bootstrap.aws_client('kinesis'))
+    s3 = property(lambda self: bootstrap.aws_client('s3'))
+    glue = property(lambda self: bootstrap.aws_client('glue'))
+    sns = property(lambda self: bootstrap.aws_client('sns'))
+    guardduty = property(lambda self: bootstrap.aws_client('guardduty'))
+    xray = property(lambda self: bootstrap.aws_client('xray'))
+    v1 = property(lambda self: bootstrap.core_v1())
+    apps_v1 = property(lambda self: bootstrap.apps_v1())
         
     # ========== Kubernetes Tools ==========
     
-    def get_pod_health(self, namespaces):
-        """Get health status of all pods in specified namespaces"""
-        results = {}
-        for ns in namespaces:
-            pods = self.v1.list_namespaced_pod(ns)
-            results[ns] = {
-                'total': len(pods.items),
-                'running': sum(1 for p in pods.items if p.status.phase == 'Running'),
-                'pending': sum(1 for p in pods.items if p.status.phase == 'Pending'),
-                'failed': sum(1 for p in pods.items if p.status.phase == 'Failed'),
-                'pods': [{
+    def _list_resources(self, tool_name, kind, namespace=None, use_cache=True):
+        """LIST through the warm-container cache unless the tool or caller opted out"""
+        return bootstrap.resource_cache().list(kind, namespace, tool=tool_name, use_cache=use_cache)
+
+    def _iter_resources(self, tool_name, kind, namespace=None, use_cache=True):
+        """Like _list_resources, but items arrive page by page so uncached reads never hold the whole LIST"""
+        return chain.from_iterable(bootstrap.resource_cache().pages(kind, namespace, tool=tool_name, use_cache=use_cache))
+
+    @tool('/kubectl/get', 'kubernetes-operations', 'kubernetes',
+          types={'fields': list, 'limit': int, 'use_cache': bool}, aliases={'continue': 'continue_token'})
+    def kubectl_get(self, resource, namespace='default', name=None, fields=None, limit=None, continue_token=None,
+                    use_cache=True):
+        """Get pods or deployments as slim projections, optionally paged by the API server"""
+        if resource not in K8S_RESOURCES:
+            return {'error': f'Unsupported resource type: {resource}'}
+        
+        fields = projection.parse_fields(resource, fields)
+        accessor, read_method, list_method = K8S_RESOURCES[resource]
+        api = getattr(bootstrap, accessor)()
+        
+        if name:
+            obj = getattr(api, read_method)(name, namespace)
+            return {resource[:-1]: projection.project(resource, obj, fields)}
+        
+        page = _page_kwargs(limit, continue_token)
+        if page:
+            # Continue tokens are issued by the API server, so paging bypasses the cache
+            result = getattr(api, list_method)(namespace, **page)
+            return dict({resource: [projection.project(resource, o, fields) for o in result.items]}, **_page_info(result))
+        
+        items = self._list_resources('kubectl_get', resource, namespace, use_cache)
+        return {resource: [projection.project(resource, o, fields) for o in items]}
+
+    @tool('/kubectl/logs', 'kubernetes-operations', 'kubernetes', types={'tail': int})
+    def kubectl_logs(self, pod, namespace='default', tail=100):
+        """Get the last lines of a pod's log"""
+        logs = self.v1.read_namespaced_pod_log(name=pod, namespace=namespace, tail_lines=tail)
+        return {'logs': logs}
+
+    def _owner_chain(self, obj, namespace):
+        """Follow controller ownerReferences upward (pod -> ReplicaSet -> Deployment) to the top-level owner"""
+        chain_ = []
+        while len(chain_) < 4:
+            ref = next((r for r in obj.metadata.owner_references or [] if r.controller), None)
+            if ref is None:
+                break
+            link = {'kind': ref.kind, 'name': ref.name}
+            chain_.append(link)
+            if ref.kind not in DESCRIBE_OWNERS:
+                break
+            accessor, read_method, resource = DESCRIBE_OWNERS[ref.kind]
+            try:
+                obj = getattr(getattr(bootstrap, accessor)(), read_method)(ref.name, namespace)
+            except ApiException as e:
+                link['error'] = e.reason
+                break
+            if resource:
+                link['summary'] = projection.project(resource, obj, projection.DEFAULT_FIELDS[resource])
+        return chain_
+
+    def _pod_rollup(self, pods, max_pods):
+        """Phase counts, waiting reasons and the least healthy pods first"""
+        phases, reasons = {}, {}
+        rows = []
+        for p in pods:
+            phase = p.status.phase or 'Unknown'
+            phases[phase] = phases.get(phase, 0) + 1
+            statuses = p.status.container_statuses or []
+            ready = bool(statuses) and all(c.ready for c in statuses)
+            restarts = sum(c.restart_count for c in statuses)
+            for c in statuses:
+                if c.state and c.state.waiting:
+                    reasons[c.state.waiting.reason] = reasons.get(c.state.waiting.reason, 0) + 1
+            rows.append(((not ready, POD_PHASE_SEVERITY.get(phase, 0), restarts), p))
+        rows.sort(key=lambda r: r[0], reverse=True)
+        return {
+            'total': len(rows),
+            'phases': phases,
+            'not_ready': sum(1 for key, _ in rows if key[0]),
+            'restarts': sum(key[2] for key, _ in rows),
+            'waiting_reasons': reasons,
+            'pods': [projection.project('pods', p, projection.DEFAULT_FIELDS['pods']) for _, p in rows[:max_pods]]
+        }
+
+    @tool('/kubectl/describe', 'kubernetes-operations', 'kubernetes',
+          types={'fields': list, 'max_pods': int, 'max_event_groups': int, 'use_cache': bool})
+    def kubectl_describe(self, resource, name, namespace='default', fields=None, max_pods=20, max_event_groups=20,
+                         use_cache=True):
+        """Describe a pod, deployment, replicaset, node or service with its owners, pods and grouped events"""
+        kind = DESCRIBE_ALIASES.get(resource, resource)
+        if kind not in DESCRIBE_KINDS:
+            return {'error': f'Unsupported resource type: {resource}'}
+        accessor, read_method, plural = DESCRIBE_KINDS[kind]
+        api = getattr(bootstrap, accessor)()
+        fields = projection.parse_fields(plural, fields or 'all')
+
+        # Reads are independent of the object itself: related pods are listed for the whole namespace
+        # (through the warm cache) and matched locally once the object arrives. Events are never listed
+        # namespace-wide; only the events of the objects in the reply are asked for, by field selector
+        with ContextThreadPoolExecutor(max_workers=4) as pool:
+            if kind == 'node':
+                target = pool.submit(api.read_node, name)
+                pods = pool.submit(lambda: list(self._list_pods_paged(field_selector=f'spec.nodeName={name}')))
+                events = pool.submit(lambda: self.v1.list_event_for_all_namespaces(
+                    field_selector=f'involvedObject.kind=Node,involvedObject.name={name}').items)
+            else:
+                target = pool.submit(getattr(api, read_method), name, namespace)
+                pods = pool.submit(self._list_resources, 'kubectl_describe', 'pods', namespace, use_cache) \
+                    if kind != 'pod' else None
+                events = pool.submit(self._object_events, namespace, name)
+            replicasets = pool.submit(self.apps_v1.list_namespaced_replica_set, namespace) \
+                if kind == 'deployment' else None
+
+            try:
+                obj = target.result()
+            except ApiException as e:
+                if e.status == 404:
+                    return {'error': f'{kind} {name} not found' + ('' if kind == 'node' else f' in {namespace}')}
+                raise
+            owners = pool.submit(self._owner_chain, obj, namespace) if kind in ('pod', 'replicaset') else None
+
+            result = {kind: projection.project(plural, obj, fields)}
+            uid = obj.metadata.uid
+            owned = []
+            if kind == 'pod':
+                related = []
+            elif kind == 'node':
+                related = pods.result()
+            elif kind == 'service':
+                selector = obj.spec.selector or {}
+                related = [p for p in pods.result()
+                           if selector and selector.items() <= (p.metadata.labels or {}).items()]
+            else:
+                owner_uids = {uid}
+                if replicasets:
+                    owned = [rs for rs in replicasets.result().items
+                             if any(r.uid == uid for r in rs.metadata.owner_references or [])]
+                    owned.sort(key=lambda rs: int((rs.metadata.annotations or {}).get(
+                        'deployment.kubernetes.io/revision', 0)), reverse=True)
+                    owner_uids.update(rs.metadata.uid for rs in owned)
+                    result['replicasets'] = [projection.project('replicasets', rs, projection.DEFAULT_FIELDS['replicasets'])
+                                             for rs in owned if rs.spec.replicas or rs is owned[0]][:5]
+                related = [p for p in pods.result()
+                           if any(r.uid in owner_uids for r in p.metadata.owner_references or [])]
+
+            if kind != 'pod':
+                result['pods'] = self._pod_rollup(related, max_pods)
+            if owners:
+                result['owner_chain'] = owners.result()
+
+            found = events.result()
+            if kind != 'node':
+                # One selector LIST each for the replicasets shown and the pods that are not ready or restarted
+                shown = [rs['name'] for rs in result.get('replicasets', [])] + \
+                        [p.metadata.name for p in related if _needs_attention(p)][:max_pods]
+                for extra in pool.map(lambda n: self._object_events(namespace, n), shown):
+                    found.extend(extra)
+
+            involved = {uid} | {p.metadata.uid for p in related} | {rs.metadata.uid for rs in owned}
+            # Events recorded by older clients may lack the uid; fall back to kind/name
+            names = {(obj.kind or kind.capitalize(), name)} | {('Pod', p.metadata.name) for p in related}
+            matched = [e for e in found
+                       if e.involved_object.uid in involved
+                       or (e.involved_object.kind, e.involved_object.name) in names]
+
+        result['events'], total_groups = projection.group_events(matched, max_event_groups)
+        result['event_groups_total'] = total_groups
+        return result
+
+    def _object_events(self, namespace, name):
+        return list(self.v1.list_namespaced_event(namespace, field_selector=f'involvedObject.name={name}').items)
+
+    def _list_pods_paged(self, namespace=None, field_selector=None, label_selector=None, page_size=500):
+        """Yield pods page by page, pushing selectors down to the API server"""
+        kwargs = {'limit': page_size}
+        if field_selector:
+            kwargs['field_selector'] = field_selector
+        if label_selector:
+            kwargs['label_selector'] = label_selector
+        while True:
+            if namespace:
+                result = self.v1.list_namespaced_pod(namespace, **kwargs)
+            else:
+                result = self.v1.list_pod_for_all_namespaces(**kwargs)
+            yield from result.items
+            if not result.metadata._continue:
+                return
+            kwargs['_continue'] = result.metadata._continue
+
+    def _fetch_pods(self, namespace, field_selector, label_selector, use_cache):
+        if field_selector or label_selector:
+            return self._list_pods_paged(namespace, field_selector, label_selector)
+        return self._iter_resources('get_pod_health', 'pods', namespace, use_cache)
+
+    @tool('/kubectl/pod-health', 'kubernetes-operations', 'kubernetes',
+              types={'namespaces': list, 'use_cache': bool, 'restart_threshold': int, 'max_pods': int, 'max_workers': int})
+    def get_pod_health(self, namespaces=None, use_cache=True, field_selector=None, label_selector=None,
+                       restart_threshold=5, max_pods=50, max_workers=16):
+        """Get pod health per namespace, or cluster-wide when namespaces is empty or ['*']"""
+        if not namespaces or namespaces == ['*']:
+            pods = self._fetch_pods(None, field_selector, label_selector, use_cache)
+        else:
+            with ContextThreadPoolExecutor(max_workers=min(max_workers, len(namespaces))) as pool:
+                pods = chain.from_iterable(pool.map(
+                    lambda ns: list(self._fetch_pods(ns, field_selector, label_selector, use_cache)), namespaces))
+
+        # One pass over the pods, consumed page by page as they are listed, computes every counter
+        # and collects only the unhealthy ones
+        counter_keys = ('total', 'running', 'pending', 'failed', 'succeeded', 'unknown', 'not_ready', 'restarts', 'unhealthy')
+        counters = {ns: dict.fromkeys(counter_keys, 0) for ns in namespaces or [] if ns != '*'}
+        unhealthy = []
+        for p in pods:
+            ns = counters.setdefault(p.metadata.namespace, dict.fromkeys(counter_keys, 0))
+            phase = p.status.phase or 'Unknown'
+            statuses = p.status.container_statuses or []
+            ready = sum(1 for c in statuses if c.ready)
+            restarts = sum(c.restart_count for c in statuses)
+            waiting = sorted({c.state.waiting.reason for c in statuses
+                              if c.state and c.state.waiting and c.state.waiting.reason})
+
+            ns['total'] += 1
+            ns[phase.lower() if phase.lower() in ns else 'unknown'] += 1
+            ns['restarts'] += restarts
+            not_ready = phase == 'Running' and ready < len(p.spec.containers)
+            ns['not_ready'] += not_ready
+
+            severity = POD_PHASE_SEVERITY.get(phase, 0)
+            if waiting:
+                severity = max(severity, 3)
+            if not_ready:
+                severity = max(severity, 2)
+            if restarts >= restart_threshold:
+                severity = max(severity, 1)
+            if severity:
+                ns['unhealthy'] += 1
+                unhealthy.append((severity, restarts, {
                     'name': p.metadata.name,
-                    'status': p.status.phase,
-                    'ready': sum(1 for c in p.status.container_statuses if c.ready) if p.status.container_statuses else 0,
-                    'restarts': sum(c.restart_count for c in p.status.container_statuses) if p.status.container_statuses else 0
-                } for p in pods.items]
-            }
-        return results
+                    'namespace': p.metadata.namespace,
+                    'status': phase,
+                    'ready': f'{ready}/{len(p.spec.containers)}',
+                    'restarts': restarts,
+                    'waiting_reasons': waiting,
+                    'node': p.spec.node_name
+                }))
+
+        unhealthy.sort(key=lambda u: (u[0], u[1]), reverse=True)
+        totals = {k: sum(c[k] for c in counters.values()) for k in counter_keys}
+        return {
+            'summary': totals,
+            'namespaces': dict(sorted(counters.items(), key=lambda kv: kv[1]['unhealthy'], reverse=True)),
+            'unhealthy_pods': [u[2] for u in unhealthy[:max_pods]],
+            'truncated': len(unhealthy) > max_pods
+        }
     
-    def probe_logs_for_errors(self, namespace, pod_name, error_patterns=['ERROR', 'FATAL', 'Exception'], tail=1000):
-        """Probe pod logs for error patterns and return matches"""
-        logs = self.v1.read_namespaced_pod_log(pod_name, namespace, tail_lines=tail)
-        errors = []
-        for line in logs.split('\n'):
-            if any(pattern in line for pattern in error_patterns):
-                errors.append(line)
+    def _probe_container(self, namespace, pod_name, container, matcher, aggregator, tail, since_seconds):
+        kwargs = {'container': container, 'timestamps': True, '_preload_content': False}
+        if tail:
+            kwargs['tail_lines'] = tail
+        if since_seconds:
+            kwargs['since_seconds'] = since_seconds
+        response = self.v1.read_namespaced_pod_log(pod_name, namespace, **kwargs)
+        lines = 0
+        for line in log_probe.iter_lines(response):
+            lines += 1
+            timestamp, message = log_probe.split_timestamp(line)
+            if matcher.search(message):
+                aggregator.add(pod_name, container, timestamp, message)
+        return lines
+
+    @tool('/kubectl/probe-logs', 'kubernetes-operations', 'kubernetes',
+              types={'error_patterns': list, 'tail': int, 'since_seconds': int, 'use_regex': bool, 'max_workers': int,
+                     'max_signatures': int})
+    def probe_logs_for_errors(self, namespace, pod_name=None, error_patterns=['ERROR', 'FATAL', 'Exception'], tail=1000,
+                              label_selector=None, deployment_name=None, container=None, since_seconds=None,
+                              use_regex=False, max_workers=10, max_signatures=50):
+        """Stream logs of a pod, a deployment or a label selector and group error lines into signatures"""
+        if pod_name:
+            pods = [self.v1.read_namespaced_pod(pod_name, namespace)]
+        else:
+            if deployment_name:
+                dep = self.apps_v1.read_namespaced_deployment(deployment_name, namespace)
+                label_selector = ','.join(f'{k}={v}' for k, v in (dep.spec.selector.match_labels or {}).items())
+            if not label_selector:
+                return {'error': 'One of pod_name, deployment_name or label_selector is required'}
+            pods = self.v1.list_namespaced_pod(namespace, label_selector=label_selector).items
+
+        targets = [(p.metadata.name, c.name) for p in pods for c in p.spec.containers
+                   if container is None or c.name == container]
+        matcher = log_probe.compile_matcher(error_patterns, use_regex)
+        aggregator = log_probe.SignatureAggregator()
+        failures = []
+        lines_scanned = 0
+
+        with ContextThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as pool:
+            futures = {pool.submit(self._probe_container, namespace, pod, c, matcher, aggregator, tail, since_seconds): (pod, c)
+                       for pod, c in targets}
+            for future, (pod, c) in futures.items():
+                try:
+                    lines_scanned += future.result()
+                except Exception as e:
+                    failures.append({'pod': pod, 'container': c, 'error': str(e)})
+
         return {
-            'pod': pod_name,
             'namespace': namespace,
-            'error_count': len(errors),
-            'errors': errors[:50]  # Limit to 50 errors
+            'pods_scanned': len({pod for pod, _ in targets}),
+            'containers_scanned': len(targets) - len(failures),
+            'lines_scanned': lines_scanned,
+            'error_count': aggregator.error_count,
+            'signature_count': len(aggregator.signatures),
+            'signatures': aggregator.top(max_signatures),
+            'failures': failures
         }
     
-    def get_deployment_status(self, namespace, deployment_name=None):
+    @tool('/kubectl/deployment-status', 'kubernetes-operations', 'kubernetes', types={'use_cache': bool})
+    def get_deployment_status(self, namespace, deployment_name=None, use_cache=True):
         """Get deployment status and replica counts"""
         if deployment_name:
             dep = self.apps_v1.read_namespaced_deployment(deployment_name, namespace)
             deployments = [dep]
         else:
-            deps = self.apps_v1.list_namespaced_deployment(namespace)
-            deployments = deps.items
+            deployments = self._list_resources('get_deployment_status', 'deployments', namespace, use_cache)
         
         return [{
             'name': d.metadata.name,
@@ -71,102 +441,256 @@ class MCPTools:
             'conditions': [{'type': c.type, 'status': c.status, 'reason': c.reason} for c in d.status.conditions] if d.status.conditions else []
         } for d in deployments]
     
-    def get_node_resources(self):
-        """Get node resource utilization"""
-        nodes = self.v1.list_node()
-        return [{
-            'name': n.metadata.name,
-            'capacity': {
-                'cpu': n.status.capacity.get('cpu'),
-                'memory': n.status.capacity.get('memory'),
-                'pods': n.status.capacity.get('pods')
-            },
-            'allocatable': {
-                'cpu': n.status.allocatable.get('cpu'),
-                'memory': n.status.allocatable.get('memory'),
-                'pods': n.status.allocatable.get('pods')
-            },
-            'conditions': [{'type': c.type, 'status': c.status} for c in n.status.conditions]
-        } for n in nodes.items]
+    def _list_metrics(self, plural):
+        """List metrics.k8s.io usage items, None when metrics-server is not available"""
+        try:
+            return bootstrap.custom_objects().list_cluster_custom_object('metrics.k8s.io', 'v1beta1', plural)['items']
+        except ApiException as e:
+            print(f"metrics.k8s.io {plural} unavailable: {e.status} {e.reason}")
+            return None
+
+    @tool('/kubectl/node-resources', 'kubernetes-operations', 'kubernetes',
+          types={'use_cache': bool, 'top_n': int, 'include_nodes': bool})
+    def get_node_resources(self, use_cache=True, top_n=5, include_nodes=False,
+                           nodegroup_label='eks.amazonaws.com/nodegroup'):
+        """Summarize node capacity, requests and metrics-server usage across the fleet and per nodegroup"""
+        with ContextThreadPoolExecutor(max_workers=3) as pool:
+            nodes = pool.submit(self._list_resources, 'get_node_resources', 'nodes', use_cache=use_cache)
+            node_usage = pool.submit(self._list_metrics, 'nodes')
+            pod_usage = pool.submit(self._list_metrics, 'pods')
+
+            fleet = capacity.NodeFleet(nodes.result(), nodegroup_label)
+            # Pods are the big LIST: fold each page into the fleet's columns as it arrives
+            placement = {}
+            for page in bootstrap.resource_cache().pages('pods', tool='get_node_resources', use_cache=use_cache):
+                placement.update(fleet.add_pods(page))
+
+        if node_usage.result() is not None:
+            fleet.add_node_usage(node_usage.result())
+        if pod_usage.result() is not None:
+            fleet.add_pod_usage(pod_usage.result(), placement)
+
+        result = dict(capacity.summarize(fleet, top_n), metrics_available=fleet.has_usage)
+        if include_nodes:
+            result['node_list'] = [{
+                'name': name,
+                'nodegroup': fleet.nodegroups[i],
+                'ready': fleet.ready[i],
+                'cpu_allocatable': fleet.alloc_cpu[i],
+                'cpu_requested': round(fleet.req_cpu[i], 3),
+                'cpu_used': round(fleet.usage_cpu[i], 3) if fleet.has_usage else None,
+                'memory_allocatable_gib': round(fleet.alloc_mem[i] / capacity.GIB, 2),
+                'memory_requested_gib': round(fleet.req_mem[i] / capacity.GIB, 2),
+                'memory_used_gib': round(fleet.usage_mem[i] / capacity.GIB, 2) if fleet.has_usage else None,
+                'pods': int(fleet.pods[i])
+            } for i, name in enumerate(fleet.names)]
+        return result
     
     # ========== Data Pipeline Tools ==========
     
-    def get_kinesis_metrics(self, stream_name, hours=1):
-        """Get Kinesis stream metrics (records sent, bytes)"""
+    @tool('/kinesis/get-metrics', 'aws-operations', 'data_pipeline',
+              types={'stream_names': list, 'hours': float, 'period': int}, aliases={'stream_name': 'stream_names'})
+    def get_kinesis_metrics(self, stream_names, hours=1, period=300):
+        """Get Kinesis stream metrics (records sent, bytes) for one or many streams in batched calls"""
+        if isinstance(stream_names, str):
+            stream_names = [stream_names]
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
-        metrics = {}
-        for metric_name in ['IncomingRecords', 'IncomingBytes', 'PutRecord.Success', 'GetRecords.Success']:
-            response = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/Kinesis',
-                MetricName=metric_name,
-                Dimensions=[{'Name': 'StreamName', 'Value': stream_name}],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=3600,
-                Statistics=['Sum']
-            )
-            metrics[metric_name] = sum(d['Sum'] for d in response['Datapoints'])
+        queries = [metrics.metric_query('AWS/Kinesis', metric_name, {'StreamName': stream}, 'Sum', period)
+                   for stream in stream_names for metric_name in KINESIS_METRICS]
+        data = metrics.get_metric_data(self.cloudwatch, queries, start_time, end_time)
+        
+        streams = {}
+        for result in data['results']:
+            stream = streams.setdefault(result['dimensions']['StreamName'], {'series': {}})
+            stream[KINESIS_METRICS[result['metric']]] = result['sum']
+            stream['series'][result['metric']] = result['series']
         
         return {
-            'stream_name': stream_name,
             'time_range_hours': hours,
-            'records_sent': metrics.get('IncomingRecords', 0),
-            'bytes_sent': metrics.get('IncomingBytes', 0),
-            'put_success': metrics.get('PutRecord.Success', 0),
-            'get_success': metrics.get('GetRecords.Success', 0)
+            'period_seconds': period,
+            'api_calls': data['api_calls'],
+            'streams': streams
         }
     
-    def get_s3_object_count(self, bucket, prefix=''):
-        """Count objects in S3 bucket/prefix (bronze area)"""
-        paginator = self.s3.get_paginator('list_objects_v2')
-        count = 0
-        total_size = 0
-        
-        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-            if 'Contents' in page:
-                count += len(page['Contents'])
-                total_size += sum(obj['Size'] for obj in page['Contents'])
-        
+    def _s3_storage_types(self, bucket):
+        """Storage types the bucket reports BucketSizeBytes for (StandardStorage, StandardIAStorage, GlacierStorage...)"""
+        paginator = self.cloudwatch.get_paginator('list_metrics')
+        pages = paginator.paginate(Namespace='AWS/S3', MetricName='BucketSizeBytes',
+                                   Dimensions=[{'Name': 'BucketName', 'Value': bucket}])
+        return sorted({d['Value'] for page in pages for m in page['Metrics']
+                       for d in m['Dimensions'] if d['Name'] == 'StorageType'}) or ['StandardStorage']
+
+    def _get_s3_bucket_metrics(self, bucket):
+        """Read the daily AWS/S3 storage metrics, None when the bucket has not reported yet"""
+        end_time = datetime.utcnow()
+        # BucketSizeBytes has no AllStorageTypes series, so the size is summed over every type present
+        storage_types = self._s3_storage_types(bucket)
+        queries = [
+            metrics.metric_query('AWS/S3', 'NumberOfObjects', {'BucketName': bucket, 'StorageType': 'AllStorageTypes'}, 'Average', 86400)
+        ] + [metrics.metric_query('AWS/S3', 'BucketSizeBytes', {'BucketName': bucket, 'StorageType': t}, 'Average', 86400)
+             for t in storage_types]
+        count, *sizes = metrics.get_metric_data(self.cloudwatch, queries, end_time - timedelta(days=3), end_time)['results']
+        if count['latest'] is None:
+            return None
+        by_type = {t: int(size['latest'] or 0) for t, size in zip(storage_types, sizes)}
         return {
-            'bucket': bucket,
-            'prefix': prefix,
-            'object_count': count,
-            'total_size_bytes': total_size,
-            'total_size_gb': round(total_size / (1024**3), 2)
+            'object_count': int(count['latest']),
+            'total_size_bytes': sum(by_type.values()),
+            'size_bytes_by_storage_type': by_type,
+            'as_of': count['series'][-1][0]
         }
+
+    def _list_s3_shard(self, bucket, prefix):
+        paginator = self.s3.get_paginator('list_objects_v2')
+        shard = {'prefix': prefix, 'object_count': 0, 'total_size_bytes': 0, 'last_modified': None}
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                shard['object_count'] += 1
+                shard['total_size_bytes'] += obj['Size']
+                if shard['last_modified'] is None or obj['LastModified'] > shard['last_modified']:
+                    shard['last_modified'] = obj['LastModified']
+        return shard
+
+    @tool('/s3/get-object-count', 'aws-operations', 'data_pipeline',
+              types={'exact': bool, 'breakdown': bool, 'max_workers': int, 'use_cache': bool, 'max_breakdown': int})
+    def get_s3_object_count(self, bucket, prefix='', exact=False, breakdown=True, max_workers=16, use_cache=True,
+                            max_breakdown=100):
+        """Count objects in S3 bucket/prefix (bronze area)"""
+        cache = bootstrap.shared('s3_counts', lambda: TTLCache(float(os.environ.get('S3_COUNT_CACHE_TTL_SECONDS', 300))))
+        key = (bucket, prefix, exact, breakdown, max_breakdown)
+        cached = cache.get(key) if use_cache else None
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        result = None
+        if not prefix and not exact:
+            # Whole-bucket totals come from the daily storage metrics instead of a full listing
+            bucket_metrics = self._get_s3_bucket_metrics(bucket)
+            if bucket_metrics:
+                result = dict(bucket_metrics, source='cloudwatch_storage_metrics')
+
+        if result is None:
+            # Shard the listing on the sub-prefixes under the prefix and list them concurrently
+            top = {'prefix': prefix, 'object_count': 0, 'total_size_bytes': 0, 'last_modified': None}
+            sub_prefixes = []
+            paginator = self.s3.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+                sub_prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+                for obj in page.get('Contents', []):
+                    top['object_count'] += 1
+                    top['total_size_bytes'] += obj['Size']
+                    if top['last_modified'] is None or obj['LastModified'] > top['last_modified']:
+                        top['last_modified'] = obj['LastModified']
+
+            shards = [top] if top['object_count'] else []
+            if sub_prefixes:
+                with ContextThreadPoolExecutor(max_workers=min(max_workers, len(sub_prefixes))) as pool:
+                    shards.extend(pool.map(lambda p: self._list_s3_shard(bucket, p), sub_prefixes))
+
+            last_modified = max((s['last_modified'] for s in shards if s['last_modified']), default=None)
+            result = {
+                'object_count': sum(s['object_count'] for s in shards),
+                'total_size_bytes': sum(s['total_size_bytes'] for s in shards),
+                'last_modified': last_modified.isoformat() if last_modified else None,
+                'source': 'list_objects_v2',
+                'shards': len(sub_prefixes)
+            }
+            if breakdown:
+                # Oldest partitions first, so one that stopped receiving data stands out
+                ordered = sorted(shards, key=lambda s: s['last_modified'] or datetime.min.replace(tzinfo=timezone.utc))
+                result['breakdown'] = [dict(s, last_modified=s['last_modified'].isoformat() if s['last_modified'] else None)
+                                       for s in ordered[:max_breakdown]]
+                result['breakdown_truncated'] = len(ordered) > max_breakdown
+
+        result = dict(result, bucket=bucket, prefix=prefix,
+                      total_size_gb=round(result['total_size_bytes'] / (1024**3), 2), cached=False)
+        cache.put(key, result)
+        return result
     
-    def get_glue_job_status(self, job_name=None):
-        """Check Glue job runs and status"""
+    def _get_recent_job_runs(self, job_name, since):
+        """Page through a job's runs (newest first) and stop at the first one older than the window"""
+        runs = []
+        for page in self.glue.get_paginator('get_job_runs').paginate(JobName=job_name):
+            for r in page['JobRuns']:
+                if r.get('StartedOn') and r['StartedOn'] < since:
+                    return runs
+                runs.append(r)
+        return runs
+
+    @tool('/glue/job-status', 'aws-operations', 'data_pipeline',
+              types={'hours': float, 'states': list, 'max_workers': int, 'max_jobs': int})
+    def get_glue_job_status(self, job_name=None, hours=24, states=None, max_workers=16, max_jobs=50):
+        """Check Glue job runs and status, summarised per job over a time window"""
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        states = {s.upper() for s in states} if states else None
         if job_name:
-            response = self.glue.get_job_runs(JobName=job_name, MaxResults=10)
-            runs = response['JobRuns']
+            job_names = [job_name]
         else:
-            jobs = self.glue.get_jobs()['Jobs']
-            runs = []
-            for job in jobs[:5]:  # Limit to 5 jobs
-                job_runs = self.glue.get_job_runs(JobName=job['Name'], MaxResults=5)
-                runs.extend(job_runs['JobRuns'])
-        
-        return [{
-            'job_name': r['JobName'],
-            'run_id': r['Id'],
-            'state': r['JobRunState'],
-            'started': r['StartedOn'].isoformat() if 'StartedOn' in r else None,
-            'completed': r['CompletedOn'].isoformat() if 'CompletedOn' in r else None,
-            'execution_time': r.get('ExecutionTime', 0),
-            'error_message': r.get('ErrorMessage')
-        } for r in runs]
+            job_names = [n for page in self.glue.get_paginator('list_jobs').paginate() for n in page['JobNames']]
+
+        with ContextThreadPoolExecutor(max_workers=max(1, min(max_workers, len(job_names)))) as pool:
+            runs_by_job = dict(zip(job_names, pool.map(lambda n: self._get_recent_job_runs(n, since), job_names)))
+
+        # Statistics cover every run in the window; `states` only selects which jobs are listed
+        jobs = []
+        for name, runs in runs_by_job.items():
+            if not runs:
+                continue
+            finished = [r for r in runs if r['JobRunState'] in GLUE_FINISHED_STATES]
+            failed = [r for r in finished if r['JobRunState'] != 'SUCCEEDED']
+            durations = [r['ExecutionTime'] for r in finished if r.get('ExecutionTime')]
+            newest_error = next((r for r in runs if r.get('ErrorMessage')), None)
+            jobs.append({
+                'job_name': name,
+                'runs': len(runs),
+                'matching_runs': sum(1 for r in runs if r['JobRunState'] in states) if states else len(runs),
+                'running': sum(1 for r in runs if r['JobRunState'] in ('STARTING', 'RUNNING', 'STOPPING', 'WAITING')),
+                'finished': len(finished),
+                'failed': len(failed),
+                'failure_rate': round(len(failed) / len(finished), 3) if finished else None,
+                'p50_execution_time': percentile(durations, 50),
+                'p95_execution_time': percentile(durations, 95),
+                'last_state': runs[0]['JobRunState'],
+                'last_started': runs[0]['StartedOn'].isoformat() if 'StartedOn' in runs[0] else None,
+                'newest_error': {
+                    'run_id': newest_error['Id'],
+                    'state': newest_error['JobRunState'],
+                    'started': newest_error['StartedOn'].isoformat() if 'StartedOn' in newest_error else None,
+                    'error_message': newest_error['ErrorMessage'][:500]
+                } if newest_error else None
+            })
+
+        jobs.sort(key=lambda j: (j['failed'], j['failure_rate'] or 0), reverse=True)
+        total_finished = sum(j['finished'] for j in jobs)
+        total_failed = sum(j['failed'] for j in jobs)
+        listed = [j for j in jobs if j['matching_runs']]
+        return {
+            'window_hours': hours,
+            'states': sorted(states) if states else None,
+            'summary': {
+                'jobs_scanned': len(job_names),
+                'jobs_with_runs': len(jobs),
+                'jobs_with_failures': sum(1 for j in jobs if j['failed']),
+                'jobs_matching_states': len(listed),
+                'runs': sum(j['runs'] for j in jobs),
+                'running': sum(j['running'] for j in jobs),
+                'failed': total_failed,
+                'failure_rate': round(total_failed / total_finished, 3) if total_finished else None
+            },
+            'jobs': listed[:max_jobs],
+            'truncated': len(listed) > max_jobs
+        }
     
+    @tool('/glue/crawler-status', 'aws-operations', 'data_pipeline')
     def check_glue_crawler_status(self, crawler_name=None):
         """Check Glue crawler status"""
         if crawler_name:
             crawler = self.glue.get_crawler(Name=crawler_name)
             crawlers = [crawler['Crawler']]
         else:
-            response = self.glue.get_crawlers()
-            crawlers = response['Crawlers']
+            crawlers = [c for page in self.glue.get_paginator('get_crawlers').paginate() for c in page['Crawlers']]
         
         return [{
             'name': c['Name'],
@@ -178,98 +702,264 @@ class MCPTools:
     
     # ========== Monitoring & Alerting Tools ==========
     
-    def send_sns_alert(self, topic_arn, subject, message, severity='INFO'):
-        """Send SNS alert with structured message"""
-        structured_message = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'severity': severity,
-            'cluster': self.cluster_name,
-            'subject': subject,
-            'message': message
-        }
-        
-        self.sns.publish(
-            TopicArn=topic_arn,
-            Subject=f"[{severity}] {subject}",
-            Message=json.dumps(structured_message, indent=2)
-        )
-        
-        return {'status': 'sent', 'topic': topic_arn}
+    @tool('/sns/send-alert', 'aws-operations', 'monitoring', types={'alerts': list})
+    def send_sns_alert(self, topic_arn, subject=None, message=None, severity='INFO', alerts=None):
+        """Queue one alert, or a list of {subject, message, severity} alerts, for batched SNS delivery.
+
+        Repeats of the same cluster, subject and severity within the dedup window are dropped, and alerts
+        over the topic's rate limit are rolled into a summary; queued alerts are sent when this call ends.
+        """
+        alerts = alerts or [{'subject': subject, 'message': message, 'severity': severity}]
+        batcher = alerting.default_batcher(self.cluster_name)
+        results = []
+        for alert in alerts:
+            if not alert.get('subject'):
+                results.append({'status': 'error', 'error': 'subject is required'})
+                continue
+            key, status = batcher.submit(topic_arn, alert['subject'], alert.get('message'),
+                                         alert.get('severity') or severity)
+            results.append({'subject': alert['subject'], 'fingerprint': key, 'status': status})
+
+        counts = {}
+        for r in results:
+            counts[r['status']] = counts.get(r['status'], 0) + 1
+        reply = {'topic': topic_arn, 'counts': counts, 'alerts': results}
+        # Delivery happens after the reply, so failures surface on the next call
+        failures = batcher.take_failures()
+        if failures:
+            reply['previous_delivery_failures'] = failures
+        return reply
     
-    def analyze_cloudwatch_logs(self, log_group, hours=1, error_patterns=['ERROR', 'FATAL', 'Exception']):
-        """Analyze CloudWatch logs for errors"""
-        end_time = int(datetime.utcnow().timestamp() * 1000)
-        start_time = int((datetime.utcnow() - timedelta(hours=hours)).timestamp() * 1000)
-        
-        query = f"fields @timestamp, @message | filter {' or '.join([f'@message like /{p}/' for p in error_patterns])} | sort @timestamp desc | limit 100"
-        
-        response = self.logs.start_query(
-            logGroupName=log_group,
-            startTime=start_time,
-            endTime=end_time,
-            queryString=query
-        )
-        
-        query_id = response['queryId']
-        
-        # Wait for query to complete (simplified - should poll)
-        import time
-        time.sleep(2)
-        
-        results = self.logs.get_query_results(queryId=query_id)
+    @tool('/cloudwatch/analyze-logs', 'aws-operations', 'monitoring',
+              types={'log_groups': list, 'hours': float, 'error_patterns': list, 'deadline_seconds': float},
+              aliases={'log_group': 'log_groups'})
+    def analyze_cloudwatch_logs(self, log_groups=None, hours=1, error_patterns=['ERROR', 'FATAL', 'Exception'],
+                                query_id=None, deadline_seconds=20):
+        """Analyze CloudWatch logs for errors across one or more log groups, or resume a query by query_id"""
+        if not log_groups and not query_id:
+            return {'error': 'log_groups or query_id is required'}
+        runner = bootstrap.shared('logs_insights', lambda: InsightsQueryRunner(lambda: self.logs))
+        if query_id:
+            result = runner.resume(query_id, deadline_seconds)
+        else:
+            if isinstance(log_groups, str):
+                log_groups = [log_groups]
+            end_time = int(datetime.utcnow().timestamp())
+            start_time, end_time = runner.align_window(int(end_time - hours * 3600), end_time)
+            query = f"fields @timestamp, @log, @message | filter {' or '.join([f'@message like /{p}/' for p in error_patterns])} | sort @timestamp desc | limit 100"
+            result = runner.run(query, log_groups, start_time, end_time, deadline_seconds)
         
         return {
-            'log_group': log_group,
-            'error_count': len(results.get('results', [])),
-            'errors': results.get('results', [])[:50]
+            'log_groups': log_groups,
+            'query_id': result['query_id'],
+            'status': result['status'],
+            'complete': result['complete'],
+            'cached': result['cached'],
+            'error_count': len(result['results']),
+            'errors': result['results'][:50]
         }
     
-    def get_eks_cluster_health(self):
-        """Get EKS cluster health metrics"""
-        metrics = {}
+    @tool('/eks/cluster-health', 'aws-operations', 'monitoring',
+              types={'cluster_names': list, 'hours': float, 'period': int})
+    def get_eks_cluster_health(self, cluster_names=None, hours=1, period=300):
+        """Get EKS cluster health metrics for this or several clusters in batched calls"""
+        cluster_names = cluster_names or [self.cluster_name]
         end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=1)
+        start_time = end_time - timedelta(hours=hours)
+        
+        queries = [metrics.metric_query('ContainerInsights', metric_name, {'ClusterName': cluster}, 'Average', period)
+                   for cluster in cluster_names
+                   for metric_name in ['cluster_failed_node_count', 'cluster_node_count']]
+        data = metrics.get_metric_data(self.cloudwatch, queries, start_time, end_time)
         
-        for metric_name in ['cluster_failed_node_count', 'cluster_node_count']:
-            response = self.cloudwatch.get_metric_statistics(
-                Namespace='ContainerInsights',
-                MetricName=metric_name,
-                Dimensions=[{'Name': 'ClusterName', 'Value': self.cluster_name}],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=3600,
-                Statistics=['Average']
-            )
-            if response['Datapoints']:
-                metrics[metric_name] = response['Datapoints'][0]['Average']
+        clusters = {}
+        for result in data['results']:
+            cluster = clusters.setdefault(result['dimensions']['ClusterName'], {'series': {}})
+            cluster[result['metric']] = result['latest'] or 0
+            cluster['series'][result['metric']] = result['series']
         
         return {
-            'cluster_name': self.cluster_name,
-            'node_count': metrics.get('cluster_node_count', 0),
-            'failed_nodes': metrics.get('cluster_failed_node_count', 0),
-            'healthy': metrics.get('cluster_failed_node_count', 0) == 0
+            'api_calls': data['api_calls'],
+            'clusters': [{
+                'cluster_name': name,
+                'node_count': c['cluster_node_count'],
+                'failed_nodes': c['cluster_failed_node_count'],
+                'healthy': c['cluster_failed_node_count'] == 0,
+                'series': c['series']
+            } for name, c in clusters.items()]
+        }
+    
+    # ========== Security & Observability Tools ==========
+    
+    @tool('/cloudwatch/get-metric-data', 'aws-operations', 'monitoring',
+          types={'metric_names': list, 'dimensions': dict, 'statistics': list, 'period': int},
+          aliases={'metric': 'metric_names', 'metrics': 'metric_names'})
+    def get_metric_data(self, namespace, metric_names, start_time, end_time, dimensions=None,
+                        statistics=['Average', 'Maximum'], period=300):
+        """Get CloudWatch metric series for one or more metrics and statistics"""
+        queries = [
+            metrics.metric_query(namespace, metric, dimensions or {}, stat, period, f'{metric} {stat}')
+            for metric in metric_names
+            for stat in statistics
+        ]
+        return metrics.get_metric_data(self.cloudwatch, queries, start_time, end_time)
+    
+    def _guardduty_reader(self):
+        return bootstrap.shared('guardduty_findings', lambda: guardduty_findings.FindingsReader(lambda: self.guardduty))
+
+    @tool('/guardduty/get-findings', 'aws-operations', 'security',
+          types={'finding_ids': list, 'min_severity': float, 'types': list, 'hours': float, 'max_findings': int,
+                 'max_resources': int, 'include_archived': bool},
+          aliases={'severity': 'min_severity', 'finding_types': 'types', 'cluster': 'cluster_name'})
+    def get_guardduty_findings(self, finding_ids=None, min_severity=4, types=None, cluster_name=None, hours=24,
+                               max_findings=500, max_resources=25, include_archived=False):
+        """Summarize GuardDuty findings per resource for this cluster, or get specific findings by id.
+
+        cluster_name defaults to this cluster; '*' covers every finding in the account and region.
+        """
+        reader = self._guardduty_reader()
+        if finding_ids:
+            detector_id = reader.detector_id()
+            if detector_id is None:
+                return {'error': 'No GuardDuty detector found'}
+            return {'findings': [guardduty_findings.compact(f) for f in reader.get(detector_id, finding_ids)]}
+
+        cluster_name = None if cluster_name == '*' else cluster_name or self.cluster_name
+        detector_id, findings, truncated = reader.query(min_severity, types, cluster_name, hours, max_findings,
+                                                        include_archived)
+        if detector_id is None:
+            return {'error': 'No GuardDuty detector found'}
+
+        resources, total_resources = guardduty_findings.rollup(findings, max_resources)
+        by_severity, by_type = {}, {}
+        for f in findings:
+            label = guardduty_findings.severity_label(f['Severity'])
+            by_severity[label] = by_severity.get(label, 0) + 1
+            by_type[f['Type']] = by_type.get(f['Type'], 0) + 1
+        return {
+            'filters': {'cluster_name': cluster_name, 'min_severity': min_severity, 'types': types, 'hours': hours,
+                        'include_archived': include_archived},
+            'summary': {
+                'findings': len(findings),
+                'resources': total_resources,
+                'by_severity': by_severity,
+                'top_types': dict(sorted(by_type.items(), key=lambda t: t[1], reverse=True)[:10])
+            },
+            'resources': resources,
+            'resources_truncated': total_resources > max_resources,
+            'findings_truncated': truncated,
+            'cache': reader.get_stats()
         }
+
+    @tool('/xray/get-service-graph', 'aws-operations', 'observability',
+          types={'hours': float, 'max_edges': int}, aliases={'service': 'hot_path_from'})
+    def get_xray_service_graph(self, start_time=None, end_time=None, hours=1, group_name=None, hot_path_from=None,
+                               max_edges=200):
+        """Get the X-Ray service graph as nodes and edges with request, error and fault counts and latency percentiles.
+
+        Windows longer than X-Ray allows are fetched in chunks; hot_path_from returns only the slowest
+        downstream path from that service.
+        """
+        end = xray_graph.parse_time(end_time) if end_time else datetime.now(timezone.utc)
+        start = xray_graph.parse_time(start_time) if start_time else end - timedelta(hours=hours)
+        if start >= end:
+            return {'error': 'start_time must be before end_time'}
+
+        reader = bootstrap.shared('xray_graph', lambda: xray_graph.ServiceGraphReader(lambda: self.xray))
+        graph, fetch = reader.read(start, end, group_name)
+        result = {'start_time': start.isoformat(), 'end_time': end.isoformat(), 'fetch': fetch}
+        if hot_path_from:
+            path = graph.hot_path(hot_path_from)
+            if path is None:
+                return dict(result, error=f'Service {hot_path_from} not found in the service graph')
+            return dict(result, hot_path=path)
+        return dict(result, **graph.compact(max_edges))
     
     # ========== Tool Registry ==========
     
+    @tool('/tools/list', 'aws-operations', 'meta')
     def get_available_tools(self):
         """Return list of all available tools"""
+        tools = {}
+        for spec in TOOLS.values():
+            tools.setdefault(spec.category, []).append(spec.describe())
+        return tools
+    
+    @tool('/tools/batch', 'kubernetes-operations', 'meta', types={'calls': list, 'deadline_seconds': float, 'max_workers': int})
+    @tool('/tools/batch', 'aws-operations', 'meta', types={'calls': list, 'deadline_seconds': float, 'max_workers': int})
+    def run_batch(self, calls, deadline_seconds=45, max_workers=8):
+        """Run several tool calls concurrently under one shared deadline.
+
+        Each call is {"api_path": ..., "parameters": {...}} with optional "id"
+        and "action_group"; results come back in the same order.
+        """
+        started = time.time()
+        deadline = started + deadline_seconds
+        results = []
+        pending = {}
+        pool = ContextThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls))))
+        for i, call in enumerate(calls):
+            if not isinstance(call, dict):
+                results.append({'id': i, 'api_path': None, 'status': 'error',
+                                'error': f'Each call must be an object with api_path and parameters, got {str(call)[:200]!r}'})
+                continue
+            entry = {'id': call.get('id', i), 'api_path': call.get('api_path')}
+            params = call.get('parameters') or {}
+            try:
+                params = COERCERS[dict](params)
+            except ValueError as e:
+                params = e
+            spec = lookup(call.get('action_group'), call.get('api_path'))
+            if spec is None or spec.name == 'run_batch':
+                entry.update(status='error', error=f"Unknown or unsupported operation: {call.get('api_path')}")
+            elif not isinstance(params, dict):
+                entry.update(status='error', error=f'parameters must be an object: {str(params)[:200]}')
+            else:
+                entry['tool'] = spec.name
+                pending[pool.submit(self._run_batch_call, spec, params, deadline)] = entry
+            results.append(entry)
+
+        _, not_done = wait(pending, timeout=deadline_seconds)
+        for future in not_done:
+            future.cancel()
+        # Calls already running cannot be interrupted; wait for them rather than let them keep issuing
+        # requests after the reply, possibly into the next invocation on a warm container
+        pool.shutdown(wait=True)
+        for future, entry in pending.items():
+            if future.cancelled():
+                entry.update(status='timeout', error=f'Not started within the {deadline_seconds}s deadline')
+                continue
+            entry.update(future.result())
+            if future in not_done:
+                entry['deadline_exceeded'] = True
+
         return {
-            'kubernetes': [
-                'get_pod_health',
-                'probe_logs_for_errors',
-                'get_deployment_status',
-                'get_node_resources'
-            ],
-            'data_pipeline': [
-                'get_kinesis_metrics',
-                'get_s3_object_count',
-                'get_glue_job_status',
-                'check_glue_crawler_status'
-            ],
-            'monitoring': [
-                'send_sns_alert',
-                'analyze_cloudwatch_logs',
-                'get_eks_cluster_health'
-            ]
+            'elapsed_ms': round((time.time() - started) * 1000, 2),
+            'succeeded': sum(1 for r in results if r['status'] == 'ok'),
+            'failed': sum(1 for r in results if r['status'] != 'ok'),
+            'results': results
         }
+
+    def _run_batch_call(self, spec, params, deadline):
+        started = time.time()
+        if started > deadline:
+            return {'status': 'timeout', 'error': 'Not started within the deadline', 'duration_ms': 0.0}
+        try:
+            with instrumentation.track(spec.name) as tracked:
+                result = self.dispatch(spec, params)
+                tracked.response_bytes = len(response_budget.encode(result))
+            outcome = {'status': 'error' if isinstance(result, dict) and 'error' in result else 'ok', 'result': result}
+        except Exception as e:
+            outcome = {'status': 'error', 'error': str(e), 'error_class': type(e).__name__}
+        outcome['duration_ms'] = round((time.time() - started) * 1000, 2)
+        return outcome
+
+    @tool('/results/page', 'kubernetes-operations', 'meta', types={'offset': int, 'limit': int})
+    @tool('/results/page', 'aws-operations', 'meta', types={'offset': int, 'limit': int})
+    def get_result_page(self, handle, offset=0, limit=None):
+        """Page through a result that was too large to return whole, using the handle from its _continuation"""
+        return response_budget.default_budget().page(handle, offset, limit)
+
+    def dispatch(self, spec, params):
+        """Invoke a registered tool with coerced Bedrock parameters"""
+        return spec.func(self, **spec.coerce(params))
@@ -0,0 +1,162 @@
+"""X-Ray service graph retrieval over chunked windows, merged into a compact adjacency view"""
+import os
+from datetime import datetime, timedelta, timezone
+
+from instrumentation import ContextThreadPoolExecutor
+from ttl_cache import TTLCache
+
+# GetServiceGraph rejects windows longer than this
+MAX_WINDOW = timedelta(hours=int(os.environ.get('XRAY_MAX_WINDOW_HOURS', 6)))
+PERCENTILES = (50, 90, 99)
+
+
+def parse_time(value):
+    """datetime, epoch seconds or ISO 8601 (a trailing Z allowed) -> aware UTC datetime"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)) or str(value).replace('.', '', 1).isdigit():
+        parsed = datetime.fromtimestamp(float(value), timezone.utc)
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def split_window(start, end, granularity=60):
+    """Floor both bounds to the granularity and cut the window into chunks X-Ray accepts"""
+    def floor(t):
+        return datetime.fromtimestamp(int(t.timestamp()) // granularity * granularity, timezone.utc)
+    start, end = floor(start), floor(end)
+    chunks = []
+    while start < end:
+        chunks.append((start, min(start + MAX_WINDOW, end)))
+        start = chunks[-1][1]
+    return chunks
+
+
+def _stats():
+    return {'requests': 0, 'ok': 0, 'errors': 0, 'throttles': 0, 'faults': 0, 'response_time': 0.0, 'histogram': {}}
+
+
+def _add(stats, summary, histogram):
+    summary = summary or {}
+    stats['requests'] += summary.get('TotalCount', 0)
+    stats['ok'] += summary.get('OkCount', 0)
+    stats['errors'] += summary.get('ErrorStatistics', {}).get('TotalCount', 0)
+    stats['throttles'] += summary.get('ErrorStatistics', {}).get('ThrottleCount', 0)
+    stats['faults'] += summary.get('FaultStatistics', {}).get('TotalCount', 0)
+    stats['response_time'] += summary.get('TotalResponseTime', 0.0)
+    for bucket in histogram or []:
+        stats['histogram'][bucket['Value']] = stats['histogram'].get(bucket['Value'], 0) + bucket['Count']
+
+
+def _percentiles(histogram):
+    """Nearest-rank percentiles in ms from a merged {seconds: count} histogram"""
+    total = sum(histogram.values())
+    if not total:
+        return {}
+    result, seen = {}, 0
+    targets = [(p, -(-total * p // 100)) for p in PERCENTILES]
+    for value, count in sorted(histogram.items()):
+        seen += count
+        while targets and seen >= targets[0][1]:
+            result[f'p{targets.pop(0)[0]}_ms'] = round(value * 1000, 1)
+    return result
+
+
+def _view(stats):
+    requests = stats['requests']
+    view = {k: stats[k] for k in ('requests', 'errors', 'throttles', 'faults')}
+    view['error_rate'] = round(stats['errors'] / requests, 4) if requests else None
+    view['fault_rate'] = round(stats['faults'] / requests, 4) if requests else None
+    view['avg_ms'] = round(stats['response_time'] / requests * 1000, 1) if requests else None
+    view.update(_percentiles(stats['histogram']))
+    return view
+
+
+class ServiceGraph:
+    """Services keyed by (name, type) and edges keyed by node pairs, merged across chunk responses"""
+
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+
+    def add(self, services):
+        # ReferenceIds are only stable within one response
+        keys = {s['ReferenceId']: (s.get('Name'), s.get('Type')) for s in services}
+        for s in services:
+            key = keys[s['ReferenceId']]
+            _add(self.nodes.setdefault(key, _stats()), s.get('SummaryStatistics'), s.get('ResponseTimeHistogram'))
+            for e in s.get('Edges', []):
+                target = keys.get(e['ReferenceId'])
+                if target is not None:
+                    _add(self.edges.setdefault((key, target), _stats()), e.get('SummaryStatistics'),
+                         e.get('ResponseTimeHistogram'))
+
+    def compact(self, max_edges=200):
+        """Nodes ranked by traffic, edges as node indices with counts and latency percentiles"""
+        ordered = sorted(self.nodes, key=lambda k: self.nodes[k]['requests'], reverse=True)
+        index = {key: i for i, key in enumerate(ordered)}
+        nodes = [dict({'id': index[key], 'name': key[0], 'type': key[1]}, **_view(self.nodes[key])) for key in ordered]
+        edges = sorted(self.edges.items(), key=lambda e: e[1]['requests'], reverse=True)
+        return {
+            'nodes': nodes,
+            'edges': [dict({'from': index[src], 'to': index[dst]}, **_view(stats)) for (src, dst), stats in edges[:max_edges]],
+            'edges_total': len(edges),
+            'edges_truncated': len(edges) > max_edges
+        }
+
+    def hot_path(self, service, max_hops=10):
+        """From a service, repeatedly follow the downstream edge carrying the most total response time"""
+        start = next((k for k in self.nodes if k[0] == service), None)
+        if start is None:
+            return None
+        outgoing = {}
+        for (src, dst), stats in self.edges.items():
+            outgoing.setdefault(src, []).append((dst, stats))
+        path, current, visited = [], start, {start}
+        while len(path) < max_hops:
+            candidates = [(dst, stats) for dst, stats in outgoing.get(current, []) if dst not in visited]
+            if not candidates:
+                break
+            dst, stats = max(candidates, key=lambda c: c[1]['response_time'])
+            path.append(dict({'from': current[0], 'to': dst[0], 'to_type': dst[1]}, **_view(stats)))
+            visited.add(dst)
+            current = dst
+        return {'service': dict({'name': start[0], 'type': start[1]}, **_view(self.nodes[start])), 'path': path}
+
+
+class ServiceGraphReader:
+    def __init__(self, xray_client, cache_ttl=None, max_workers=4):
+        self.xray_client = xray_client
+        self.max_workers = max_workers
+        self.cache = TTLCache(cache_ttl if cache_ttl is not None else
+                              float(os.environ.get('XRAY_GRAPH_CACHE_TTL_SECONDS', 60)), max_entries=64)
+
+    def _fetch(self, start, end, group_name):
+        """All services for one chunk, following NextToken; returns (services, api calls, cached)"""
+        key = (group_name, start, end)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, 0, True
+        kwargs = {'StartTime': start, 'EndTime': end}
+        if group_name:
+            kwargs['GroupName'] = group_name
+        services, calls = [], 0
+        for page in self.xray_client().get_paginator('get_service_graph').paginate(**kwargs):
+            services.extend(page['Services'])
+            calls += 1
+        self.cache.put(key, services)
+        return services, calls, False
+
+    def read(self, start, end, group_name=None):
+        """Fetch every chunk of the window concurrently and merge them into one ServiceGraph"""
+        chunks = split_window(start, end)
+        graph = ServiceGraph()
+        calls = cached = 0
+        if chunks:
+            with ContextThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                for services, chunk_calls, hit in pool.map(lambda c: self._fetch(c[0], c[1], group_name), chunks):
+                    graph.add(services)
+                    calls += chunk_calls
+                    cached += hit
+        return graph, {'chunks': len(chunks), 'cached_chunks': cached, 'api_calls': calls}
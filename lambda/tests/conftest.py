@@ -0,0 +1,67 @@
+"""Drive index.handler end to end against the benchmark stand-ins (fake_k8s.py, fake_aws.py)"""
+import contextlib
+import io
+import json
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'benchmarks'))
+
+import run  # noqa: E402
+
+SIZE = {'pods': 200, 'namespaces': 4, 'nodes': 8, 'log_lines': 100, 's3_objects': 2000, 's3_partitions': 10}
+NAMESPACE = run.NAMESPACE
+DEPLOYMENT = run.DEPLOYMENT
+BUCKET = run.BUCKET
+
+
+@pytest.fixture(scope='session')
+def index():
+    process, k8s_url = run.start_fake_k8s(SIZE, 42)
+    try:
+        run.configure_environment(k8s_url)
+        import index as index_module
+        run.install_fakes(SIZE)
+        yield index_module
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture
+def bootstrap(index):
+    import bootstrap as bootstrap_module
+    bootstrap_module.clear_caches()
+    return bootstrap_module
+
+
+def parameter_event(action_group, api_path, params):
+    return run.bedrock_event(action_group, api_path, params)
+
+
+def request_body_event(action_group, api_path, properties):
+    """The shape Bedrock sends for operations whose schema declares a requestBody"""
+    return {
+        'messageVersion': '1.0',
+        'actionGroup': action_group,
+        'apiPath': api_path,
+        'httpMethod': 'POST',
+        'parameters': [],
+        'requestBody': {'content': {'application/json': {'properties': [
+            {'name': k, 'type': 'string', 'value': v} for k, v in properties.items()]}}}
+    }
+
+
+@pytest.fixture
+def call(index):
+    """Invoke the handler quietly; returns (http status, decoded body, captured log lines)"""
+    def invoke(event):
+        captured = io.StringIO()
+        with contextlib.redirect_stdout(captured):
+            response = index.handler(event, None)['response']
+        body = json.loads(response['responseBody']['application/json']['body'])
+        return response['httpStatusCode'], body, captured.getvalue().splitlines()
+    return invoke
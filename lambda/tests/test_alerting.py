@@ -0,0 +1,26 @@
+def test_only_the_chunk_that_raised_is_failed(index):
+    import alerting
+
+    class FlakySns:
+        def __init__(self):
+            self.calls = 0
+
+        def publish_batch(self, TopicArn, PublishBatchRequestEntries):
+            self.calls += 1
+            if self.calls == 2:
+                raise ConnectionError('connection reset')
+            return {'Successful': [{'Id': e['Id']} for e in PublishBatchRequestEntries], 'Failed': []}
+
+    sns = FlakySns()
+    batcher = alerting.AlertBatcher(lambda: sns, 'test', burst=50)
+    topic = 'arn:aws:sns:eu-west-1:123456789012:alerts'
+    for i in range(15):
+        batcher.submit(topic, f'alert {i}', 'details')
+
+    result = batcher.flush()[topic]
+    assert sns.calls == 2
+    assert result['sent'] == 10
+    assert len(result['failed']) == 5 and {f['code'] for f in result['failed']} == {'ConnectionError'}
+    assert len(batcher.take_failures()) == 5
+    # The failed alerts are not dropped as duplicates when raised again
+    assert batcher.submit(topic, 'alert 14', 'details')[1] == 'queued'
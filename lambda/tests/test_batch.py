@@ -0,0 +1,42 @@
+from conftest import NAMESPACE, request_body_event
+
+
+def test_bedrock_object_notation_is_parsed(call):
+    calls = (f'[{{api_path=/tools/list, parameters={{}}}}, '
+             f'{{id=pods, api_path=/kubectl/get, parameters={{resource=pods, namespace={NAMESPACE}, fields=[name, phase]}}}}]')
+    status, body, _ = call(request_body_event('kubernetes-operations', '/tools/batch', {'calls': calls}))
+    assert status == 200
+    assert [r['status'] for r in body['results']] == ['ok', 'ok']
+    assert body['results'][1]['id'] == 'pods'
+    assert set(body['results'][1]['result']['pods'][0]) == {'name', 'phase'}
+
+
+def test_malformed_calls_fail_individually(call):
+    calls = '["just a string", {"api_path": "/tools/list", "parameters": "{oops"}, {"api_path": "/tools/list"}]'
+    status, body, _ = call(request_body_event('aws-operations', '/tools/batch', {'calls': calls}))
+    assert status == 200
+    assert [r['status'] for r in body['results']] == ['error', 'error', 'ok']
+    assert body['succeeded'] == 1 and body['failed'] == 2
+
+
+def test_nothing_outlives_the_batch_deadline(call, index, monkeypatch):
+    import time
+    from registry import TOOLS
+
+    running = []
+
+    def slow(self):
+        running.append(1)
+        time.sleep(0.3)
+        running.pop()
+        return {'slept': True}
+    monkeypatch.setattr(TOOLS[('aws-operations', '/tools/list')], 'func', slow)
+
+    calls = '[{"api_path": "/tools/list"}, {"api_path": "/tools/list"}, {"api_path": "/tools/list"}]'
+    status, body, _ = call(request_body_event('aws-operations', '/tools/batch',
+                                              {'calls': calls, 'deadline_seconds': '0.1', 'max_workers': '1'}))
+    assert status == 200
+    assert not running
+    first, *queued = body['results']
+    assert first['status'] == 'ok' and first['deadline_exceeded']
+    assert [r['status'] for r in queued] == ['timeout', 'timeout']
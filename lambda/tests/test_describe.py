@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import DEPLOYMENT, NAMESPACE, parameter_event
+
+
+@pytest.fixture
+def event_lists(bootstrap, monkeypatch):
+    """Record every event LIST describe makes"""
+    core_v1 = bootstrap.core_v1()
+    calls = []
+    for method in ('list_namespaced_event', 'list_event_for_all_namespaces'):
+        original = getattr(core_v1, method)
+
+        def recording(*args, _method=method, _original=original, **kwargs):
+            calls.append((_method, kwargs.get('field_selector')))
+            return _original(*args, **kwargs)
+        monkeypatch.setattr(core_v1, method, recording)
+    return calls
+
+
+@pytest.mark.parametrize('use_cache', ['true', 'false'])
+def test_describe_lists_events_only_by_object_name(call, event_lists, use_cache):
+    event = parameter_event('kubernetes-operations', '/kubectl/describe',
+                            {'resource': 'deployment', 'name': DEPLOYMENT, 'namespace': NAMESPACE,
+                             'use_cache': use_cache})
+    # Twice: a warm pod cache must not change how events are read
+    for _ in range(2):
+        event_lists.clear()
+        status, body, _ = call(event)
+        assert status == 200 and 'deployment' in body
+        assert event_lists
+        assert all(method == 'list_namespaced_event' and selector.startswith('involvedObject.name=')
+                   for method, selector in event_lists)
+        assert ('list_namespaced_event', f'involvedObject.name={DEPLOYMENT}') in event_lists
+
+
+def test_describe_pod_skips_the_pod_list(call, bootstrap, monkeypatch):
+    _, pods, _ = call(parameter_event('kubernetes-operations', '/kubectl/get',
+                                      {'resource': 'pods', 'namespace': NAMESPACE, 'use_cache': 'false'}))
+    listed = []
+    core_v1 = bootstrap.core_v1()
+    monkeypatch.setattr(core_v1, 'list_namespaced_pod', lambda *a, **k: listed.append(a) or pytest.fail('pod LIST'))
+    status, body, _ = call(parameter_event('kubernetes-operations', '/kubectl/describe',
+                                           {'resource': 'pod', 'name': pods['pods'][0]['name'], 'namespace': NAMESPACE}))
+    assert status == 200 and body['pod']['name'] == pods['pods'][0]['name']
+    assert 'owner_chain' in body and not listed
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+from conftest import parameter_event
+
+
+class StubGlue:
+    """Two jobs with runs in the window: 'ingest' fails one run in four, 'compact' never fails"""
+
+    def __init__(self):
+        now = datetime.now(timezone.utc)
+        states = {'ingest': ['FAILED', 'SUCCEEDED', 'SUCCEEDED', 'SUCCEEDED'], 'compact': ['SUCCEEDED'] * 4}
+        self.runs = {job: [{'Id': f'{job}-{i}', 'JobRunState': s, 'StartedOn': now - timedelta(hours=i + 1),
+                            'ExecutionTime': 60} for i, s in enumerate(run_states)]
+                     for job, run_states in states.items()}
+
+    def get_paginator(self, operation):
+        stub = self
+
+        class Paginator:
+            def paginate(self, JobName=None):
+                if operation == 'list_jobs':
+                    return [{'JobNames': list(stub.runs)}]
+                return [{'JobRuns': stub.runs[JobName]}]
+        return Paginator()
+
+
+def test_states_filter_does_not_skew_the_failure_rate(call, monkeypatch):
+    import tools
+    glue = StubGlue()
+    monkeypatch.setattr(tools.MCPTools, 'glue', property(lambda self: glue))
+
+    status, body, _ = call(parameter_event('aws-operations', '/glue/job-status', {'states': 'FAILED'}))
+    assert status == 200
+    assert [j['job_name'] for j in body['jobs']] == ['ingest']
+    ingest = body['jobs'][0]
+    assert (ingest['finished'], ingest['failed'], ingest['failure_rate'], ingest['matching_runs']) == (4, 1, 0.25, 1)
+    assert body['summary']['failure_rate'] == 0.125
+    assert body['summary']['jobs_matching_states'] == 1
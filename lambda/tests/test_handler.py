@@ -0,0 +1,26 @@
+import json
+
+from conftest import parameter_event, request_body_event
+
+
+def test_request_body_properties_reach_the_tool(call):
+    calls = json.dumps([{'api_path': '/tools/list', 'parameters': {}}])
+    status, body, _ = call(request_body_event('aws-operations', '/tools/batch', {'calls': calls}))
+    assert status == 200
+    assert body['succeeded'] == 1
+    assert body['results'][0]['tool'] == 'get_available_tools'
+
+
+def test_parameters_and_request_body_are_merged(call):
+    event = request_body_event('aws-operations', '/tools/batch',
+                               {'calls': json.dumps([{'api_path': '/tools/list'}])})
+    event['parameters'] = [{'name': 'deadline_seconds', 'type': 'number', 'value': '5'}]
+    status, body, _ = call(event)
+    assert status == 200
+    assert body['succeeded'] == 1
+
+
+def test_parameter_events_still_work(call):
+    status, body, _ = call(parameter_event('aws-operations', '/tools/list', {}))
+    assert status == 200
+    assert 'meta' in body
@@ -0,0 +1,13 @@
+from conftest import parameter_event
+
+
+def test_node_resources_fold_pod_pages_into_the_fleet(call, bootstrap, monkeypatch):
+    monkeypatch.setattr(bootstrap.resource_cache(), 'page_size', 30)
+    event = parameter_event('kubernetes-operations', '/kubectl/node-resources', {'include_nodes': 'true'})
+    _, cold, _ = call(event)
+    _, warm, _ = call(event)
+    event['parameters'].append({'name': 'use_cache', 'type': 'string', 'value': 'false'})
+    _, streamed, _ = call(event)
+
+    assert cold == warm == streamed
+    assert sum(n['pods'] for n in cold['node_list']) > 0
@@ -0,0 +1,15 @@
+from conftest import SIZE, parameter_event
+
+
+def test_cluster_wide_pod_health_is_the_same_cached_and_streamed(call, bootstrap, monkeypatch):
+    monkeypatch.setattr(bootstrap.resource_cache(), 'page_size', 30)
+    misses = bootstrap.resource_cache().get_stats()['misses']
+    event = parameter_event('kubernetes-operations', '/kubectl/pod-health', {})
+    _, cold, _ = call(event)
+    _, warm, _ = call(event)
+    event['parameters'].append({'name': 'use_cache', 'type': 'string', 'value': 'false'})
+    _, streamed, _ = call(event)
+
+    assert cold['summary']['total'] == SIZE['pods']
+    assert cold == warm == streamed
+    assert bootstrap.resource_cache().get_stats()['misses'] == misses + 1
@@ -0,0 +1,81 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from kubernetes import client
+
+import fake_k8s
+
+CLUSTER = fake_k8s.build_cluster(pods=60, namespaces=2, nodes=4)
+MODELS = {'pods': 'V1PodList', 'deployments': 'V1DeploymentList', 'nodes': 'V1NodeList'}
+
+
+def _models(kind):
+    body = json.dumps({'metadata': {'resourceVersion': '7'}, 'items': CLUSTER[kind]})
+    return client.ApiClient().deserialize(body, MODELS[kind], None).items
+
+
+class PagedApi:
+    """Answers every cluster-wide LIST from the synthetic cluster, honouring limit/_continue"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        kind = {'list_pod_for_all_namespaces': 'pods', 'list_deployment_for_all_namespaces': 'deployments',
+                'list_node': 'nodes'}[method]
+
+        def list_(limit=None, _continue=None):
+            self.calls.append((method, limit, _continue))
+            items = _models(kind)
+            start = int(_continue or 0)
+            end = start + limit if limit else len(items)
+            more = str(end) if end < len(items) else None
+            return SimpleNamespace(items=items[start:end],
+                                   metadata=SimpleNamespace(resource_version='7', _continue=more))
+        return list_
+
+
+@pytest.fixture
+def cache(index):
+    import resource_cache
+    api = PagedApi()
+    return resource_cache.ResourceCache(lambda accessor: api, page_size=25, enabled=True, disabled_tools=set()), api
+
+
+@pytest.mark.parametrize('kind', ['pods', 'deployments', 'nodes'])
+def test_relist_is_paged_and_keeps_every_projected_field(cache, kind):
+    import projection
+    cache, api = cache
+    cached = cache.list(kind)
+    full = _models(kind)
+
+    assert all(limit == 25 for _, limit, _ in api.calls)
+    assert len(api.calls) == -(-len(full) // 25)
+    assert not any(isinstance(i, type(full[0])) for i in cached)
+    fields = list(projection.FIELDS[kind])
+    by_name = {i.metadata.name: i for i in full}
+    for item in cached:
+        assert projection.project(kind, item, fields) == projection.project(kind, by_name[item.metadata.name], fields)
+        if kind == 'pods':
+            import capacity
+            assert capacity.pod_requests(item) == capacity.pod_requests(by_name[item.metadata.name])
+
+
+def test_bypassed_reads_stream_pages_without_caching(cache):
+    cache, api = cache
+    pages = list(cache.pages('pods', use_cache=False))
+    assert [len(p) for p in pages] == [25, 25, 10]
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_cold_entry_is_handed_out_page_by_page_then_cached(cache):
+    cache, api = cache
+    pages = cache.pages('pods')
+    assert len(next(pages)) == 25
+    assert len(api.calls) == 1
+    assert [len(p) for p in pages] == [25, 10]
+    assert cache.get_stats()['entries'] == 1
+
+    assert [len(p) for p in cache.pages('pods')] == [60]
+    assert len(api.calls) == 3
@@ -0,0 +1,29 @@
+from conftest import NAMESPACE, parameter_event, request_body_event
+
+
+def test_offloaded_result_is_paged_through_the_handler(call, monkeypatch):
+    import response_budget
+    monkeypatch.setattr(response_budget.default_budget(), 'budget', 2000)
+
+    status, first, _ = call(parameter_event('kubernetes-operations', '/kubectl/get',
+                                            {'resource': 'pods', 'namespace': NAMESPACE}))
+    assert status == 200
+    continuation = first['_continuation']
+    assert continuation['page_with'] == '/results/page'
+    names = [p['name'] for p in first['pods']]
+
+    offset = continuation['next_offset']
+    while offset is not None:
+        status, page, _ = call(request_body_event('kubernetes-operations', '/results/page',
+                                                  {'handle': continuation['handle'], 'offset': str(offset)}))
+        assert status == 200, page
+        names.extend(p['name'] for p in page['items'])
+        offset = page['next_offset']
+
+    assert len(names) == continuation['total'] == len(set(names))
+
+
+def test_unknown_handle_is_a_tool_error(call):
+    status, body, _ = call(request_body_event('aws-operations', '/results/page', {'handle': 'missing'}))
+    assert status == 200
+    assert 'not found' in body['error']
@@ -0,0 +1,16 @@
+from conftest import BUCKET, parameter_event
+
+
+def test_breakdown_limit_is_part_of_the_cache_key(call, bootstrap):
+    params = {'bucket': BUCKET, 'exact': 'true', 'max_breakdown': '2'}
+    status, small, _ = call(parameter_event('aws-operations', '/s3/get-object-count', params))
+    assert status == 200
+    assert len(small['breakdown']) == 2 and small['breakdown_truncated']
+
+    status, large, _ = call(parameter_event('aws-operations', '/s3/get-object-count', dict(params, max_breakdown='50')))
+    assert status == 200
+    assert not large['cached']
+    assert len(large['breakdown']) > 2
+
+    status, again, _ = call(parameter_event('aws-operations', '/s3/get-object-count', params))
+    assert again['cached'] and len(again['breakdown']) == 2
@@ -0,0 +1,125 @@
+"""Short-lived cache of read-only status answers, with identical in-flight questions coalesced onto one agent run"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Questions that only ask about state; anything that could change the cluster or send something is never shared
+READ_ONLY = re.compile(
+    r'\b(health|healthy|status|state|failing|failed|failures?|errors?|crash\w*|pending|ready|running|show|list|get|'
+    r'check|how many|are there|is there|which|what|top|usage|utili[sz]ation|resources|findings|latency|count)\b')
+MUTATING = re.compile(
+    r'\b(restart|delete|remove|scale|rollback|roll back|drain|cordon|uncordon|apply|patch|edit|create|update|'
+    r'deploy|send|alert|notify|page|kill|terminate|stop|start|fix|run|trigger|rerun|approve)\b')
+# Phrasing that does not change what is asked ("what is the cluster health?" == "cluster health please")
+FILLER = re.compile(r'\b(please|can you|could you|would you|tell me|show me|give me|what is|what s|how is|how are|'
+                    r'show|list|get|check|me|is|are|any|the|a|an|of|for|in|on)\b')
+
+
+def normalize(prompt):
+    """Lowercase, strip punctuation and filler words, collapse whitespace"""
+    text = re.sub(r'[^\w\s/.-]', ' ', prompt.lower())
+    return ' '.join(FILLER.sub(' ', text).split())
+
+
+def is_read_only(prompt):
+    text = prompt.lower()
+    return bool(READ_ONLY.search(text)) and not MUTATING.search(text)
+
+
+class InFlight:
+    """Chunks of one agent run as they arrive, readable by any number of waiting requests"""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._changed = threading.Condition()
+
+    def add(self, text):
+        with self._changed:
+            self.chunks.append(text)
+            self._changed.notify_all()
+
+    def finish(self, error=None):
+        with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    def follow(self, timeout):
+        """Yield chunks from the start, blocking for new ones until the run finishes"""
+        deadline = time.time() + timeout
+        position = 0
+        while True:
+            with self._changed:
+                while position == len(self.chunks) and not self.done:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError('Timed out waiting for the shared agent answer')
+                    self._changed.wait(remaining)
+                pending, finished, error = self.chunks[position:], self.done, self.error
+            position += len(pending)
+            yield from pending
+            if finished and position == len(self.chunks):
+                if error:
+                    raise RuntimeError(error)
+                return
+
+
+class AnswerCache:
+    """TTL + LRU cache of finished answers keyed by normalized prompt, plus the runs still in flight"""
+
+    def __init__(self, ttl, max_entries, wait_timeout):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._answers = OrderedDict()
+        self._in_flight = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'bypassed': 0, 'stored': 0, 'failed': 0}
+
+    def key(self, prompt, fresh=False):
+        """Cache key for a read-only prompt, or None when the prompt must always reach the agent"""
+        if fresh or not is_read_only(prompt):
+            with self._lock:
+                self.stats['bypassed'] += 1
+            return None
+        return normalize(prompt)
+
+    def begin(self, key):
+        """Return ('hit', text), ('follow', InFlight) or ('lead', InFlight); the leader must call complete()"""
+        with self._lock:
+            entry = self._answers.get(key)
+            if entry and entry[0] >= time.time():
+                self._answers.move_to_end(key)
+                self.stats['hits'] += 1
+                return 'hit', entry[1]
+            self._answers.pop(key, None)
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self.stats['coalesced'] += 1
+                return 'follow', flight
+            flight = self._in_flight[key] = InFlight()
+            self.stats['misses'] += 1
+            return 'lead', flight
+
+    def complete(self, key, flight, error=None):
+        """Finish the leader's run; a successful answer is cached, a failed one is not"""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error:
+                self.stats['failed'] += 1
+            else:
+                self._answers[key] = (time.time() + self.ttl, ''.join(flight.chunks))
+                self._answers.move_to_end(key)
+                self.stats['stored'] += 1
+                while len(self._answers) > self.max_entries:
+                    self._answers.popitem(last=False)
+        flight.finish(error)
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses'] + self.stats['coalesced']
+            return dict(self.stats, entries=len(self._answers), in_flight=len(self._in_flight),
+                        hit_rate=round((self.stats['hits'] + self.stats['coalesced']) / lookups, 3) if lookups else None)
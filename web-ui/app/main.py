@@ -1,16 +1,180 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, g, render_template, request, jsonify, session, stream_with_context
 import boto3
+import json
 import os
+import threading
+import time
 import uuid
+from botocore.config import Config
 from datetime import datetime
+from agent_trace import TraceTimeline
+from answer_cache import AnswerCache
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', os.urandom(24))
 
-# Initialize Bedrock client
-bedrock = boto3.client('bedrock-agent-runtime', region_name=os.environ.get('AWS_REGION', 'us-gov-west-1'))
 AGENT_ID = os.environ.get('AGENT_ID')
 AGENT_ALIAS_ID = os.environ.get('AGENT_ALIAS_ID', 'production')
+MAX_CONCURRENT_AGENTS = int(os.environ.get('MAX_CONCURRENT_AGENTS', '32'))
+MAX_QUEUED_AGENTS = int(os.environ.get('MAX_QUEUED_AGENTS', '64'))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get('QUEUE_TIMEOUT_SECONDS', '10'))
+# Capture a per-step latency timeline for every conversation, not only when the browser asks for trace steps
+AGENT_TRACE_ENABLED = os.environ.get('AGENT_TRACE_ENABLED', 'false').lower() == 'true'
+# Share answers to read-only status questions between users for a short TTL, and coalesce identical in-flight ones
+ANSWER_CACHE_ENABLED = os.environ.get('ANSWER_CACHE_ENABLED', 'false').lower() == 'true'
+ANSWER_CACHE_TTL_SECONDS = float(os.environ.get('ANSWER_CACHE_TTL_SECONDS', '60'))
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get('ANSWER_CACHE_MAX_ENTRIES', '256'))
+ANSWER_CACHE_WAIT_SECONDS = float(os.environ.get('ANSWER_CACHE_WAIT_SECONDS', '120'))
+
+# One pooled Bedrock client shared by every request, sized for the concurrency cap
+bedrock = boto3.client(
+    'bedrock-agent-runtime',
+    region_name=os.environ.get('AWS_REGION', 'us-gov-west-1'),
+    config=Config(max_pool_connections=MAX_CONCURRENT_AGENTS, retries={'mode': 'adaptive', 'max_attempts': 3})
+)
+
+class AgentLimiter:
+    """Caps concurrent agent invocations, queues a bounded number and rejects the rest"""
+
+    def __init__(self, max_active, max_queued, queue_timeout):
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_active)
+        self._lock = threading.Lock()
+        self.stats = {'active': 0, 'queued': 0, 'completed': 0, 'rejected': 0}
+
+    def acquire(self):
+        """Take a slot, waiting in the bounded queue if needed; False means reject with 429"""
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats['active'] += 1
+            return True
+        with self._lock:
+            if self.stats['queued'] >= self.max_queued:
+                self.stats['rejected'] += 1
+                return False
+            self.stats['queued'] += 1
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.stats['queued'] -= 1
+            self.stats['active' if acquired else 'rejected'] += 1
+        return acquired
+
+    def release(self):
+        with self._lock:
+            self.stats['active'] -= 1
+            self.stats['completed'] += 1
+        self._slots.release()
+
+limiter = AgentLimiter(MAX_CONCURRENT_AGENTS, MAX_QUEUED_AGENTS, QUEUE_TIMEOUT_SECONDS)
+answer_cache = AnswerCache(ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_WAIT_SECONDS) \
+    if ANSWER_CACHE_ENABLED else None
+
+def busy_response():
+    response = jsonify({'error': 'Too many concurrent agent requests, please retry shortly'})
+    response.status_code = 429
+    response.headers['Retry-After'] = '5'
+    return response
+
+def log_timing(**fields):
+    print(json.dumps(dict({'type': 'request_timing', 'path': request.path}, **fields)))
+
+@app.before_request
+def start_timer():
+    g.request_started = time.time()
+
+@app.after_request
+def record_timing(response):
+    # Streaming responses log their own timing once the stream finishes
+    if not response.is_streamed:
+        log_timing(status=response.status_code, duration_ms=round((time.time() - g.request_started) * 1000, 2))
+    return response
+
+def describe_trace(trace):
+    """Turn an agent trace event into a short human-readable step, or None"""
+    orchestration = trace.get('trace', {}).get('orchestrationTrace', {})
+    invocation = orchestration.get('invocationInput', {})
+    if 'actionGroupInvocationInput' in invocation:
+        action = invocation['actionGroupInvocationInput']
+        return f"calling {action.get('apiPath') or action.get('function')} ({action.get('actionGroupName')})"
+    if 'knowledgeBaseLookupInput' in invocation:
+        return 'searching knowledge base'
+    if 'rationale' in orchestration:
+        return 'reasoning: ' + orchestration['rationale'].get('text', '')[:200]
+    if 'observation' in orchestration and 'actionGroupInvocationOutput' in orchestration['observation']:
+        return 'received tool result'
+    return None
+
+def agent_events(message, session_id, trace=False):
+    """Yield ('chunk', text) and, when trace is enabled, ('trace', step) as the agent streams"""
+    timeline = TraceTimeline(session_id, 'web-ui') if AGENT_TRACE_ENABLED else None
+    response = bedrock.invoke_agent(
+        agentId=AGENT_ID,
+        agentAliasId=AGENT_ALIAS_ID,
+        sessionId=session_id,
+        inputText=message,
+        enableTrace=trace or AGENT_TRACE_ENABLED
+    )
+    for event in response.get('completion', []):
+        if 'chunk' in event:
+            chunk = event['chunk']
+            if 'bytes' in chunk:
+                yield 'chunk', chunk['bytes'].decode('utf-8')
+        elif 'trace' in event:
+            if timeline:
+                timeline.add(event['trace'])
+            step = describe_trace(event['trace']) if trace else None
+            if step:
+                yield 'trace', step
+    if timeline:
+        timeline.emit()
+
+class AgentAnswer:
+    """One question's answer: from the answer cache, shared with an identical in-flight run, or a new agent run.
+
+    Only new runs take a limiter slot; call close() when done so the slot is released and, if this
+    request led a shared run that did not finish, its followers get the error instead of waiting.
+    """
+
+    def __init__(self, message, session_id, trace=False, fresh=False):
+        self.source = 'agent'
+        self.admitted = True
+        self._key = self._flight = None
+        self._slot = False
+        # Trace steps are not part of the key: cached and coalesced answers are simply served without live steps
+        key = answer_cache.key(message, fresh) if answer_cache else None
+        if key is not None:
+            outcome, value = answer_cache.begin(key)
+            if outcome == 'hit':
+                self.source, self.events = 'cache', iter([('chunk', value)])
+                return
+            if outcome == 'follow':
+                self.source = 'coalesced'
+                self.events = (('chunk', text) for text in value.follow(answer_cache.wait_timeout))
+                return
+            self._key, self._flight = key, value
+        self.admitted = self._slot = limiter.acquire()
+        self.events = self._run(message, session_id, trace) if self.admitted else iter(())
+
+    def _run(self, message, session_id, trace):
+        for kind, text in agent_events(message, session_id, trace):
+            if kind == 'chunk' and self._flight:
+                self._flight.add(text)
+            yield kind, text
+        if self._flight:
+            answer_cache.complete(self._key, self._flight)
+            self._flight = None
+
+    def close(self, error=None):
+        if self._flight:
+            answer_cache.complete(self._key, self._flight, error or 'The shared agent run ended before answering')
+            self._flight = None
+        if self._slot:
+            self._slot = False
+            limiter.release()
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @app.route('/')
 def index():
@@ -30,35 +194,78 @@ def chat():
     
     session_id = session['session_id']
     
+    answer = AgentAnswer(message, session_id, fresh=bool(data.get('fresh', False)))
+    if not answer.admitted:
+        answer.close('Too many concurrent agent requests')
+        return busy_response()
+    
     try:
-        # Invoke Bedrock agent
-        response = bedrock.invoke_agent(
-            agentId=AGENT_ID,
-            agentAliasId=AGENT_ALIAS_ID,
-            sessionId=session_id,
-            inputText=message
-        )
-        
-        # Stream response
-        completion = ""
-        for event in response.get('completion', []):
-            if 'chunk' in event:
-                chunk = event['chunk']
-                if 'bytes' in chunk:
-                    completion += chunk['bytes'].decode('utf-8')
+        completion = "".join(text for kind, text in answer.events if kind == 'chunk')
         
         return jsonify({
             'response': completion,
             'session_id': session_id,
+            'source': answer.source,
             'timestamp': datetime.utcnow().isoformat()
         })
     
     except Exception as e:
+        answer.close(str(e))
         return jsonify({'error': str(e)}), 500
+    finally:
+        answer.close()
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Forward agent chunks (and optional trace steps) to the browser as Server-Sent Events"""
+    data = request.json
+    message = data.get('message', '')
+    trace = bool(data.get('trace', False))
+    fresh = bool(data.get('fresh', False))
+    
+    if not message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    if 'session_id' not in session:
+        session['session_id'] = str(uuid.uuid4())
+    
+    session_id = session['session_id']
+    
+    answer = AgentAnswer(message, session_id, trace, fresh)
+    if not answer.admitted:
+        answer.close('Too many concurrent agent requests')
+        return busy_response()
+    
+    started = g.request_started
+    
+    def generate():
+        first_chunk_ms = None
+        status = 'ok'
+        try:
+            for kind, text in answer.events:
+                if kind == 'chunk' and first_chunk_ms is None:
+                    first_chunk_ms = round((time.time() - started) * 1000, 2)
+                yield sse(kind, {'text': text})
+            yield sse('done', {'session_id': session_id, 'source': answer.source,
+                               'timestamp': datetime.utcnow().isoformat()})
+        except Exception as e:
+            status = 'error'
+            answer.close(str(e))
+            yield sse('error', {'error': str(e)})
+        finally:
+            answer.close()
+            log_timing(status=status, source=answer.source, time_to_first_chunk_ms=first_chunk_ms,
+                       duration_ms=round((time.time() - started) * 1000, 2))
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'healthy', 'agent_id': AGENT_ID})
+    return jsonify({'status': 'healthy', 'agent_id': AGENT_ID, 'agent_invocations': dict(limiter.stats),
+                    'answer_cache': answer_cache.get_stats() if answer_cache else None})
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
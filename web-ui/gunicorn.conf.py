@@ -0,0 +1,14 @@
+# Gunicorn settings for the SRE assistant.
+# The default gevent worker runs every in-flight agent conversation as a
+# greenlet on one event loop, so long invoke_agent streams do not pin threads.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('GUNICORN_WORKERS', '1'))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '180'))
+graceful_timeout = 30
+keepalive = 75
+# Lets app/main.py import its sibling modules the same way as `python app/main.py`
+pythonpath = 'app'